@@ -7,16 +7,33 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+import copy
 import json
 import logging
+import time
 from typing import Dict, List, Any, Optional
 import os
+import shutil
+import tempfile
+
+from utils.field_reference_index import (
+    FieldReferenceIndex, DOCUMENT_INFO, BASIC_INFO, TABLE_INFO, SCOPE_LOCATION_KINDS
+)
+from utils.display_name_import import DisplayNameImporter
+from utils.config_journal import ConfigJournal, config_hash
+from utils.config_cache import CompiledConfigCache
 
 logger = logging.getLogger(__name__)
 
 class ConfigManagerUI:
     """配置管理界面类"""
     
+    # 字段配置搜索的防抖间隔范围（毫秒）
+    FILTER_DEBOUNCE_MIN_MS = 30
+    FILTER_DEBOUNCE_MAX_MS = 300
+    # 自动保存的合并窗口（毫秒）
+    SAVE_COALESCE_MS = 300
+    
     def __init__(self, config_path: str = "config/config.json", app_controller=None):
         self.config_path = config_path
         self.config_data = {}
@@ -30,6 +47,25 @@ class ConfigManagerUI:
         self.factor_tree = None
         self.display_names_tree = None
         
+        # 字段 -> 引用位置的反向索引，配置数据被整体替换后首次使用时重建
+        self._field_refs = None
+        
+        # 配置写回队列：短时间内的多次编辑合并为一次写入
+        self._save_pending = False
+        self._save_after_id = None
+        self._saved_config_bytes = None
+        self._saved_config_hash = None
+        
+        # 撤销/重做日志，保存在配置文件旁边，跨会话保留
+        self._journal = ConfigJournal(os.path.splitext(config_path)[0] + ".history.jsonl")
+        
+        # 字段配置列表的过滤状态
+        self._display_name_rows = {}
+        self._display_names_order = []
+        self._display_names_filter_text = None
+        self._display_names_filter_after = None
+        self._display_names_filter_delay = self.FILTER_DEBOUNCE_MIN_MS
+        
         # 加载配置
         self.load_config()
         
@@ -43,8 +79,19 @@ class ConfigManagerUI:
         """加载配置文件"""
         try:
             if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    self.config_data = json.load(f)
+                with open(self.config_path, 'rb') as f:
+                    raw_content = f.read()
+                self._saved_config_hash = config_hash(raw_content)
+                # 主程序已为相同内容的配置文件生成编译缓存时跳过JSON解析
+                compiled = CompiledConfigCache(self.config_path).load(self._saved_config_hash)
+                if compiled is not None:
+                    self.config_data = compiled["config"]
+                else:
+                    self.config_data = json.loads(raw_content.decode('utf-8'))
+                # 记录文件的原始内容：保存时与之比较决定是否写入，撤销日志按它的摘要对应
+                self._saved_config_bytes = raw_content
+                # 恢复上次会话的撤销历史，配置文件在程序外修改过时清空
+                self._journal.load(self._saved_config_hash)
                 logger.info(f"配置文件加载成功: {self.config_path}")
             else:
                 # 创建默认配置
@@ -59,24 +106,53 @@ class ConfigManagerUI:
     def save_config(self, show_success_message=True):
         """保存配置文件
         
+        不显示成功消息的保存（各项编辑后的自动保存）进入写回队列，
+        SAVE_COALESCE_MS内的多次编辑合并为一次写入和一次界面刷新；
+        显示成功消息的保存（用户点击保存）立即写入。
+        
         Args:
             show_success_message: 是否显示成功消息弹窗，默认为True
         """
+        if not show_success_message and self.root:
+            self._save_pending = True
+            if self._save_after_id is None:
+                self._save_after_id = self.root.after(self.SAVE_COALESCE_MS, self.flush_config)
+            return
+        
+        if self.flush_config(force=True) and show_success_message:
+            # 指定parent为配置管理窗口，确保弹窗与窗口关联
+            messagebox.showinfo("成功", "配置保存成功！", parent=self.root)
+            # 弹窗关闭后恢复配置管理窗口焦点
+            if self.root:
+                self.root.lift()
+                self.root.focus_force()
+    
+    def flush_config(self, force=False):
+        """写入排队中的配置修改，写入后刷新一次所有UI
+        
+        Args:
+            force: 没有排队的修改时也写入
+        
+        Returns:
+            bool: 是否成功（内容未变化跳过写入也视为成功）
+        """
+        if self._save_after_id is not None:
+            if self.root:
+                try:
+                    self.root.after_cancel(self._save_after_id)
+                except Exception:
+                    pass
+            self._save_after_id = None
+        if not (self._save_pending or force):
+            return True
+        self._save_pending = False
+        
         try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"配置文件保存成功: {self.config_path}")
-            
-            # 保存成功后刷新所有UI，包括主窗口
-            self.refresh_all_ui()
-            
-            if show_success_message:
-                # 指定parent为配置管理窗口，确保弹窗与窗口关联
-                messagebox.showinfo("成功", "配置保存成功！", parent=self.root)
-                # 弹窗关闭后恢复配置管理窗口焦点
-                if self.root:
-                    self.root.lift()
-                    self.root.focus_force()
+            if self._write_config_file():
+                logger.info(f"配置文件保存成功: {self.config_path}")
+                # 保存成功后刷新所有UI，包括主窗口
+                self.refresh_all_ui()
+            return True
         except Exception as e:
             logger.error(f"保存配置文件失败: {e}")
             # 错误弹窗也指定parent
@@ -85,6 +161,91 @@ class ConfigManagerUI:
             if self.root:
                 self.root.lift()
                 self.root.focus_force()
+            return False
+    
+    def _write_config_file(self, record=True):
+        """把配置数据原子写入文件：先写临时文件再替换，中途出错不会留下半个文件
+        
+        序列化结果与上次写入的内容相同时跳过写入。写入失败时抛出异常。
+        
+        Args:
+            record: 是否把本次修改记入撤销日志（撤销/重做本身的写入不记录）
+        
+        Returns:
+            bool: 是否实际写入了文件
+        """
+        content = json.dumps(self.config_data, ensure_ascii=False, indent=2).encode('utf-8')
+        # 直接保存的修改也包含了排队中的修改
+        self._save_pending = False
+        if content == self._saved_config_bytes and os.path.exists(self.config_path):
+            logger.info("配置内容未变化，跳过写入")
+            return False
+        
+        config_dir = os.path.dirname(os.path.abspath(self.config_path))
+        fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=config_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.config_path):
+                shutil.copymode(self.config_path, temp_path)
+            os.replace(temp_path, self.config_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        old_content, old_hash = self._saved_config_bytes, self._saved_config_hash
+        self._saved_config_bytes = content
+        self._saved_config_hash = config_hash(content)
+        if record and old_content is not None:
+            try:
+                self._journal.record(json.loads(old_content.decode('utf-8')), self.config_data,
+                                     old_hash, self._saved_config_hash)
+            except Exception as e:
+                logger.error(f"记录配置修改日志失败: {e}")
+        return True
+    
+    def undo_config(self, event=None):
+        """撤销上一次配置修改"""
+        return self._step_config_history(undo=True, event=event)
+    
+    def redo_config(self, event=None):
+        """重做撤销的配置修改"""
+        return self._step_config_history(undo=False, event=event)
+    
+    def _step_config_history(self, undo, event=None):
+        # 快捷键在输入框中保留给输入框自身
+        if event is not None and isinstance(event.widget, (tk.Entry, ttk.Entry, tk.Text)):
+            return None
+        action = "撤销" if undo else "重做"
+        try:
+            # 先写入排队中的修改，使其成为可撤销的一步
+            self.flush_config()
+            config = self._journal.preview(copy.deepcopy(self.config_data), undo=undo)
+            if config is None:
+                logger.info(f"没有可{action}的配置修改")
+                if self.root:
+                    self.root.bell()
+                return "break"
+            # 配置文件写入成功后才移动撤销位置，写入失败时配置和撤销历史都保持不变
+            previous = self.config_data
+            self.config_data = config
+            try:
+                self._write_config_file(record=False)
+            except Exception:
+                self.config_data = previous
+                raise
+            self._journal.commit(undo=undo)
+            if self._saved_config_hash != self._journal.head_hash:
+                logger.warning(f"{action}后的配置文件与修改日志摘要不一致")
+            logger.info(f"{action}配置修改，当前位置 {self._journal.position}/{len(self._journal.steps)}")
+            self.refresh_all_ui()
+        except Exception as e:
+            logger.error(f"{action}配置修改失败: {e}")
+            messagebox.showerror("错误", f"{action}配置修改失败: {e}", parent=self.root)
+        return "break"
     
     def get_default_config(self) -> Dict[str, Any]:
         """获取默认配置"""
@@ -664,15 +825,20 @@ class ConfigManagerUI:
         self.display_names_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         tree_scrollbar2.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # 字段名 -> (树节点ID, 显示的值, 小写搜索键)，树只填充一次，过滤时分离/挂回节点
+        self._display_name_rows = {}
+        self._display_names_order = []
+        
         # 双击编辑
         self.display_names_tree.bind('<Double-1>', self.edit_display_name)
         
-        # 底部按钮（去掉批量导入）
+        # 底部按钮
         button_frame = ttk.Frame(main_container)
         button_frame.pack(fill=tk.X, pady=(5, 0))
         
         ttk.Button(button_frame, text="添加字段", command=self.add_display_name).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="删除字段", command=self.delete_display_name).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="从文件导入", command=self.batch_import_display_names).pack(side=tk.LEFT, padx=(0, 5))
         
         # 加载显示名称数据
         self.refresh_display_names()
@@ -690,6 +856,12 @@ class ConfigManagerUI:
         button_container = ttk.Frame(button_frame)
         button_container.pack(side=tk.RIGHT)
         
+        # 撤销/重做按钮靠左
+        ttk.Button(button_frame, text="撤销", command=self.undo_config).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="重做", command=self.redo_config).pack(side=tk.LEFT, padx=(0, 5))
+        self.root.bind('<Control-z>', self.undo_config)
+        self.root.bind('<Control-y>', self.redo_config)
+        
         # 按钮从右到左排列
         ttk.Button(button_container, text="保存配置", command=self.save_all_config).pack(side=tk.RIGHT, padx=(5, 0))
         ttk.Button(button_container, text="导出配置", command=self.export_config).pack(side=tk.RIGHT, padx=(5, 0))
@@ -778,6 +950,7 @@ class ConfigManagerUI:
             if field_name:
                 # 添加到已选择字段配置
                 self.config_data.setdefault("document_info_fields", []).append(field_name)
+                self._get_field_refs().add(field_name, (DOCUMENT_INFO,))
                 
                 # 从可选列表中移除该项
                 self.available_fields_listbox.delete(selection[0])
@@ -828,6 +1001,7 @@ class ConfigManagerUI:
                 
                 # 从配置中移除
                 fields.pop(index)
+                self._sync_field_ref(field_name, (DOCUMENT_INFO,), fields)
                 
                 # 从已选择列表中移除
                 display_name = self.selected_fields_listbox.get(index)
@@ -1467,6 +1641,7 @@ class ConfigManagerUI:
             if new_name not in factor_categories:
                 # 重命名分类
                 factor_categories[new_name] = factor_categories.pop(old_name)
+                self._get_field_refs().rename_category(old_name, new_name)
                 self.refresh_factor_categories()
                 # 保存配置到文件
                 self.save_config(show_success_message=False)
@@ -1487,6 +1662,7 @@ class ConfigManagerUI:
             factor_categories = self.config_data.get("factor_categories", {})
             if category_name in factor_categories:
                 del factor_categories[category_name]
+                self._get_field_refs().remove_category(category_name)
                 self.refresh_factor_categories()
                 # 保存配置到文件
                 self.save_config(show_success_message=False)
@@ -1514,6 +1690,7 @@ class ConfigManagerUI:
                     "table_info": {}
                 }
                 self.config_data.setdefault("factor_categories", {}).setdefault(category_name, []).append(new_factor)
+                self._get_field_refs().add_factor(category_name, new_factor)
                 self.refresh_subfactors(category_name)
                 # 保存配置到文件
                 self.save_config(show_success_message=False)
@@ -1544,6 +1721,7 @@ class ConfigManagerUI:
                     if factor.get("name") == old_name:
                         factor["name"] = new_name
                         break
+                self._get_field_refs().reindex_factor(category_name, new_name, old_name=old_name)
                 self.refresh_subfactors(category_name)
                 # 保存配置到文件
                 self.save_config(show_success_message=False)
@@ -1565,6 +1743,7 @@ class ConfigManagerUI:
         if messagebox.askyesno("确认删除", f"确定要删除子因子 '{subfactor_name}' 吗？"):
             factors = self.config_data.get("factor_categories", {}).get(category_name, [])
             self.config_data["factor_categories"][category_name] = [f for f in factors if f.get("name") != subfactor_name]
+            self._get_field_refs().remove_factor(category_name, subfactor_name)
             self.refresh_subfactors(category_name)
             self.clear_config_areas()
             # 保存配置到文件
@@ -1747,6 +1926,7 @@ class ConfigManagerUI:
                     if "basic_info" not in factor:
                         factor["basic_info"] = []
                     factor["basic_info"].append(field_name)
+                    self._get_field_refs().add(field_name, (BASIC_INFO, category_name, subfactor_name))
                     break
             
             # 保存配置并刷新界面
@@ -1793,6 +1973,8 @@ class ConfigManagerUI:
                 if factor.get("name") == subfactor_name:
                     if field_name in factor.get("basic_info", []):
                         factor["basic_info"].remove(field_name)
+                        self._sync_field_ref(field_name, (BASIC_INFO, category_name, subfactor_name),
+                                             factor["basic_info"])
                     break
             
             # 保存配置并刷新界面
@@ -1931,6 +2113,7 @@ class ConfigManagerUI:
                     if hierarchy not in factor["table_info"]:
                         factor["table_info"][hierarchy] = []
                     factor["table_info"][hierarchy].append(field_name)
+                    self._get_field_refs().add(field_name, (TABLE_INFO, category_name, subfactor_name, hierarchy))
                     break
             
             # 刷新界面
@@ -1980,6 +2163,8 @@ class ConfigManagerUI:
                     table_info = factor.get("table_info", {})
                     if hierarchy in table_info and field_name in table_info[hierarchy]:
                         table_info[hierarchy].remove(field_name)
+                        self._sync_field_ref(field_name, (TABLE_INFO, category_name, subfactor_name, hierarchy),
+                                             table_info[hierarchy])
                     break
             
             # 刷新界面
@@ -2112,6 +2297,7 @@ class ConfigManagerUI:
                     "table_info": {}
                 }
                 self.config_data.setdefault("factor_categories", {}).setdefault(category_name, []).append(new_factor)
+                self._get_field_refs().add_factor(category_name, new_factor)
                 self.refresh_factor_tree()
                 # 保存配置到文件
                 self.save_config(show_success_message=False)
@@ -2139,6 +2325,7 @@ class ConfigManagerUI:
                 factor_categories = self.config_data.get("factor_categories", {})
                 if new_name not in factor_categories:
                     factor_categories[new_name] = factor_categories.pop(item_text)
+                    self._get_field_refs().rename_category(item_text, new_name)
                     self.refresh_factor_tree()
                     # 保存配置到文件
                     self.save_config(show_success_message=False)
@@ -2159,6 +2346,7 @@ class ConfigManagerUI:
                         if factor.get("name") == item_text:
                             factor["name"] = new_name
                             break
+                    self._get_field_refs().reindex_factor(category_name, new_name, old_name=item_text)
                     self.refresh_factor_tree()
                     # 保存配置到文件
                     self.save_config(show_success_message=False)
@@ -2181,6 +2369,7 @@ class ConfigManagerUI:
             if item_values[0] == "分类":
                 # 删除分类
                 self.config_data.get("factor_categories", {}).pop(item_text, None)
+                self._get_field_refs().remove_category(item_text)
                 logger.info(f"删除因子分类: {item_text}，已保存到配置文件")
             
             elif item_values[0] == "子因子":
@@ -2192,6 +2381,7 @@ class ConfigManagerUI:
                 self.config_data["factor_categories"][category_name] = [
                     f for f in factors if f.get("name") != item_text
                 ]
+                self._get_field_refs().remove_factor(category_name, item_text)
                 logger.info(f"删除子因子: {category_name} -> {item_text}，已保存到配置文件")
             
             self.refresh_factor_tree()
@@ -2290,6 +2480,7 @@ class ConfigManagerUI:
                 field = field.strip()
                 if field not in basic_info:
                     basic_info.append(field)
+                    self._get_field_refs().reindex_factor(category_name, factor_name, factor_data)
                     display_name = self.config_data.get("display_names", {}).get(field, field)
                     basic_info_listbox.insert(tk.END, f"{field} ({display_name})")
         
@@ -2298,10 +2489,12 @@ class ConfigManagerUI:
             if selection:
                 index = selection[0]
                 basic_info.pop(index)
+                self._get_field_refs().reindex_factor(category_name, factor_name, factor_data)
                 basic_info_listbox.delete(index)
         
         def save_basic_config():
             factor_data["basic_info"] = basic_info
+            self._get_field_refs().reindex_factor(category_name, factor_name, factor_data)
             self.refresh_factor_tree()
             config_window.destroy()
             logger.info(f"保存基本信息配置: {category_name} > {factor_name}")
@@ -2362,6 +2555,7 @@ class ConfigManagerUI:
                         current_fields = table_info.setdefault(key, [])
                         if field not in current_fields:
                             current_fields.append(field)
+                            self._get_field_refs().reindex_factor(category_name, factor_name, factor_data)
                             display_name = self.config_data.get("display_names", {}).get(field, field)
                             listboxes[key].insert(tk.END, f"{field} ({display_name})")
                 return add_table_field
@@ -2372,6 +2566,7 @@ class ConfigManagerUI:
                     if selection:
                         index = selection[0]
                         table_info.setdefault(key, []).pop(index)
+                        self._get_field_refs().reindex_factor(category_name, factor_name, factor_data)
                         listboxes[key].delete(index)
                 return remove_table_field
             
@@ -2384,6 +2579,7 @@ class ConfigManagerUI:
         
         def save_table_config():
             factor_data["table_info"] = table_info
+            self._get_field_refs().reindex_factor(category_name, factor_name, factor_data)
             self.refresh_factor_tree()
             config_window.destroy()
             logger.info(f"保存表格信息配置: {category_name} > {factor_name}")
@@ -2394,20 +2590,21 @@ class ConfigManagerUI:
     # ==================== 显示名称操作 ====================
     
     def refresh_display_names(self):
-        """刷新显示名称列表"""
-        # 清空树
-        for item in self.display_names_tree.get_children():
-            self.display_names_tree.delete(item)
+        """刷新显示名称列表
         
-        # 加载显示名称
+        按字段名对比已有行，只插入新增字段、删除已移除字段、更新内容变化的行，
+        其余行保持不动，然后按当前搜索文本重新过滤。
+        """
         display_names = self.config_data.get("display_names", {})
-        # 确保search_var已初始化并正确获取值
-        if hasattr(self, 'search_var'):
-            search_text = self.search_var.get().lower()
-        else:
-            search_text = ""
+        tree = self.display_names_tree
+        rows = self._display_name_rows
         
-        for field, field_config in sorted(display_names.items()):
+        # 删除已移除的字段
+        removed = [field for field in rows if field not in display_names]
+        if removed:
+            tree.delete(*[rows.pop(field)[0] for field in removed])
+        
+        for field, field_config in display_names.items():
             # 兼容新旧格式
             if isinstance(field_config, dict):
                 display_name = field_config.get('display_name', field)
@@ -2417,63 +2614,79 @@ class ConfigManagerUI:
                 display_name = field_config
                 scope = '整单基本信息'
             
-            # 搜索过滤 - 处理scope可能是列表的情况
+            # 显示三列数据：字段名、显示名称、作用范围
+            values = (field, display_name, scope)
+            row = rows.get(field)
+            if row is None:
+                item_id = tree.insert("", tk.END, values=values)
+            elif row[1] != values:
+                item_id = row[0]
+                tree.item(item_id, values=values)
+            else:
+                continue
+            # 预先计算搜索键，处理scope可能是列表的情况
             scope_str = ', '.join(scope) if isinstance(scope, list) else scope
-            if not search_text or search_text in field.lower() or search_text in display_name.lower() or search_text in scope_str.lower():
-                # 显示三列数据：字段名、显示名称、作用范围
-                item_id = self.display_names_tree.insert("", tk.END, values=(field, display_name, scope))
-
+            search_key = "\n".join((field, str(display_name), str(scope_str))).lower()
+            rows[field] = (item_id, values, search_key)
+        
+        self._display_names_order = [rows[field][0] for field in sorted(rows)]
+        self._display_names_filter_text = None
+        self.apply_display_names_filter()
     
     def filter_display_names(self, event=None):
-        """过滤显示名称"""
+        """过滤显示名称
+        
+        按键事件经过防抖后再过滤，防抖间隔根据上次过滤耗时自动调整；
+        点击搜索按钮时立即过滤。
+        """
+        if self._display_names_filter_after:
+            self.root.after_cancel(self._display_names_filter_after)
+            self._display_names_filter_after = None
+        
+        if event is None:
+            self.apply_display_names_filter()
+        else:
+            self._display_names_filter_after = self.root.after(
+                self._display_names_filter_delay, self.apply_display_names_filter)
+    
+    def apply_display_names_filter(self):
+        """按搜索文本挂回匹配的行、分离不匹配的行，不删除也不重建树节点"""
+        self._display_names_filter_after = None
+        if not self.display_names_tree:
+            return
+        
         # 直接从输入框获取文本，而不是从StringVar获取
         if hasattr(self, 'search_entry') and self.search_entry:
             search_text = self.search_entry.get()
         else:
             search_text = self.search_var.get() if hasattr(self, 'search_var') else ""
-        
-
-        
-        # 直接在这里进行过滤，而不是调用refresh_display_names
-        # 清空树
-        for item in self.display_names_tree.get_children():
-            self.display_names_tree.delete(item)
-        
-        # 加载显示名称
-        display_names = self.config_data.get("display_names", {})
-
-        
-        # 确保搜索文本是字符串并转为小写
         search_text = search_text.lower()
         
-        # 计数器，用于记录匹配的项目数
-        match_count = 0
+        # 文本未变化（如方向键、Shift等按键）时不重复过滤
+        if search_text == self._display_names_filter_text:
+            return
         
-        for field, field_config in sorted(display_names.items()):
-            # 兼容新旧格式
-            if isinstance(field_config, dict):
-                display_name = field_config.get('display_name', field)
-                scope = field_config.get('scope', '整单基本信息')
-            else:
-                # 兼容旧格式
-                display_name = field_config
-                scope = '整单基本信息'
-            
-            # 搜索过滤 - 处理scope可能是列表的情况
-            scope_str = ', '.join(scope) if isinstance(scope, list) else scope
-            if not search_text or search_text in field.lower() or search_text in display_name.lower() or search_text in scope_str.lower():
-                # 显示三列数据：字段名、显示名称、作用范围
-                item_id = self.display_names_tree.insert("", tk.END, values=(field, display_name, scope))
-                match_count += 1
+        start_time = time.perf_counter()
+        if search_text:
+            search_keys = {row[0]: row[2] for row in self._display_name_rows.values()}
+            visible = [item_id for item_id in self._display_names_order if search_text in search_keys[item_id]]
+        else:
+            visible = self._display_names_order
+        # 一次调用替换根节点的子节点列表，未列出的行被分离（保留节点，之后可直接挂回）
+        self.display_names_tree.set_children("", *visible)
+        self._display_names_filter_text = search_text
         
-
+        # 根据本次过滤耗时调整防抖间隔：行数少时几乎即时响应，行数多时合并连续按键
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self._display_names_filter_delay = min(self.FILTER_DEBOUNCE_MAX_MS,
+                                               max(self.FILTER_DEBOUNCE_MIN_MS, int(elapsed_ms * 3)))
     
     def add_display_name(self):
         """添加显示名称"""
         # 创建添加字段的弹窗
         dialog = tk.Toplevel(self.root)
         dialog.title("添加字段配置")
-        dialog.geometry("450x350")  # 增加高度确保按钮显示
+        dialog.geometry("450x480")  # 增加高度确保按钮和字段建议列表显示
         dialog.resizable(False, False)
         dialog.transient(self.root)
         dialog.grab_set()
@@ -2481,8 +2694,8 @@ class ConfigManagerUI:
         # 居中显示
         dialog.update_idletasks()
         x = (dialog.winfo_screenwidth() // 2) - (450 // 2)
-        y = (dialog.winfo_screenheight() // 2) - (350 // 2)
-        dialog.geometry(f"450x350+{x}+{y}")
+        y = (dialog.winfo_screenheight() // 2) - (480 // 2)
+        dialog.geometry(f"450x480+{x}+{y}")
         
         # 主框架
         main_frame = ttk.Frame(dialog, padding="20")
@@ -2501,6 +2714,41 @@ class ConfigManagerUI:
         field_entry.pack(side=tk.LEFT, padx=(10, 0))
         field_entry.focus()
         
+        # 字段建议：来自已加载单据的字段目录，单击填入字段名
+        suggestion_frame = ttk.Frame(main_frame)
+        suggestion_frame.pack(fill=tk.X, pady=(0, 15))
+        suggestion_listbox = tk.Listbox(suggestion_frame, height=6, font=('Microsoft YaHei', 9))
+        suggestion_scrollbar = ttk.Scrollbar(suggestion_frame, orient=tk.VERTICAL, command=suggestion_listbox.yview)
+        suggestion_listbox.configure(yscrollcommand=suggestion_scrollbar.set)
+        suggestion_listbox.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        suggestion_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        suggestion_fields = []
+        
+        def update_suggestions(*args):
+            suggestion_listbox.delete(0, tk.END)
+            suggestion_fields.clear()
+            catalog = self._get_field_catalog()
+            if catalog is None:
+                suggestion_listbox.insert(tk.END, "（未加载单据数据或字段目录正在构建）")
+                return
+            configured = self.config_data.get("display_names", {})
+            for path, stats in catalog.search(field_var.get(), limit=100):
+                if path in configured:
+                    continue
+                levels = "/".join(stat.level for stat in stats)
+                suggestion_listbox.insert(tk.END, f"{path}  [{levels}] {stats[0].describe()}")
+                suggestion_fields.append(path)
+        
+        def select_suggestion(event=None):
+            selection = suggestion_listbox.curselection()
+            if selection and selection[0] < len(suggestion_fields):
+                field_var.set(suggestion_fields[selection[0]])
+                field_entry.icursor(tk.END)
+        
+        suggestion_listbox.bind('<<ListboxSelect>>', select_suggestion)
+        field_var.trace_add('write', update_suggestions)
+        update_suggestions()
+        
         # 添加调试日志
         logger.info(f"添加字段配置 - 初始化字段名输入框")
         
@@ -2600,9 +2848,7 @@ class ConfigManagerUI:
             
             # 保存配置到文件
             try:
-                with open(self.config_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.config_data, f, ensure_ascii=False, indent=2)
-
+                self._write_config_file()
             except Exception as e:
                 logger.error(f"保存配置文件失败: {e}")
                 messagebox.showerror("错误", f"保存配置文件失败: {e}", parent=dialog)
@@ -2832,8 +3078,7 @@ class ConfigManagerUI:
 
                     
                     # 保存配置文件
-                    with open(self.config_path, 'w', encoding='utf-8') as f:
-                        json.dump(self.config_data, f, ensure_ascii=False, indent=2)
+                    self._write_config_file()
                     
                     # 验证配置文件是否成功保存
                     if os.path.exists(self.config_path):
@@ -2878,101 +3123,46 @@ class ConfigManagerUI:
             # 设置默认按钮样式
             save_btn.focus()
     
+    def _get_field_catalog(self):
+        """获取主程序已加载单据的字段目录，未加载或后台扫描未完成时返回None"""
+        data_manager = getattr(self.app_controller, 'data_manager', None)
+        if data_manager is None or not hasattr(data_manager, 'get_field_catalog'):
+            return None
+        return data_manager.get_field_catalog()
+    
+    def _get_field_refs(self):
+        """获取字段引用索引，配置数据被整体替换（加载、导入、重置）后重建"""
+        if self._field_refs is None or self._field_refs.config is not self.config_data:
+            self._field_refs = FieldReferenceIndex(self.config_data)
+        return self._field_refs
+    
+    def _sync_field_ref(self, field_name, location, fields):
+        """字段列表移除一项后同步索引，列表中仍有同名字段时保留引用"""
+        if field_name not in fields:
+            self._get_field_refs().discard(field_name, location)
+    
     def find_field_references(self, field_name):
         """查找字段在配置中的所有引用"""
-        references = []
-        
-        # 检查document_info_fields
-        if field_name in self.config_data.get("document_info_fields", []):
-            references.append("整单基本信息字段列表")
-        
-        # 检查factor_categories中的引用
-        factor_categories = self.config_data.get("factor_categories", {})
-        for category_name, factors in factor_categories.items():
-            for factor in factors:
-                # 检查basic_info
-                if field_name in factor.get("basic_info", []):
-                    references.append(f"因子分类 '{category_name}' - 子因子 '{factor['name']}' 的基本信息")
-                
-                # 检查table_info
-                table_info = factor.get("table_info", {})
-                for level, fields in table_info.items():
-                    if field_name in fields:
-                        references.append(f"因子分类 '{category_name}' - 子因子 '{factor['name']}' 的 {level} 层表格信息")
-        
-        return references
+        return [FieldReferenceIndex.describe(location)
+                for location in self._get_field_refs().references(field_name)]
     
     def cascade_delete_field(self, field_name):
         """级联删除字段的所有引用"""
-        deleted_references = []
-        
-        # 从document_info_fields中删除
-        document_fields = self.config_data.get("document_info_fields", [])
-        if field_name in document_fields:
-            document_fields.remove(field_name)
-            deleted_references.append("整单基本信息字段列表")
-        
-        # 从factor_categories中删除
-        factor_categories = self.config_data.get("factor_categories", {})
-        for category_name, factors in factor_categories.items():
-            for factor in factors:
-                # 从basic_info中删除
-                basic_info = factor.get("basic_info", [])
-                if field_name in basic_info:
-                    basic_info.remove(field_name)
-                    deleted_references.append(f"因子分类 '{category_name}' - 子因子 '{factor['name']}' 的基本信息")
-                
-                # 从table_info中删除
-                table_info = factor.get("table_info", {})
-                for level, fields in table_info.items():
-                    if field_name in fields:
-                        fields.remove(field_name)
-                        deleted_references.append(f"因子分类 '{category_name}' - 子因子 '{factor['name']}' 的 {level} 层表格信息")
-        
-        return deleted_references
+        return [FieldReferenceIndex.describe(location)
+                for location in self._get_field_refs().remove_field(field_name)]
     
     def clean_factor_configs_by_scope(self, field_name, new_scopes):
         """根据新的作用范围清理不符合的因子配置"""
-        cleaned_references = []
-        
         # 将作用范围转换为列表格式
         if isinstance(new_scopes, str):
             new_scopes = [new_scopes]
         
-        # 定义作用范围与因子配置位置的映射
-        scope_mapping = {
-            "整单基本信息": "document_info_fields",
-            "子因子基本信息": "basic_info",
-            "子因子表格": "table_info"
-        }
-        
-        # 检查document_info_fields
-        if "整单基本信息" not in new_scopes:
-            document_fields = self.config_data.get("document_info_fields", [])
-            if field_name in document_fields:
-                document_fields.remove(field_name)
-                cleaned_references.append("整单基本信息字段列表")
-        
-        # 检查factor_categories中的配置
-        factor_categories = self.config_data.get("factor_categories", {})
-        for category_name, factors in factor_categories.items():
-            for factor in factors:
-                # 检查basic_info
-                if "子因子基本信息" not in new_scopes:
-                    basic_info = factor.get("basic_info", [])
-                    if field_name in basic_info:
-                        basic_info.remove(field_name)
-                        cleaned_references.append(f"因子分类 '{category_name}' - 子因子 '{factor['name']}' 的基本信息")
-                
-                # 检查table_info
-                if "子因子表格" not in new_scopes:
-                    table_info = factor.get("table_info", {})
-                    for level, fields in table_info.items():
-                        if field_name in fields:
-                            fields.remove(field_name)
-                            cleaned_references.append(f"因子分类 '{category_name}' - 子因子 '{factor['name']}' 的 {level} 层表格信息")
-        
-        return cleaned_references
+        # 不在新作用范围内的引用位置类型
+        kinds = {kind for scope, kind in SCOPE_LOCATION_KINDS.items() if scope not in new_scopes}
+        if not kinds:
+            return []
+        return [FieldReferenceIndex.describe(location)
+                for location in self._get_field_refs().remove_field(field_name, kinds)]
     
     def delete_display_name(self):
         """删除显示名称（带级联清理）"""
@@ -3013,7 +3203,8 @@ class ConfigManagerUI:
                     logger.error(f"保存配置到文件失败: {str(e)}")
                     messagebox.showerror("保存失败", f"保存配置到文件失败: {str(e)}", parent=self.root)
                 
-                self.refresh_all_ui()  # 刷新所有相关页面，确保实时更新
+                # 立即写入并刷新所有相关页面，下面按刷新后的列表恢复焦点
+                self.flush_config()
                 
                 # 恢复焦点到删除项后的位置或最后一项
                 self.root.update()  # 确保UI已更新
@@ -3035,28 +3226,91 @@ class ConfigManagerUI:
                     self.root.focus_force()
     
     def batch_import_display_names(self):
-        """批量导入显示名称"""
-        import_text = simpledialog.askstring("批量导入", 
-                                            "请输入字段映射 (格式: 字段名=显示名称，每行一个):")
-        if import_text:
-            lines = import_text.strip().split('\n')
-            imported_count = 0
-            
-            for line in lines:
-                line = line.strip()
-                if '=' in line:
-                    field, display_name = line.split('=', 1)
-                    field = field.strip()
-                    display_name = display_name.strip()
-                    
-                    if field and display_name:
-                        self.config_data.setdefault("display_names", {})[field] = display_name
-                        imported_count += 1
-            
-            if imported_count > 0:
-                self.refresh_display_names()
-                messagebox.showinfo("导入完成", f"成功导入 {imported_count} 个字段显示名称")
-                logger.info(f"批量导入显示名称: {imported_count} 个")
+        """从CSV/TSV/JSON文件批量导入字段显示名称
+        
+        文件内容先校验并与现有配置比较，确认后作为一个事务应用：
+        全部成功后只保存一次、刷新一次，出错时恢复导入前的配置。
+        """
+        from tkinter import filedialog
+        
+        file_path = filedialog.askopenfilename(
+            title="导入字段配置",
+            filetypes=[("CSV/TSV/JSON文件", "*.csv *.tsv *.json"), ("所有文件", "*.*")],
+            parent=self.root
+        )
+        if not file_path:
+            return
+        
+        try:
+            rows = DisplayNameImporter.read_file(file_path)
+        except Exception as e:
+            logger.error(f"读取导入文件失败: {e}")
+            messagebox.showerror("错误", f"读取导入文件失败: {e}", parent=self.root)
+            return
+        
+        display_names = self.config_data.get("display_names", {})
+        plan = DisplayNameImporter.build_plan(rows, display_names, self._get_field_catalog())
+        logger.info(f"批量导入字段配置: {file_path}, 新增 {len(plan.added)}, 冲突 {len(plan.conflicts)}, "
+                    f"相同 {len(plan.unchanged)}, 无效 {len(plan.errors)}")
+        
+        if not plan.added and not plan.conflicts:
+            messagebox.showinfo("导入字段配置", "没有需要导入的字段\n\n" + plan.summary(), parent=self.root)
+            return
+        
+        overwrite = False
+        if plan.conflicts:
+            examples = "\n".join(
+                f"• {field}: {current['display_name']} -> {imported['display_name']}"
+                for field, (current, imported) in list(plan.conflicts.items())[:10])
+            answer = messagebox.askyesnocancel(
+                "导入字段配置",
+                plan.summary() + "\n\n冲突示例：\n" + examples +
+                "\n\n是否用文件内容覆盖冲突的字段？\n是：覆盖  否：只导入新增字段  取消：放弃导入",
+                parent=self.root)
+            if answer is None:
+                return
+            overwrite = answer
+        elif not messagebox.askyesno("导入字段配置", plan.summary() + "\n\n确定导入吗？", parent=self.root):
+            return
+        
+        changes = dict(plan.added)
+        if overwrite:
+            changes.update({field: imported for field, (current, imported) in plan.conflicts.items()})
+        
+        # 事务：显示名称在副本上修改、成功后整体替换；清理因子配置直接修改当前配置，
+        # 任一步出错时恢复导入前的快照
+        snapshot = copy.deepcopy(self.config_data)
+        cleaned_references = []
+        try:
+            new_display_names = dict(display_names)
+            for field, config in changes.items():
+                scopes = config["scope"]
+                new_display_names[field] = {
+                    "display_name": config["display_name"],
+                    # 与编辑字段配置一致：单个作用范围保存为字符串，多个保存为列表
+                    "scope": scopes[0] if len(scopes) == 1 else scopes
+                }
+                if field in plan.conflicts:
+                    # 作用范围缩小时清理不再适用的因子配置
+                    cleaned_references.extend(self.clean_factor_configs_by_scope(field, scopes))
+            self.config_data["display_names"] = new_display_names
+        except Exception as e:
+            self.config_data = snapshot
+            logger.error(f"批量导入字段配置失败，已恢复导入前的配置: {e}")
+            messagebox.showerror("错误", f"批量导入字段配置失败: {e}", parent=self.root)
+            return
+        
+        # 一次写入、一次刷新
+        self.save_config(show_success_message=False)
+        if not self.flush_config():
+            self.config_data = snapshot
+            return
+        
+        message = f"成功导入 {len(changes)} 个字段配置"
+        if cleaned_references:
+            message += f"\n\n作用范围变更清理了 {len(cleaned_references)} 项因子配置"
+        messagebox.showinfo("导入完成", message, parent=self.root)
+        logger.info(f"批量导入字段配置完成: {len(changes)} 个, 清理引用 {len(cleaned_references)} 项")
     
     # ==================== 配置管理操作 ====================
     
@@ -3176,8 +3430,11 @@ class ConfigManagerUI:
             if hasattr(self, 'default_hierarchy_var') and self.default_hierarchy_var:
                 self.default_hierarchy_var.set(self.config_data.get("default_hierarchy_level", "part"))
             
-            # 刷新主窗口页面字段显示
-            if self.app_controller and hasattr(self.app_controller, 'refresh_view'):
+            # 刷新主窗口页面字段显示：按配置差异只刷新受影响的部分
+            if self.app_controller and hasattr(self.app_controller, 'apply_config_changes'):
+                logger.info("正在刷新主窗口页面字段显示...")
+                self.app_controller.apply_config_changes()
+            elif self.app_controller and hasattr(self.app_controller, 'refresh_view'):
                 logger.info("正在刷新主窗口页面字段显示...")
                 self.app_controller.refresh_view()
             
@@ -3274,6 +3531,8 @@ class ConfigManagerUI:
     def close_config_window(self):
         """关闭配置窗口"""
         if self.root:
+            # 写入排队中的修改后再关闭
+            self.flush_config()
             self.root.destroy()
             self.root = None
             # 重置内容加载标志，确保下次打开时重新创建内容
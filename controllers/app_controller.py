@@ -2,19 +2,36 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 import logging
 import os
+import re
 import sys
-from models import ConfigManager, DataManager
+import threading
+from models import ConfigManager, ConfigDiff, DataManager
 from views import MainAppView
 from utils import DataUtils
+from utils.lightweight_data import LightweightDataFrame
+from utils.search_index import TableSearchIndex
+from utils.column_stats import ColumnWidthStats
+from utils.file_watcher import FileWatcher
 from .logging_setup import setup_logging
 
 
 class AppController:
+    # 后台正在构建层级数据帧时，界面线程轮询的间隔（毫秒）
+    LEVEL_FRAME_POLL_MS = 50
+    # 非界面渲染的调用方（如搜索结果跳转）等待后台构建的最长时间（秒），超时后同步构建
+    LEVEL_FRAME_WAIT_TIMEOUT = 0.2
+    
     def __init__(self):
         # 设置日志系统
         self.logger = setup_logging()
         self.logger.info("应用程序启动")
         
+        # 层级数据帧：选中子因子后在后台线程预计算所有启用层级，结果存入数据管理器的结果缓存
+        self._level_frame_pending = {}  # 后台正在构建的缓存键 -> threading.Event
+        self._current_frame_key = None  # 当前表格数据帧对应的缓存键
+        self._level_frame_lock = threading.Lock()
+        self._level_frame_generation = 0
+        
         try:
             # 加载配置文件 - 动态优先级加载
             if getattr(sys, 'frozen', False):
@@ -35,6 +52,10 @@ class AppController:
             self.data_manager = DataManager(config_manager=self.config_manager)
             self.view = MainAppView(self)
             self.current_sub_factor = None
+            self.last_config_diff = None
+            # 监视配置文件，外部修改后自动重新加载并只刷新受影响的部分
+            self.config_watcher = FileWatcher(self.view, config_path, self._on_config_file_changed)
+            self.config_watcher.start()
             self.logger.info("应用程序初始化完成")
         except Exception as e:
             self.logger.error(f"应用程序初始化失败: {e}")
@@ -95,6 +116,8 @@ class AppController:
             sample_file = os.path.join(project_root, 'sample.json')
             if os.path.exists(sample_file):
                 self.data_manager.load_json_data(sample_file)
+                self._clear_level_frame_cache()
+                self._build_document_search_index()
                 
                 # Update document info
                 doc_info_fields = self.config_manager.get_document_info_fields()
@@ -133,6 +156,8 @@ class AppController:
         try:
             self.logger.info(f"开始加载用户数据文件: {file_path}")
             self.data_manager.load_json_data(file_path)
+            self._clear_level_frame_cache()
+            self._build_document_search_index()
             
             # Update document info
             self.logger.info("获取文档信息字段")
@@ -161,6 +186,47 @@ class AppController:
             self.logger.error(f"错误堆栈: {traceback.format_exc()}")
             messagebox.showerror("错误", f"加载数据文件失败:\n{str(e)}")
 
+    def _build_document_search_index(self):
+        """数据加载后构建一次整单全局搜索索引"""
+        try:
+            index = self.data_manager.get_search_index()
+            if index is not None:
+                self.logger.info(f"全局搜索索引已就绪，共 {index.node_count} 个节点")
+        except Exception as e:
+            self.logger.error(f"构建全局搜索索引失败: {e}")
+
+    def search_document(self, query):
+        """在整单所有层级中搜索，结果按层级分组"""
+        try:
+            return self.data_manager.search_document(query)
+        except Exception as e:
+            self.logger.error(f"全局搜索时出错: {e}")
+            return {}
+
+    def jump_to_search_hit(self, level, ordinal):
+        """跳转到全局搜索命中所在层级的表格行"""
+        detail_view = getattr(self.view.factor_view, 'detail_view', None)
+        if not detail_view or not self.current_sub_factor:
+            messagebox.showinfo("提示", "请先选择子因子后再跳转")
+            return False
+
+        if level not in self.data_manager.get_hierarchy_levels():
+            level_name = self.config_manager.get_data_hierarchy_name(level)
+            messagebox.showinfo("提示", f"数据层次 '{level_name}' 未启用，无法在表格中定位")
+            return False
+
+        self.logger.info(f"跳转到全局搜索结果: 层级={level}, 行={ordinal}")
+        detail_view.hierarchy_var.set(level)
+        detail_view.on_hierarchy_level_select(level)
+        
+        # 序号是命中节点在层级数据帧中的原始行号，按行记录定位，表格排序或过滤后仍能找到正确的行
+        entry = self._get_level_frame(self.current_sub_factor, level)
+        if entry is None or not 0 <= ordinal < len(entry["df"].data):
+            self.logger.warning(f"全局搜索结果超出层级数据范围: 层级={level}, 行={ordinal}")
+            return False
+        detail_view.focus_record(entry["df"].data[ordinal])
+        return True
+
     def on_sub_factor_select(self, sub_factor_name):
         """处理子因素选择事件"""
         self.current_sub_factor = sub_factor_name
@@ -184,6 +250,9 @@ class AppController:
             # 默认选择配置的层次并显示数据
             default_level = self.config_manager.get_default_hierarchy_level()
             self.on_hierarchy_node_select(default_level)
+            
+            # 后台预计算其余启用层级，切换层级时直接使用缓存
+            self._start_level_precompute(sub_factor_name)
 
     def on_hierarchy_node_select(self, level):
         """处理层级节点选择事件"""
@@ -193,189 +262,324 @@ class AppController:
         self.logger.info(f"选中层级节点: {level}")
         
         try:
-            root_node = self.data_manager.get_calculate_item_vo()
-            self.logger.info(f"获取到的root_node: {type(root_node)}, 是否为None: {root_node is None}")
-            if root_node is None:
-                self.logger.error("root_node为None，数据可能未正确加载")
+            detail_view = getattr(self.view.factor_view, 'detail_view', None)
+            # 后台正在构建该层级时不阻塞界面线程：先显示加载提示，构建完成后再渲染
+            entry, pending = self._peek_level_frame(self.current_sub_factor, level)
+            if entry is None and pending is not None:
+                if detail_view:
+                    detail_view.show_table_placeholder("正在加载数据...")
+                self._wait_level_frame(self.current_sub_factor, level, pending)
                 return
-            self.logger.info(f"准备调用get_all_nodes_for_level，参数: level={level}")
-            nodes_at_level = self.data_manager.get_all_nodes_for_level(root_node, level)
-            self.logger.info(f"get_all_nodes_for_level返回结果: {len(nodes_at_level) if nodes_at_level else 0}个节点")
             
-            # 使用当前选中的因子名称获取列配置
-            columns = self.config_manager.get_data_table_columns(level, self.current_sub_factor)
-            df = self.data_manager.get_data_for_level(nodes_at_level, columns)
+            # 未命中缓存且没有后台构建时同步构建
+            if entry is None:
+                entry = self._get_level_frame(self.current_sub_factor, level)
+            if entry is None:
+                self.logger.error("root_node为None，数据可能未正确加载")
+                return
+            df = entry["df"]
+            columns = entry["columns"]
+            # 投影计划在渲染时按当前配置获取：显示名称或类型提示变化时缓存的数据帧会被沿用，
+            # 但列标题和格式化函数必须是最新的
+            plan = self.config_manager.get_projection_plan(level, self.current_sub_factor)
             
             # 保存当前数据帧，用于搜索过滤
             self.current_data = df
+            self._current_frame_key = (self.current_sub_factor, level)
+            # 列显示长度统计随数据帧一起构建，窗口缩放和搜索过滤时复用
+            self._column_width_stats = entry["width_stats"]
+            self._column_width_stats_source = df
+            width_stats = self._get_column_width_stats()
             
-            # 使用通用方法转换显示列名
-            display_columns = self._convert_to_display_columns(columns)
+            # 显示列名直接取自投影计划，不再逐列查询配置
+            display_columns = dict(plan.display_columns)
             
             # 更新右侧详情视图的数据表格
             if hasattr(self.view.factor_view, 'detail_view') and self.view.factor_view.detail_view:
-                self.view.factor_view.detail_view.display_data_table(df, display_columns, columns)
+                self.view.factor_view.detail_view.display_data_table(df, display_columns, columns, width_stats,
+                                                                     plan=plan)
                 self.logger.info(f"成功更新表格数据，共 {len(df)} 行")
                 
         except Exception as e:
             self.logger.error(f"处理层级节点选择时出错: {e}")
             
-    def apply_search_filter(self, level, search_text):
-        """应用搜索过滤"""
+    def _build_level_frame(self, sub_factor, level):
+        """构建子因子在指定层级的数据帧及列显示长度统计，可在后台线程中调用"""
+        if self.data_manager.get_calculate_item_vo() is None:
+            return None
+        # 同一层级的节点列表在各子因子间共享缓存
+        nodes_at_level = self.data_manager.get_cached_nodes_for_level(level)
+        self.logger.info(f"层级 {level} 共 {len(nodes_at_level) if nodes_at_level else 0} 个节点")
+        
+        # 使用配置加载时编译的投影计划提取列；缓存只保存数据帧和列统计，计划在渲染时重新获取
+        plan = self.config_manager.get_projection_plan(level, sub_factor)
+        columns = list(plan.columns)
+        df = self.data_manager.get_data_for_level(nodes_at_level, columns, plan=plan)
+        return {"df": df, "columns": columns, "width_stats": ColumnWidthStats.from_frame(df)}
+
+    def _store_level_frame(self, key, entry, generation):
+        """写入层级数据帧缓存；数据或配置已变化（代次不同）时丢弃结果
+
+        已有条目时保留先写入的条目，同一层级始终使用同一个数据帧对象（跳转定位按行记录查找）。
+        """
+        with self._level_frame_lock:
+            if generation != self._level_frame_generation:
+                return False
+            if key in self.data_manager.result_cache:
+                return False
+            self.data_manager.result_cache.put(key, entry)
+            return True
+
+    def _peek_level_frame(self, sub_factor, level):
+        """不等待地查询层级数据帧，返回 (缓存条目, 后台构建完成事件)，两者都可能为None"""
+        key = self.data_manager.make_cache_key("frame", sub_factor, level)
+        with self._level_frame_lock:
+            entry = self.data_manager.result_cache.get(key)
+            if entry is not None:
+                self.logger.info(f"层级数据帧缓存命中: {sub_factor}/{level}")
+                return entry, None
+            return None, self._level_frame_pending.get(key)
+
+    def _wait_level_frame(self, sub_factor, level, pending):
+        """在界面线程中轮询后台构建，完成后若仍选中该层级则重新渲染"""
+        def poll():
+            detail_view = getattr(self.view.factor_view, 'detail_view', None)
+            current_level = getattr(detail_view, 'current_level', level) if detail_view else level
+            if self.current_sub_factor != sub_factor or current_level != level:
+                # 用户已切换到其他子因子或层级
+                return
+            if not pending.is_set():
+                self.view.after(self.LEVEL_FRAME_POLL_MS, poll)
+                return
+            self.on_hierarchy_node_select(level)
+        self.view.after(self.LEVEL_FRAME_POLL_MS, poll)
+
+    def _get_level_frame(self, sub_factor, level):
+        """获取层级数据帧：命中缓存直接返回，后台正在构建时有限等待，否则同步构建"""
+        key = self.data_manager.make_cache_key("frame", sub_factor, level)
+        result_cache = self.data_manager.result_cache
+        entry, pending = self._peek_level_frame(sub_factor, level)
+        if entry is not None:
+            return entry
+        with self._level_frame_lock:
+            generation = self._level_frame_generation
+        
+        if pending is not None:
+            # 后台线程已在构建该层级，短时间等待比重新构建更快；超时后同步构建，不长时间阻塞调用方
+            pending.wait(self.LEVEL_FRAME_WAIT_TIMEOUT)
+            entry = result_cache.get(key)
+            if entry is not None:
+                return entry
+        
+        entry = self._build_level_frame(sub_factor, level)
+        if entry is not None:
+            self._store_level_frame(key, entry, generation)
+            # 后台构建可能先写入了缓存，使用缓存中的条目
+            entry = result_cache.get(key) or entry
+        return entry
+
+    def _start_level_precompute(self, sub_factor):
+        """在后台线程中预计算子因子所有启用层级的数据帧
+
+        再次选择子因子、重新加载数据或配置时代次递增，旧的预计算线程在下一个层级前退出。
+        """
+        with self._level_frame_lock:
+            self._level_frame_generation += 1
+            generation = self._level_frame_generation
+        levels = list(self.config_manager.get_enabled_hierarchy_levels())
+        result_cache = self.data_manager.result_cache
+        
+        def precompute():
+            for level in levels:
+                key = self.data_manager.make_cache_key("frame", sub_factor, level)
+                with self._level_frame_lock:
+                    if generation != self._level_frame_generation:
+                        return
+                    if key in result_cache or key in self._level_frame_pending:
+                        continue
+                    done = threading.Event()
+                    self._level_frame_pending[key] = done
+                try:
+                    entry = self._build_level_frame(sub_factor, level)
+                    if entry is not None and self._store_level_frame(key, entry, generation):
+                        self.logger.info(f"已预计算层级数据帧: {sub_factor}/{level}，共 {len(entry['df'])} 行")
+                except Exception as e:
+                    self.logger.error(f"预计算层级数据帧失败: {sub_factor}/{level}, {e}")
+                finally:
+                    with self._level_frame_lock:
+                        self._level_frame_pending.pop(key, None)
+                    done.set()
+        
+        threading.Thread(target=precompute, name="LevelFramePrecompute", daemon=True).start()
+
+    def _clear_level_frame_cache(self):
+        """数据或配置变化后释放过期的缓存结果，并让进行中的预计算结果失效"""
+        with self._level_frame_lock:
+            self._level_frame_generation += 1
+            self._current_frame_key = None
+            # 缓存键包含单据标识和配置版本，变化后旧条目不会再命中，这里直接释放内存
+            self.data_manager.purge_stale_cache()
+        self.logger.info(f"结果缓存统计: {self.data_manager.get_cache_stats()}")
+
+    def _get_table_search_index(self):
+        """获取当前数据帧的搜索索引，数据帧变化后首次搜索时重建"""
+        if getattr(self, '_table_search_index_source', None) is not self.current_data:
+            frame_key = getattr(self, '_current_frame_key', None)
+            if frame_key is not None:
+                # 层级数据帧来自结果缓存，搜索索引随之缓存，切回该层级时无需重建
+                key = self.data_manager.make_cache_key("search_index", *frame_key)
+                search_index = self.data_manager.result_cache.get_or_build(
+                    key, lambda: TableSearchIndex(self.current_data))
+            else:
+                search_index = TableSearchIndex(self.current_data)
+            self._table_search_index = search_index
+            self._table_search_index_source = self.current_data
+            self.logger.info(f"已获取表格搜索索引，共 {len(self._table_search_index)} 行")
+        return self._table_search_index
+
+    def _get_column_width_stats(self):
+        """获取当前数据帧的列显示长度统计，数据帧变化后重建"""
+        if getattr(self, '_column_width_stats_source', None) is not self.current_data:
+            self._column_width_stats = ColumnWidthStats.from_frame(self.current_data)
+            self._column_width_stats_source = self.current_data
+        return self._column_width_stats
+
+    def apply_search_filter(self, level, search_text, mode="substring"):
+        """应用搜索过滤
+
+        Args:
+            level: 当前数据层次
+            search_text: 搜索文本，正则模式下为正则表达式
+            mode: 搜索模式，substring为包含匹配，regex为正则匹配，
+                fuzzy为按编辑距离容错匹配（结果按距离排序）
+
+        Returns:
+            搜索状态字典 {"matched": 匹配行数, "completed": 是否完整扫描, "error": 错误信息}，
+            未执行搜索时返回None
+        """
         try:
-            # 检查当前数据是否存在
+            # 检查是否有当前数据帧
             if not hasattr(self, 'current_data') or self.current_data is None:
                 self.logger.error("当前数据为空，无法进行搜索过滤")
-                return
+                return None
+            if len(self.current_data.data) == 0:
+                return None
                 
-            self.logger.info(f"应用搜索过滤: {search_text}")
-            
-            # 检查是否有当前数据帧
-            if not hasattr(self, 'current_data') or self.current_data is None or len(self.current_data.data) == 0:
-                return
+            self.logger.info(f"应用搜索过滤: {search_text} (模式: {mode})")
                 
-            # 更严格的重复检查 - 包括搜索文本、层级和数据版本
-            current_data_hash = hash(str(self.current_data.data)) if hasattr(self.current_data, 'data') else 0
-            search_key = f"{level}_{search_text}_{current_data_hash}"
+            # 重复检查 - 包括搜索文本、搜索模式、层级和数据帧
+            search_key = (level, search_text, mode, id(self.current_data))
             
-            if hasattr(self, '_last_search_key') and self._last_search_key == search_key:
-                return
+            if getattr(self, '_last_search_key', None) == search_key:
+                return None
                 
             # 保存当前搜索键
             self._last_search_key = search_key
             self._last_search_text = search_text
             self._last_search_level = level
+            
+            status = {"matched": len(self.current_data), "completed": True, "error": None}
                 
             # 如果搜索文本为空，显示所有数据
             if not search_text:
-                # 使用通用方法转换显示列名
-                display_columns = self._convert_to_display_columns(self.current_data.columns)
-                    
-                # 更新表格显示
-                if hasattr(self.view.factor_view, 'detail_view') and self.view.factor_view.detail_view:
-                    # 获取当前层级的列配置
-                    current_level = getattr(self.view.factor_view.detail_view, 'current_level', 'part')
-                    columns = self.config_manager.get_data_table_columns(current_level, self.current_sub_factor)
-                    self.view.factor_view.detail_view.display_data_table(self.current_data, display_columns, columns)
-                return
+                self._display_filtered_data(self.current_data)
+                return status
             
-            # 过滤数据
-            filtered_df = self.current_data.copy()
-            mask = None
-            
-            # 添加调试日志
-            self.logger.info(f"开始搜索过滤，数据行数: {len(filtered_df)}, 列数: {len(filtered_df.columns)}")
-            
-            # 在所有列中搜索
-            for col in filtered_df.columns:
-                try:
-                    # 检查列数据类型
-                    col_data = filtered_df[col]
-                    
-                    # 检查是否为pandas Series
-                    if not hasattr(col_data, 'apply'):
-                        self.logger.info(f"列 '{col}' 不是pandas Series，转换为列表处理")
-                        # 如果不是列表，转换为列表
-                        if not isinstance(col_data, list):
-                            col_data = list(col_data)
-                        
-                    # 处理列数据可能是列表的情况
-                    try:
-                        # 检查是否包含列表类型数据
-                        has_list = any(isinstance(x, list) for x in col_data)
-                    except:
-                        # 如果检查失败，假设不包含列表
-                        has_list = False
-                        
-                    if has_list:
-                        # 对于列表类型的数据，将其转换为字符串再搜索
-                        self.logger.info(f"列 '{col}' 包含列表类型数据，使用自定义搜索方法")
-                        # 使用原生Python方法处理列表数据
-                        expanded_data = []
-                        for item in col_data:
-                            if isinstance(item, list):
-                                expanded_data.extend(item)
-                            else:
-                                expanded_data.append(item)
-                        col_data = expanded_data
-                        # 使用原生Python方法搜索
-                        col_mask = [search_text.lower() in str(x).lower() if x is not None else False 
-                                  for x in col_data]
-                    else:
-                        # 对于非列表类型的数据，使用常规方法
-                        # 使用原生Python方法搜索
-                        col_mask = [search_text.lower() in str(x).lower() if x is not None else False 
-                                  for x in col_data]
-                    
-                    if mask is None:
-                        mask = col_mask
-                    else:
-                        # 使用原生Python方法进行逻辑或操作
-                        mask = [m1 or m2 for m1, m2 in zip(mask, col_mask)]
-                except Exception as e:
-                    self.logger.warning(f"搜索列 '{col}' 时出错: {e}，跳过此列")
-            
-            # 应用过滤条件
-            if mask is not None:
+            # 在归一化文本缓存上匹配，不再逐列格式化原始数据
+            search_index = self._get_table_search_index()
+            if mode == "regex":
                 try:
-                    # 使用原生Python方法过滤数据
-                    filtered_data = []
-                    for i, include in enumerate(mask):
-                        if include and i < len(self.current_data.data):
-                            filtered_data.append(self.current_data.data[i])
-                    
-                    # 创建新的LightweightDataFrame
-                    from utils.lightweight_data import LightweightDataFrame
-                    filtered_df = LightweightDataFrame(filtered_data)
-                    filtered_df.columns = self.current_data.columns
-                    
-                    if not filtered_data:
-                        self.logger.info("搜索过滤未找到匹配记录")
-                        
-                except Exception as e:
-                    self.logger.error(f"应用过滤条件时出错: {e}，使用原始数据")
-                    filtered_df = self.current_data.copy()
+                    result = search_index.search_regex(search_text)
+                except re.error as e:
+                    self.logger.warning(f"正则表达式无效: {search_text}, {e}")
+                    # 正则无效时保持当前表格不变，允许用户继续输入
+                    self._last_search_key = None
+                    status.update(matched=0, error=str(e))
+                    return status
+            elif mode == "fuzzy":
+                # 模糊匹配结果按编辑距离排序，距离最小的行排在最前
+                result = search_index.search_fuzzy(search_text)
             else:
-                self.logger.warning("搜索过滤未能创建有效的过滤条件，显示所有数据")
-                filtered_df = self.current_data.copy()
-            
-            # 使用通用方法转换显示列名
-            display_columns = self._convert_to_display_columns(filtered_df.columns)
-            
-            # 添加详细的调试日志
-            self.logger.info(f"过滤后数据: 行数={len(filtered_df)}, 列数={len(filtered_df.columns)}")
-            self.logger.info(f"过滤后的列名: {list(filtered_df.columns)}")
-            self.logger.info(f"显示列名映射: {display_columns}")
-                
-            # 更新表格显示
-            if hasattr(self.view.factor_view, 'detail_view') and self.view.factor_view.detail_view:
-                # 获取当前层级的列配置
-                current_level = getattr(self.view.factor_view.detail_view, 'current_level', 'part')
-                columns = self.config_manager.get_data_table_columns(current_level, self.current_sub_factor)
-                
-                # 添加列配置的调试日志
-                self.logger.info(f"当前层级: {current_level}, 子因子: {self.current_sub_factor}")
-                self.logger.info(f"列配置: {columns}")
-                
-                # 确保传递正确的数据给表格
-                self.view.factor_view.detail_view.display_data_table(filtered_df, display_columns, columns)
-                self.logger.info(f"搜索过滤完成，找到 {len(filtered_df)} 条匹配记录")
+                result = search_index.search(search_text)
+            matched_rows = result.rows
+            completed = result.completed
+            
+            filtered_df = LightweightDataFrame([self.current_data.data[i] for i in matched_rows])
+            filtered_df.columns = self.current_data.columns
+            
+            if not matched_rows:
+                self.logger.info("搜索过滤未找到匹配记录")
+            if not completed:
+                self.logger.warning(f"搜索超出时间预算，仅显示部分结果 ({len(matched_rows)} 条)")
+            
+            self._display_filtered_data(filtered_df, self._to_display_matches(result, search_index.columns),
+                                        matched_rows)
+            self.logger.info(f"搜索过滤完成，找到 {len(filtered_df)} 条匹配记录")
+            status.update(matched=len(matched_rows), completed=completed)
+            return status
                 
         except Exception as e:
             self.logger.error(f"应用搜索过滤时出错: {e}")
+            return None
+    
+    def _to_display_matches(self, result, columns):
+        """将索引命中位置转换为过滤后表格中的 (行, 列名, (起始, 结束))"""
+        display_rows = {row_idx: i for i, row_idx in enumerate(result.rows)}
+        return [(display_rows[row_idx], columns[col_idx], span)
+                for row_idx, col_idx, span in result.positions
+                if row_idx in display_rows]
+
+    def _display_filtered_data(self, filtered_df, matches=None, rows=None):
+        """将过滤后的数据显示到详情视图的表格中，并高亮命中的单元格
+
+        Args:
+            filtered_df: 过滤后的数据帧
+            matches: 命中单元格位置
+            rows: 过滤结果在当前数据帧中的行号，None表示显示全部数据
+        """
+        # 更新表格显示
+        if hasattr(self.view.factor_view, 'detail_view') and self.view.factor_view.detail_view:
+            # 获取当前层级的投影计划
+            current_level = getattr(self.view.factor_view.detail_view, 'current_level', 'part')
+            plan = self.config_manager.get_projection_plan(current_level, self.current_sub_factor)
+            columns = list(plan.columns)
+            display_columns = {col: plan.display_columns.get(col, self.config_manager.get_display_name(col))
+                               for col in filtered_df.columns}
+            # 列长度统计按行号取子集，不重新格式化单元格
+            width_stats = self._get_column_width_stats()
+            if rows is not None:
+                width_stats = width_stats.subset(rows)
+            self.view.factor_view.detail_view.display_data_table(filtered_df, display_columns, columns, width_stats,
+                                                                 plan=plan)
+            self.view.factor_view.detail_view.highlight_matches(matches or [])
     
     def reload_config(self):
-        """重新加载配置文件"""
+        """重新加载配置文件，配置差异保存在last_config_diff中"""
         try:
-            # 保存旧配置和配置文件路径
-            old_config = self.config_manager.config.copy() if hasattr(self.config_manager, 'config') else {}
+            # 保存旧配置和配置文件路径；重新加载会整体替换配置字典，旧字典不会被修改
+            old_config = self.config_manager.config or {}
+            old_version = self.config_manager.config_version
             config_path = self.config_manager.config_path
             
             # 重新加载配置文件
             if config_path:
                 self.config_manager.reload_config()
+                if hasattr(self, 'config_watcher'):
+                    self.config_watcher.mark_current()
                 # 同时更新数据管理器的配置管理器引用
                 self.data_manager.config_manager = self.config_manager
+                budget = self.config_manager.get_cache_memory_budget_mb()
+                if budget:
+                    self.data_manager.result_cache.set_memory_budget(budget)
+                
+                # 只释放受配置变化影响的缓存：列配置变化的子因子（默认表格列变化时为全部子因子）
+                # 的数据帧和搜索索引，层级节点列表与配置无关，全部保留
+                diff = ConfigDiff(old_config, self.config_manager.config)
+                self.last_config_diff = diff
+                self.logger.info(f"配置差异: {diff}")
+                self.data_manager.carry_over_cache(
+                    old_version, lambda key: key[2] is not None and diff.affects_factor(key[2]))
+                self._clear_level_frame_cache()
             else:
                 self.logger.warning("配置文件路径未设置，无法重新加载配置")
                 return False
@@ -403,6 +607,79 @@ class AppController:
             self.logger.error(f"重新加载配置失败: {e}")
             return False
     
+    def _on_config_file_changed(self, path):
+        """配置文件在磁盘上被修改后自动应用"""
+        self.logger.info(f"检测到配置文件变化: {path}")
+        self.apply_config_changes()
+    
+    def apply_config_changes(self):
+        """重新加载配置，按配置差异只刷新受影响的视图"""
+        try:
+            if not self.reload_config():
+                return False
+            diff = self.last_config_diff
+            if diff is None or diff.is_empty:
+                self.logger.info("配置内容未变化，无需刷新视图")
+                return True
+            
+            factor_view = self.view.factor_view
+            detail_view = getattr(factor_view, 'detail_view', None)
+            
+            if diff.categories_changed:
+                # 分类或子因子组成变化，重建分类和子因子列表（会重新选择子因子）
+                factor_view.setup_tabs(self.config_manager.get_factor_categories())
+            else:
+                if diff.display_names:
+                    # 子因子显示名称可能变化，只更新列表文本
+                    factor_view.refresh_subfactor_names()
+                
+                if self.current_sub_factor and detail_view:
+                    if self._is_sub_factor_affected(diff, self.current_sub_factor):
+                        self.logger.info(f"刷新当前子因子: {self.current_sub_factor}")
+                        # 数据帧可能来自缓存（同一对象），需要强制重绘表头和列
+                        detail_view.invalidate_table()
+                        self.on_sub_factor_select(self.current_sub_factor)
+            
+            document_fields = self.config_manager.get_document_info_fields()
+            if diff.document_info_changed or diff.affects_fields(document_fields):
+                self._refresh_document_info()
+            
+            if diff.other_keys:
+                self.logger.info(f"其他配置项已变化: {sorted(diff.other_keys)}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"应用配置变化时出错: {e}")
+            return False
+    
+    def _is_sub_factor_affected(self, diff, sub_factor):
+        """检查配置差异是否影响子因子的基本信息、层级或表格列"""
+        if diff.levels_changed or diff.affects_factor(sub_factor):
+            return True
+        if not diff.display_names:
+            return False
+        fields = list(self.config_manager.get_sub_factor_basic_info(sub_factor))
+        for level in self.config_manager.get_enabled_hierarchy_levels():
+            fields.extend(self.config_manager.get_data_table_columns(level, sub_factor))
+        return diff.affects_fields(fields)
+    
+    def _refresh_document_info(self):
+        """按当前配置重新显示单据基本信息"""
+        if hasattr(self.data_manager, 'data') and self.data_manager.data:
+            doc_info_fields = self.config_manager.get_document_info_fields()
+            doc_info = self.data_manager.get_document_info(doc_info_fields)
+            
+            # 获取字段显示名称
+            display_info = {}
+            for field, value in doc_info.items():
+                display_name = self.config_manager.get_display_name(field)
+                display_info[display_name] = value
+            
+            self.view.doc_info_view.display_info(display_info)
+        else:
+            # 如果没有数据，显示默认信息
+            self.view.doc_info_view.show_default_info()
+    
     def refresh_view(self):
         """刷新视图 - 重新加载当前数据和配置"""
         try:
@@ -414,23 +691,13 @@ class AppController:
             # 如果有当前选中的子因子，重新加载其数据
             if self.current_sub_factor:
                 self.logger.info(f"重新加载子因子数据: {self.current_sub_factor}")
+                detail_view = getattr(self.view.factor_view, 'detail_view', None)
+                if detail_view:
+                    detail_view.invalidate_table()
                 self.on_sub_factor_select(self.current_sub_factor)
             
             # 重新显示单据基本信息
-            if hasattr(self.data_manager, 'data') and self.data_manager.data:
-                doc_info_fields = self.config_manager.get_document_info_fields()
-                doc_info = self.data_manager.get_document_info(doc_info_fields)
-                
-                # 获取字段显示名称
-                display_info = {}
-                for field, value in doc_info.items():
-                    display_name = self.config_manager.get_display_name(field)
-                    display_info[display_name] = value
-                
-                self.view.doc_info_view.display_info(display_info)
-            else:
-                # 如果没有数据，显示默认信息
-                self.view.doc_info_view.show_default_info()
+            self._refresh_document_info()
             
             self.logger.info("视图刷新完成")
             
@@ -1,7 +1,7 @@
 # Models package
 # 数据模型相关类
 
-from .config_manager import ConfigManager
+from .config_manager import ConfigManager, ConfigDiff, ProjectionPlan
 from .data_manager import DataManager
 
-__all__ = ['ConfigManager', 'DataManager']
\ No newline at end of file
+__all__ = ['ConfigManager', 'ConfigDiff', 'ProjectionPlan', 'DataManager']
\ No newline at end of file
@@ -1,15 +1,28 @@
 import json
 import os
 import logging
+from types import MappingProxyType
 from utils.validation_utils import ValidationUtils
+from utils.table_provider import format_cell_value, CELL_FORMATTERS
+from utils.config_cache import CompiledConfigCache
 
 
 class ConfigManager:
     """配置管理器，负责加载和管理应用配置"""
     
+    # 索引构建代码的版本，首次加载配置时计算
+    _INDEX_CODE_VERSION = None
+    
     def __init__(self, config_path=None):
         self.config = None
         self.config_path = config_path
+        # 配置版本号，每次成功加载后递增，派生结果缓存以此为键
+        self.config_version = 0
+        # 加载配置时预先构建的查找索引
+        self._factor_index = {}  # 子因子名称 -> 子因子配置
+        self._column_index = {}  # (子因子名称, 层级) -> 列配置
+        self._display_name_index = {}  # 字段名 -> 显示名称
+        self._projection_plans = {}  # (子因子名称, 层级) -> 表格投影计划
         if config_path:
             self.load_config(config_path)
     
@@ -28,12 +41,30 @@ class ConfigManager:
                 logging.error(error_msg)
                 raise PermissionError(error_msg)
             
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
+            with open(config_path, 'rb') as f:
+                content = f.read()
             
-            # 验证配置结构
-            self._validate_config()
+            # 配置文件内容未变化时直接使用编译缓存中的配置和索引
+            cache = CompiledConfigCache(config_path, self._index_code_version())
+            content_hash = cache.content_hash(content)
+            compiled = cache.load(content_hash)
+            if compiled is not None:
+                self.config = compiled["config"]
+                self._factor_index, self._column_index, self._display_name_index = compiled["indexes"]
+                logging.info("使用编译配置缓存")
+            else:
+                self.config = json.loads(content.decode('utf-8'))
+                
+                # 验证配置结构
+                self._validate_config()
+                self._build_indexes()
+                # 配置字典加载后不再修改，在后台线程写入缓存，不占用加载时间
+                cache.save_async(content_hash, config=self.config,
+                                 indexes=(self._factor_index, self._column_index, self._display_name_index))
+            # 投影计划在首次使用时按新配置编译
+            self._projection_plans = {}
             self.config_path = config_path
+            self.config_version += 1
             logging.info(f"成功加载配置文件: {config_path}")
             
         except json.JSONDecodeError as e:
@@ -58,6 +89,54 @@ class ConfigManager:
     
 
     
+    @classmethod
+    def _index_code_version(cls):
+        """索引构建代码的版本，代码变化后编译缓存自动失效"""
+        if cls._INDEX_CODE_VERSION is None:
+            cls._INDEX_CODE_VERSION = CompiledConfigCache.code_version_of(cls._build_indexes)
+        return cls._INDEX_CODE_VERSION
+    
+    def _build_indexes(self):
+        """构建子因子、列配置和显示名称的查找索引，查询时不再遍历配置"""
+        factor_index = {}
+        column_index = {}
+        for factors in self.get_factor_categories().values():
+            for factor in factors:
+                name = factor.get('name')
+                # 与原先的顺序查找一致，同名子因子以第一个为准
+                if name in factor_index:
+                    continue
+                factor_index[name] = factor
+                table_info = factor.get('table_info', {})
+                if isinstance(table_info, dict):
+                    for level, columns in table_info.items():
+                        column_index[(name, level)] = columns
+        
+        display_name_index = {}
+        for field_name, field_config in self.get_display_names().items():
+            # 兼容新旧配置格式
+            if isinstance(field_config, dict):
+                display_name_index[field_name] = field_config.get('display_name', field_name)
+            else:
+                display_name_index[field_name] = field_config
+        
+        # 整体替换，后台线程读取时不会看到构建了一半的索引
+        self._factor_index = factor_index
+        self._column_index = column_index
+        self._display_name_index = display_name_index
+    
+    def _compile_projection_plan(self, factor_name, level, columns, version):
+        """按当前配置编译表格投影计划"""
+        display_names = self.get_display_names()
+        columns = [col for col in columns if isinstance(col, str)]
+        dtype_hints = []
+        for col in columns:
+            field_config = display_names.get(col)
+            dtype_hints.append(field_config.get('dtype') if isinstance(field_config, dict) else None)
+        return ProjectionPlan(factor_name, level, columns,
+                              [self._display_name_index.get(col, col) for col in columns],
+                              dtype_hints, version)
+    
     def get_document_info_fields(self):
         """获取文档信息字段列表"""
         if not self.config:
@@ -78,15 +157,7 @@ class ConfigManager:
     
     def get_display_name(self, field_name):
         """获取单个字段的显示名称"""
-        display_names = self.get_display_names()
-        field_config = display_names.get(field_name, field_name)
-        
-        # 兼容新旧配置格式
-        if isinstance(field_config, dict):
-            return field_config.get('display_name', field_name)
-        else:
-            # 兼容旧格式
-            return field_config
+        return self._display_name_index.get(field_name, field_name)
     
     def get_field_scope(self, field_name):
         """获取字段的作用范围，返回列表"""
@@ -132,14 +203,11 @@ class ConfigManager:
         if not self.config:
             return []
         
-        # 从因子分类中查找子因子的配置
-        factor_categories = self.get_factor_categories()
-        for category, factors in factor_categories.items():
-            for factor in factors:
-                if factor.get('name') == sub_factor_name:
-                    return factor.get('basic_info', [])
-        
-        return []
+        # 从子因子索引中查找子因子的配置
+        factor = self._factor_index.get(sub_factor_name)
+        if factor is None:
+            return []
+        return factor.get('basic_info', [])
     
     def get_default_hierarchy_level(self):
         """获取默认层次级别"""
@@ -154,17 +222,44 @@ class ConfigManager:
         
         # 如果指定了因子名称和层级，尝试获取因子特定的列配置
         if factor_name and level:
-            factor_categories = self.get_factor_categories()
-            for category, factors in factor_categories.items():
-                for factor in factors:
-                    if factor.get('name') == factor_name:
-                        table_info = factor.get('table_info', {})
-                        if isinstance(table_info, dict) and level in table_info:
-                            return table_info[level]
+            columns = self._column_index.get((factor_name, level))
+            if columns is not None:
+                return columns
         
         # 返回默认表格列配置
         return self.config.get('table_columns', [])
     
+    def get_projection_plan(self, level=None, factor_name=None):
+        """获取子因子在指定层级的表格投影计划，与get_data_table_columns的列一致
+        
+        计划在首次使用时编译，配置版本变化前每次渲染都复用同一个计划。
+        """
+        # 重新加载配置会整体替换计划字典，编译结果只写入本次取到的字典
+        plans = self._projection_plans
+        plan = plans.get((factor_name, level))
+        if plan is None:
+            # 没有子因子专用列配置时使用默认表格列
+            plan = self._compile_projection_plan(factor_name, level, self.get_data_table_columns(level, factor_name),
+                                                 self.config_version)
+            plans[(factor_name, level)] = plan
+        return plan
+    
+    def get_cache_memory_budget_mb(self):
+        """获取派生结果缓存的内存预算（MB），未配置时返回None使用默认值"""
+        if not self.config:
+            return None
+        return self.config.get('cache_memory_budget_mb')
+    
+    def get_table_paging(self):
+        """获取表格分页设置 {"enabled": 是否默认分页显示, "page_size": 每页行数}"""
+        paging = self.config.get('table_paging', {}) if self.config else {}
+        if not isinstance(paging, dict):
+            paging = {}
+        return {
+            "enabled": bool(paging.get('enabled', False)),
+            "page_size": paging.get('page_size') or 200,
+        }
+    
     def get_hierarchy_levels(self):
         """获取层次级别配置"""
         if not self.config:
@@ -210,4 +305,108 @@ class ConfigManager:
     
     def _safe_get_value(self, data, key, default=""):
         """安全获取字典值的通用方法"""
-        return ValidationUtils.safe_get_value(data, key, default)
\ No newline at end of file
+        return ValidationUtils.safe_get_value(data, key, default)
+
+class ConfigDiff:
+    """两份配置之间的结构差异，用于只刷新受影响的视图和缓存"""
+    
+    # 影响数据层次选择的配置项
+    LEVEL_KEYS = ('enabled_hierarchy_levels', 'default_hierarchy_level',
+                  'data_hierarchy_names', 'hierarchy_levels')
+    # 单独比较的配置项，其余配置项只记录名称
+    STRUCTURE_KEYS = ('display_names', 'factor_categories', 'document_info_fields', 'table_columns') + LEVEL_KEYS
+    
+    def __init__(self, old_config, new_config):
+        old_config = old_config or {}
+        new_config = new_config or {}
+        
+        # 显示名称：新增、删除或内容变化的字段
+        old_names = old_config.get('display_names', {}) or {}
+        new_names = new_config.get('display_names', {}) or {}
+        self.display_names = {field for field in set(old_names) | set(new_names)
+                              if old_names.get(field) != new_names.get(field)}
+        
+        # 子因子：新增、删除或配置（基本信息、各层级列）变化的子因子
+        old_factors, old_layout = self._factor_layout(old_config)
+        new_factors, new_layout = self._factor_layout(new_config)
+        self.factors = {name for name in set(old_factors) | set(new_factors)
+                        if old_factors.get(name) != new_factors.get(name)}
+        # 分类或分类内子因子的组成、顺序变化
+        self.categories_changed = old_layout != new_layout
+        
+        self.document_info_changed = (old_config.get('document_info_fields') !=
+                                      new_config.get('document_info_fields'))
+        self.levels_changed = any(old_config.get(key) != new_config.get(key) for key in self.LEVEL_KEYS)
+        # 默认表格列是没有专用列配置的子因子和层级的回退列，变化时视为影响所有子因子
+        self.default_columns_changed = old_config.get('table_columns') != new_config.get('table_columns')
+        self.other_keys = {key for key in set(old_config) | set(new_config)
+                           if key not in self.STRUCTURE_KEYS and old_config.get(key) != new_config.get(key)}
+    
+    @staticmethod
+    def _factor_layout(config):
+        factors = {}
+        layout = []
+        categories = config.get('factor_categories', {}) or {}
+        for category, category_factors in categories.items():
+            names = []
+            for factor in category_factors:
+                name = factor.get('name')
+                names.append(name)
+                factors.setdefault(name, factor)
+            layout.append((category, names))
+        return factors, layout
+    
+    @property
+    def is_empty(self):
+        return not (self.display_names or self.factors or self.categories_changed or
+                    self.document_info_changed or self.levels_changed or self.default_columns_changed or
+                    self.other_keys)
+    
+    def affects_factor(self, factor_name):
+        """检查子因子的表格列是否可能变化（子因子配置或默认表格列变化）"""
+        return self.default_columns_changed or factor_name in self.factors
+    
+    def affects_fields(self, fields):
+        """检查指定字段中是否有显示名称发生变化"""
+        return any(field in self.display_names for field in fields)
+    
+    def __repr__(self):
+        return (f"ConfigDiff(显示名称={len(self.display_names)}, 子因子={sorted(self.factors)}, "
+                f"分类={self.categories_changed}, 单据信息={self.document_info_changed}, "
+                f"层级={self.levels_changed}, 默认表格列={self.default_columns_changed}, "
+                f"其他={sorted(self.other_keys)})")
+
+
+class ProjectionPlan:
+    """子因子在某一层级的表格投影计划
+    
+    包含要提取的列、列标题、字段到显示名称的映射、类型提示和每列的格式化函数。
+    计划编译后不可修改，可以在渲染和后台线程之间共享。
+    """
+    
+    __slots__ = ('factor_name', 'level', 'columns', 'headers', 'display_columns',
+                 'dtype_hints', 'formatters', 'version')
+    
+    def __init__(self, factor_name, level, columns, headers, dtype_hints, version):
+        set_attr = object.__setattr__
+        set_attr(self, 'factor_name', factor_name)
+        set_attr(self, 'level', level)
+        set_attr(self, 'columns', tuple(columns))
+        set_attr(self, 'headers', tuple(headers))
+        set_attr(self, 'display_columns', MappingProxyType(dict(zip(columns, headers))))
+        set_attr(self, 'dtype_hints', tuple(dtype_hints))
+        set_attr(self, 'formatters', tuple(CELL_FORMATTERS.get(hint, format_cell_value) for hint in dtype_hints))
+        set_attr(self, 'version', version)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("投影计划不可修改")
+    
+    def extract(self, node):
+        """从数据节点中提取计划中的列，缺失的字段为空字符串"""
+        if not isinstance(node, dict):
+            return None
+        get = node.get
+        return {col: get(col, "") for col in self.columns}
+    
+    def __repr__(self):
+        return f"ProjectionPlan({self.factor_name}/{self.level}, 列={len(self.columns)}, 版本={self.version})"
@@ -3,9 +3,12 @@ import os
 import logging
 import psutil
 import gc
-from functools import lru_cache
+import sys
 from utils.validation_utils import ValidationUtils
 from utils.lightweight_data import pd
+from utils.search_index import DocumentSearchIndex
+from utils.cache_manager import CacheManager
+from utils.field_catalog import FieldCatalogBuilder
 
 
 class DataManager:
@@ -15,6 +18,13 @@ class DataManager:
         self.data = None
         self.data_path = None
         self.config_manager = config_manager
+        self._search_index = None
+        # 单据标识，每次成功加载数据后递增，派生结果缓存以此为键
+        self.document_id = 0
+        budget = config_manager.get_cache_memory_budget_mb() if config_manager else None
+        self.result_cache = CacheManager(budget)
+        # 字段目录在数据加载后由后台线程构建
+        self.field_catalog_builder = FieldCatalogBuilder()
     
     def _validate_input(self, value, expected_type, name="参数"):
         """通用输入验证方法"""
@@ -32,6 +42,9 @@ class DataManager:
     
     def load_data(self, data_path):
         """加载数据文件，包含错误处理"""
+        # 数据变化后旧的全局搜索索引失效
+        self._search_index = None
+        self.field_catalog_builder.cancel()
         try:
             # 检查数据文件是否存在
             if not os.path.exists(data_path):
@@ -52,6 +65,11 @@ class DataManager:
             # 验证数据结构
             self._validate_data()
             self.data_path = data_path
+            # 新单据的派生结果使用新的单据标识，旧结果不再可用，直接释放
+            self.document_id += 1
+            self.result_cache.clear()
+            # 后台扫描新单据的字段目录，供配置界面提示字段名
+            self.field_catalog_builder.start(self.get_calculate_item_vo())
             logging.info(f"成功加载数据文件: {data_path}")
             
         except FileNotFoundError as e:
@@ -134,8 +152,12 @@ class DataManager:
             return None
         return self.data.get('calculateItemVO')
 
-    def get_data_for_level(self, nodes, columns, chunk_size=1000):
-        """获取指定层级的数据，包含输入验证和内存优化"""
+    def get_data_for_level(self, nodes, columns, chunk_size=1000, plan=None):
+        """获取指定层级的数据，包含输入验证和内存优化
+        
+        Args:
+            plan: 表格投影计划，提供时使用计划预编译的列提取
+        """
         # 输入验证
         if not self._validate_input(nodes, (list, tuple), "节点列表"):
             return pd.DataFrame()
@@ -155,7 +177,7 @@ class DataManager:
             # 对于大数据集，使用分块处理
             if len(nodes) > chunk_size:
                 logging.info(f"大数据集检测到 ({len(nodes)} 节点)，使用分块处理")
-                return self._process_large_dataset(nodes, columns, chunk_size)
+                return self._process_large_dataset(nodes, columns, chunk_size, plan)
             
             # 小数据集直接处理
             records = []
@@ -164,6 +186,9 @@ class DataManager:
                     logging.warning(f"节点 {i} 不是字典类型，跳过")
                     continue
                 
+                if plan is not None:
+                    records.append(plan.extract(node))
+                    continue
                 record = {}
                 for col in columns:
                     if isinstance(col, str):
@@ -199,6 +224,33 @@ class DataManager:
         # This is a simplified example. In a real scenario, you might need to find the specific sub-factor node.
         return {field: self.data.get(field) for field in fields}
 
+    def get_field_catalog(self):
+        """获取当前单据的字段目录，后台扫描尚未完成时返回None"""
+        return self.field_catalog_builder.catalog
+    
+    def get_search_index(self):
+        """获取整单全局搜索索引，数据加载后首次调用时构建一次"""
+        if self._search_index is None:
+            root_node = self.get_calculate_item_vo()
+            if root_node is None:
+                return None
+            index = DocumentSearchIndex()
+            index.build(root_node)
+            self._search_index = index
+        return self._search_index
+
+    def search_document(self, query, max_hits_per_level=200):
+        """在整单所有层级的所有字段中搜索
+
+        Returns:
+            按层级分组的搜索结果，数据未加载时返回空字典
+        """
+        index = self.get_search_index()
+        if index is None:
+            logging.warning("数据未加载，无法进行全局搜索")
+            return {}
+        return index.search(query, max_hits_per_level)
+
     def get_all_nodes_for_level(self, start_node, target_level):
         """递归查找指定层级的所有节点，包含输入验证和边界检查"""
         logger = logging.getLogger('CalcAnyApp')
@@ -340,7 +392,7 @@ class DataManager:
             logging.warning(f"数字列转换为decimal类型失败: {e}")
             return df
     
-    def _process_large_dataset(self, nodes, columns, chunk_size):
+    def _process_large_dataset(self, nodes, columns, chunk_size, plan=None):
         """分块处理大数据集"""
         try:
             dataframes = []
@@ -355,6 +407,9 @@ class DataManager:
                 
                 for node in chunk_nodes:
                     if isinstance(node, dict):
+                        if plan is not None:
+                            chunk_records.append(plan.extract(node))
+                            continue
                         record = {col: self._safe_get_value(node, col) for col in columns if isinstance(col, str)}
                         chunk_records.append(record)
                 
@@ -387,13 +442,56 @@ class DataManager:
             logging.error(f"大数据集处理失败: {e}")
             return pd.DataFrame()
     
-    @lru_cache(maxsize=128)
-    def get_cached_hierarchy_levels(self):
-        """缓存的层次级别获取方法"""
-        return self.get_hierarchy_levels()
+    def make_cache_key(self, kind, factor=None, level=None):
+        """生成派生结果缓存键 (单据标识, 配置版本, 因子, 层级, 结果类型)"""
+        config_version = self.config_manager.config_version if self.config_manager else 0
+        return (self.document_id, config_version, factor, level, kind)
+    
+    def get_cached_nodes_for_level(self, level):
+        """获取指定层级的节点列表，结果按单据缓存"""
+        key = self.make_cache_key("nodes", level=level)
+        nodes = self.result_cache.get(key)
+        if nodes is None:
+            root_node = self.get_calculate_item_vo()
+            if root_node is None:
+                return []
+            nodes = self.get_all_nodes_for_level(root_node, level)
+            # 节点本身属于已加载的单据，缓存只新增列表本身的内存
+            self.result_cache.put(key, nodes, size=sys.getsizeof(nodes))
+        return nodes
+    
+    def purge_stale_cache(self):
+        """释放单据或配置版本已变化的缓存条目"""
+        current = self.make_cache_key(None)[:2]
+        removed = self.result_cache.invalidate(lambda key: key[:2] != current)
+        if removed:
+            logging.info(f"已释放 {removed} 个过期缓存条目")
+        return removed
+    
+    def carry_over_cache(self, old_config_version, is_affected):
+        """配置重新加载后，把不受配置变化影响的缓存条目迁移到新配置版本
+
+        Args:
+            old_config_version: 重新加载前的配置版本
+            is_affected: is_affected(键) 为True的条目需要按新配置重新构建，直接释放
+        """
+        document_id, config_version = self.make_cache_key(None)[:2]
+        
+        def mapper(key):
+            if key[0] != document_id or key[1] != old_config_version or is_affected(key):
+                return None
+            return (document_id, config_version) + key[2:]
+        
+        removed = self.result_cache.rekey(mapper)
+        logging.info(f"配置变化后保留 {len(self.result_cache)} 个缓存条目，释放 {removed} 个")
+        return removed
+    
+    def get_cache_stats(self):
+        """获取派生结果缓存的命中率和内存统计"""
+        return self.result_cache.stats()
     
     def clear_cache(self):
         """清理缓存"""
-        self.get_cached_hierarchy_levels.cache_clear()
+        self.result_cache.clear()
         gc.collect()
         logging.info("缓存已清理")
\ No newline at end of file
@@ -41,8 +41,8 @@ excluded_modules = [
     # 国际化（保留locale，subprocess需要）
     'gettext',
     
-    # 其他不常用的标准库模块
-    'turtle', 'tkinter.dnd', 'tkinter.colorchooser', 'tkinter.font',
+    # 其他不常用的标准库模块（保留tkinter.font，表格列宽按字体测量文本宽度）
+    'turtle', 'tkinter.dnd', 'tkinter.colorchooser',
     'calendar', 'cmd', 'code', 'codeop', 'compileall',
 ]
 
@@ -69,6 +69,7 @@ a = Analysis(
         'tkinter.messagebox',
         'tkinter.filedialog',
         'tkinter.simpledialog',
+        'tkinter.font',  # 表格列宽测量
         
         # 必需的第三方依赖
         'psutil',
@@ -96,6 +97,19 @@ a = Analysis(
         'utils.clipboard_utils',
         'utils.logging_utils',
         'utils.lightweight_data',
+        'utils.cache_manager',
+        'utils.column_stats',
+        'utils.config_cache',
+        'utils.config_journal',
+        'utils.display_name_import',
+        'utils.field_catalog',
+        'utils.field_reference_index',
+        'utils.file_watcher',
+        'utils.fuzzy_index',
+        'utils.search_index',
+        'utils.table_provider',
+        'utils.ui_scheduler',
+        'utils.widget_pool',
     ],
     hookspath=[],
     hooksconfig={
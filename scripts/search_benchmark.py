@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索性能基准测试
+生成与sample.json部件层节点结构一致的数据帧，回放真实的逐键输入序列，
+统计AppController.apply_search_filter在各搜索模式下每次按键的延迟与内存分配，
+结果以JSON输出，便于不同版本之间对比。
+
+用法:
+    python scripts/search_benchmark.py --sizes 1000,10000 --output bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from types import SimpleNamespace
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from utils.lightweight_data import LightweightDataFrame
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_STRATEGIES = ["substring", "regex", "fuzzy"]
+DEFAULT_COLUMNS = [
+    "partCode", "productName", "partDesc", "boqName", "modelName",
+    "partQty", "unitPrice", "totalPrice", "grossProfit", "key",
+]
+
+
+def get_project_root():
+    """获取项目根目录"""
+    return PROJECT_ROOT
+
+
+def load_part_template():
+    """从sample.json中取第一个部件层节点作为数据模板"""
+    sample_path = os.path.join(get_project_root(), 'sample.json')
+    try:
+        with open(sample_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    stack = [data.get('calculateItemVO') or {}]
+    while stack:
+        node = stack.pop()
+        if node.get('calcLevel') == 'part':
+            return node
+        stack.extend(child for child in node.get('subList') or [] if isinstance(child, dict))
+    return {}
+
+
+def generate_frame(row_count, columns=None, seed=0):
+    """生成指定行数的部件层数据帧
+
+    部件编码、产品名称、描述等字符串列的取值分布模拟真实单据：
+    编码基本唯一，产品名称和BOQ名称来自有限集合，数字列为Decimal。
+    """
+    columns = columns or DEFAULT_COLUMNS
+    template = load_part_template()
+    rng = random.Random(seed)
+
+    base_product = str(template.get('productName', '5885H V5'))
+    base_boq = str(template.get('boqName', 'POC_服务_korea'))
+    base_desc = str(template.get('partDesc', '服务器硬盘保留服务'))[:80]
+    product_names = [f"{base_product[:-1]}{i}" for i in range(1, 40)]
+    boq_names = [f"{base_boq}_{i:03d}" for i in range(200)]
+    descriptions = [f"{base_desc}_{i}月" for i in range(12, 73, 12)]
+    suffix_chars = "ABHRTX"
+
+    records = []
+    for i in range(row_count):
+        part_code = f"{rng.randint(0, 99999):05d}{''.join(rng.choice(suffix_chars) for _ in range(3))}"
+        product_name = rng.choice(product_names)
+        values = {
+            "partCode": part_code,
+            "productName": product_name,
+            "partDesc": rng.choice(descriptions),
+            "boqName": rng.choice(boq_names),
+            "modelName": product_name,
+            "partQty": Decimal(rng.randint(1, 500)),
+            "unitPrice": Decimal(f"{rng.uniform(1, 100000):.2f}"),
+            "totalPrice": Decimal(f"{rng.uniform(1, 5000000):.4f}"),
+            "grossProfit": Decimal(f"{rng.uniform(-10000, 500000):.6f}"),
+            "key": f"partId_{2500000 + i}",
+        }
+        record = {}
+        for col in columns:
+            if col in values:
+                record[col] = values[col]
+            else:
+                value = template.get(col, "")
+                record[col] = Decimal(str(value)) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+        records.append(record)
+
+    df = LightweightDataFrame(records)
+    df.columns = list(columns)
+    return df
+
+
+def build_keystroke_sequences(df, seed=0):
+    """根据数据帧生成各搜索模式的逐键输入序列
+
+    模拟用户逐字输入部件编码、输错后退格重输的过程；
+    视图层在非正则模式下会把输入转为小写，这里保持一致。
+    """
+    rng = random.Random(seed)
+    target = df.data[rng.randrange(len(df.data))] if df.data else {"partCode": "88136TRH"}
+    code = str(target.get("partCode", "88136TRH"))
+
+    def typing(text):
+        steps = [text[:i] for i in range(1, len(text) + 1)]
+        # 删除最后三个字符再重新输入
+        steps += [text[:i] for i in range(len(text) - 1, len(text) - 4, -1)]
+        steps += [text[:i] for i in range(len(text) - 2, len(text) + 1)]
+        return steps
+
+    typo_code = code[:2] + code[3] + code[2] + code[4:] if len(code) > 4 else code
+    return {
+        "substring": [text.lower() for text in typing(code)],
+        "regex": typing(f"^{code[:3]}\\d*{code[-2:]}$"),
+        "fuzzy": [text.lower() for text in typing(typo_code)],
+    }
+
+
+def make_headless_controller(df):
+    """创建不带窗口的控制器，只用于驱动apply_search_filter
+
+    详情视图为None时控制器只完成过滤和结果数据帧构建，不触发表格渲染。
+    """
+    from controllers.app_controller import AppController
+    from models.config_manager import ConfigManager
+
+    controller = AppController.__new__(AppController)
+    controller.logger = logging.getLogger('CalcAnyBenchmark')
+    controller.logger.setLevel(logging.ERROR)
+    controller.config_manager = ConfigManager(os.path.join(get_project_root(), 'config', 'config.json'))
+    controller.view = SimpleNamespace(factor_view=SimpleNamespace(detail_view=None))
+    controller.current_sub_factor = None
+    controller.current_data = df
+    return controller
+
+
+def percentile(values, pct):
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def replay(controller, keystrokes, strategy, trace_allocations=False):
+    """回放一组按键，返回每次按键的耗时（毫秒）或峰值内存分配（KB）"""
+    samples = []
+    for text in keystrokes:
+        # 与视图层一致：每次按键都是新的搜索条件
+        controller._last_search_key = None
+        if trace_allocations:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            controller.apply_search_filter("part", text, strategy)
+            _, peak = tracemalloc.get_traced_memory()
+            samples.append(max(0, peak - current) / 1024)
+        else:
+            start = time.perf_counter()
+            controller.apply_search_filter("part", text, strategy)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def benchmark_size(row_count, strategies, columns=None, seed=0):
+    """对单个数据规模运行所有搜索模式"""
+    start = time.perf_counter()
+    df = generate_frame(row_count, columns, seed)
+    generate_ms = (time.perf_counter() - start) * 1000
+
+    sequences = build_keystroke_sequences(df, seed)
+    controller = make_headless_controller(df)
+
+    # 表格搜索索引在首次搜索时构建，单独计时
+    start = time.perf_counter()
+    controller._get_table_search_index()
+    index_build_ms = (time.perf_counter() - start) * 1000
+
+    results = []
+    for strategy in strategies:
+        keystrokes = sequences.get(strategy, sequences["substring"])
+        latencies = replay(controller, keystrokes, strategy)
+
+        tracemalloc.start()
+        allocations = replay(controller, keystrokes, strategy, trace_allocations=True)
+        tracemalloc.stop()
+
+        steady = latencies[1:] or latencies
+        results.append({
+            "rows": row_count,
+            "strategy": strategy,
+            "keystrokes": len(keystrokes),
+            "generate_ms": round(generate_ms, 3),
+            "index_build_ms": round(index_build_ms, 3),
+            "first_keystroke_ms": round(latencies[0], 3) if latencies else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(steady, 50), 3),
+                "p95": round(percentile(steady, 95), 3),
+                "max": round(max(steady), 3) if steady else 0.0,
+            },
+            "alloc_peak_kb": {
+                "p50": round(percentile(allocations, 50), 1),
+                "p95": round(percentile(allocations, 95), 1),
+            },
+        })
+        print(f"[INFO] {row_count} 行 / {strategy}: p50={results[-1]['latency_ms']['p50']}ms "
+              f"p95={results[-1]['latency_ms']['p95']}ms", file=sys.stderr)
+    return results
+
+
+def run_benchmark(sizes=None, strategies=None, columns=None, seed=0):
+    """运行完整基准测试，返回可JSON序列化的结果字典"""
+    sizes = sizes or DEFAULT_SIZES
+    strategies = strategies or DEFAULT_STRATEGIES
+    results = []
+    for row_count in sizes:
+        results.extend(benchmark_size(row_count, strategies, columns, seed))
+    return {
+        "benchmark": "search",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "columns": columns or DEFAULT_COLUMNS,
+        "results": results,
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="CalcAny 搜索性能基准测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="数据帧行数，逗号分隔（默认: 1000,10000,100000,1000000）")
+    parser.add_argument("--strategies", default=",".join(DEFAULT_STRATEGIES),
+                        help="搜索模式，逗号分隔（substring,regex,fuzzy）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", help="结果JSON输出文件，默认输出到标准输出")
+    args = parser.parse_args()
+
+    # 基准测试只关心耗时，屏蔽正则超时、无效表达式等预期内的告警日志
+    logging.getLogger().setLevel(logging.ERROR)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+
+    report = run_benchmark(sizes, strategies, seed=args.seed)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"[SUCCESS] 基准测试结果已写入: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
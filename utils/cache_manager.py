@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+结果缓存管理模块
+缓存层级节点列表、投影数据帧、搜索索引等派生结果，按估算内存占用做LRU淘汰
+"""
+
+import logging
+import sys
+import threading
+from collections import OrderedDict
+
+# 估算容器大小时的采样数量
+_SAMPLE_SIZE = 32
+# 估算嵌套对象大小时的最大递归深度和最多访问的对象数
+_MAX_DEPTH = 6
+_MAX_VISITS = 20000
+
+
+def _sampled_size(items, count, depth, seen):
+    """对容器元素采样估算大小，按元素数量外推"""
+    if count == 0:
+        return 0
+    sample = items[:_SAMPLE_SIZE] if isinstance(items, (list, tuple)) else list(items)[:_SAMPLE_SIZE]
+    total = sum(_estimate(item, depth + 1, seen) for item in sample)
+    return int(total * count / len(sample)) if sample else 0
+
+
+def _estimate(obj, depth, seen):
+    obj_id = id(obj)
+    if obj_id in seen:
+        return 0
+    seen.add(obj_id)
+
+    size = sys.getsizeof(obj, 64)
+    if (depth >= _MAX_DEPTH or len(seen) > _MAX_VISITS or obj is None or
+            isinstance(obj, (str, bytes, int, float, bool))):
+        return size
+
+    if isinstance(obj, dict):
+        size += _sampled_size(list(obj.keys()), len(obj), depth, seen)
+        size += _sampled_size(list(obj.values()), len(obj), depth, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += _sampled_size(obj if isinstance(obj, (list, tuple)) else list(obj), len(obj), depth, seen)
+    else:
+        # 普通对象按实例属性估算（包括__slots__）
+        attrs = getattr(obj, '__dict__', None)
+        if attrs is not None:
+            size += _estimate(attrs, depth + 1, seen)
+        for name in getattr(type(obj), '__slots__', ()):
+            value = getattr(obj, name, None)
+            if value is not None:
+                size += _estimate(value, depth + 1, seen)
+    return size
+
+
+def estimate_size(obj):
+    """粗略估算对象及其引用对象占用的字节数
+
+    大容器只采样前若干个元素再按数量外推，估算耗时与对象规模无关。
+    """
+    try:
+        return _estimate(obj, 0, set())
+    except Exception:
+        return sys.getsizeof(obj, 64)
+
+
+class CacheManager:
+    """派生结果缓存管理器
+
+    键通常为 (单据标识, 配置版本, 因子, 层级, 结果类型)，单据重新加载或配置变化后
+    旧键自然失效，并随LRU淘汰释放。每个条目记录估算字节数，总量超过内存预算时
+    淘汰最久未使用的条目。可在后台线程中使用。
+    """
+
+    DEFAULT_MEMORY_BUDGET_MB = 256
+
+    def __init__(self, memory_budget_mb=None):
+        self.memory_budget = int((memory_budget_mb or self.DEFAULT_MEMORY_BUDGET_MB) * 1024 * 1024)
+        self._entries = OrderedDict()  # 键 -> (值, 字节数)
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """获取缓存值，命中时移到最近使用位置"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            size: 字节数，None时自动估算；值只引用已有对象（如节点列表）时可传入实际新增的大小
+        """
+        if size is None:
+            size = estimate_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            if size > self.memory_budget:
+                logging.info(f"缓存条目超出内存预算，不缓存: {key} ({size / 1024 / 1024:.1f}MB)")
+                return value
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            self._evict()
+        return value
+
+    def get_or_build(self, key, builder, size=None):
+        """获取缓存值，未命中时调用builder()构建并写入缓存（结果为None时不缓存）"""
+        value = self.get(key)
+        if value is None:
+            value = builder()
+            if value is not None:
+                self.put(key, value, size)
+        return value
+
+    def invalidate(self, predicate=None):
+        """删除满足predicate(键)的条目，predicate为None时清空全部"""
+        with self._lock:
+            if predicate is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self.total_bytes = 0
+                return removed
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self.total_bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def rekey(self, mapper):
+        """按mapper(旧键)返回的新键重新登记条目，返回None的条目删除；LRU顺序保持不变"""
+        with self._lock:
+            entries = OrderedDict()
+            total = 0
+            for key, entry in self._entries.items():
+                new_key = mapper(key)
+                # 新键已存在（映射后重复）时保留先出现的条目
+                if new_key is not None and new_key not in entries:
+                    entries[new_key] = entry
+                    total += entry[1]
+            removed = len(self._entries) - len(entries)
+            self._entries = entries
+            self.total_bytes = total
+            return removed
+
+    def clear(self):
+        """清空缓存（统计数据保留）"""
+        return self.invalidate()
+
+    def set_memory_budget(self, memory_budget_mb):
+        """调整内存预算，超出部分立即淘汰"""
+        with self._lock:
+            self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+            self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.memory_budget and self._entries:
+            key, (_, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            logging.debug(f"缓存淘汰: {key} ({size / 1024:.1f}KB)")
+
+    def stats(self):
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "memory_budget": self.memory_budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
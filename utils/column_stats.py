@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+列宽统计模块
+在数据帧构建时统计各列显示文本长度，用于窗口缩放时快速计算列宽
+"""
+
+from array import array
+from collections import Counter
+from .table_provider import format_cell_value
+
+# 单个长度统计的上限，超出部分按上限计（列宽本身也有上限）
+MAX_DISPLAY_LENGTH = 255
+
+
+def display_length(text):
+    """计算文本的显示长度：中文等全角字符按2个单位计
+
+    利用UTF-8编码长度近似：ASCII字符1字节，中文3字节，(字符数+字节数)//2
+    恰好为ASCII计1、中文计2，避免逐字符判断。
+    """
+    if text.isascii():
+        return len(text)
+    return (len(text) + len(text.encode('utf-8'))) // 2
+
+
+class ColumnWidthStats:
+    """列显示长度统计
+
+    为每列保存逐行显示长度和长度直方图。过滤时按行号取子集，
+    无需重新格式化单元格；窗口缩放时直接读取最大值和百分位长度。
+    """
+
+    def __init__(self, lengths):
+        self.lengths = lengths  # 列名 -> array('H') 逐行显示长度
+        self.histograms = {col: Counter(values) for col, values in lengths.items()}
+
+    @classmethod
+    def from_frame(cls, df, columns=None, formatter=None):
+        """从数据帧构建统计"""
+        formatter = formatter or format_cell_value
+        columns = list(columns) if columns is not None else list(df.columns)
+        rows = df.data
+        lengths = {}
+        for col in columns:
+            values = [display_length(formatter(row.get(col))) for row in rows]
+            if values and max(values) > MAX_DISPLAY_LENGTH:
+                values = [min(length, MAX_DISPLAY_LENGTH) for length in values]
+            lengths[col] = array('H', values)
+        return cls(lengths)
+
+    def subset(self, row_indices):
+        """按行号取子集，用于搜索过滤后的数据帧"""
+        return ColumnWidthStats({col: array('H', (values[i] for i in row_indices))
+                                 for col, values in self.lengths.items()})
+
+    def __len__(self):
+        for values in self.lengths.values():
+            return len(values)
+        return 0
+
+    def __contains__(self, col):
+        return col in self.histograms
+
+    def max_length(self, col):
+        """获取列的最大显示长度"""
+        histogram = self.histograms.get(col)
+        return max(histogram) if histogram else 0
+
+    def percentile_length(self, col, pct=95):
+        """获取列显示长度的百分位数，避免个别超长值撑大整列"""
+        histogram = self.histograms.get(col)
+        if not histogram:
+            return 0
+        total = sum(histogram.values())
+        target = total * pct / 100.0
+        seen = 0
+        for length in sorted(histogram):
+            seen += histogram[length]
+            if seen >= target:
+                return length
+        return max(histogram)
+
+
+class TextWidthMeasurer:
+    """按显示长度分桶缓存文本像素宽度
+
+    同一显示长度只调用一次font.measure，列宽计算与行数无关。
+    字体不可用时退回按字符数估算。
+    """
+
+    def __init__(self, font=None):
+        self.font = font
+        self._cache = {}
+
+    def width(self, length):
+        """获取指定显示长度文本的像素宽度"""
+        px = self._cache.get(length)
+        if px is None:
+            if self.font is not None:
+                try:
+                    px = self.font.measure("0" * length)
+                except Exception:
+                    px = length * 8
+            else:
+                px = length * 8
+            self._cache[length] = px
+        return px
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+编译配置缓存模块
+把解析后的配置和预先构建的索引保存为marshal文件，配置文件内容未变化时直接加载，跳过JSON解析和索引构建
+"""
+
+import logging
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import zlib
+
+from .config_journal import config_hash
+
+
+class CompiledConfigCache:
+    """编译配置缓存
+
+    缓存文件与配置文件放在同一目录（.<配置文件名>.cache），以配置文件内容的摘要和代码版本为键，
+    内容变化、格式版本变化、索引构建代码变化或缓存损坏时视为未命中，由调用方重新解析并保存。
+
+    缓存使用marshal格式：只保存字典、列表、元组、字符串、数字等基本数据，读取时不会执行任何代码；
+    加载比json快，同一对象被多处引用时（子因子索引与配置）加载后仍是同一个对象。
+    marshal格式随Python版本变化，版本号也作为缓存键的一部分。
+    """
+
+    # 缓存内容结构变化时递增，旧缓存自动失效
+    FORMAT_VERSION = 3
+    # 运行环境的marshal格式
+    RUNTIME_VERSION = (marshal.version,) + tuple(sys.version_info[:2])
+
+    def __init__(self, config_path, code_version=None):
+        """
+        Args:
+            config_path: 配置文件路径
+            code_version: 生成缓存内容的代码版本，None表示读取时不检查（只使用缓存中的配置）
+        """
+        config_dir, file_name = os.path.split(os.path.abspath(config_path))
+        self.cache_path = os.path.join(config_dir, f".{file_name}.cache")
+        self.code_version = code_version
+
+    @staticmethod
+    def content_hash(content):
+        return config_hash(content)
+
+    @staticmethod
+    def code_version_of(*functions):
+        """根据函数的字节码和常量计算代码版本，函数实现变化后旧缓存自动失效"""
+        checksum = 0
+
+        def feed(code, checksum):
+            checksum = zlib.crc32(code.co_code, checksum)
+            for const in code.co_consts:
+                # 嵌套的代码对象（推导式、lambda）的repr包含内存地址，需要递归处理
+                if hasattr(const, 'co_code'):
+                    checksum = feed(const, checksum)
+                else:
+                    checksum = zlib.crc32(repr(const).encode('utf-8'), checksum)
+            return checksum
+
+        for function in functions:
+            checksum = feed(function.__code__, checksum)
+        return f"{checksum:08x}"
+
+    def load(self, content_hash):
+        """读取与配置文件内容摘要匹配的缓存，未命中时返回None"""
+        try:
+            # marshal.load直接读文件对象时逐段读取，整体读入后再解析快得多
+            with open(self.cache_path, 'rb') as f:
+                payload = marshal.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"读取编译配置缓存失败，将重新解析配置文件: {e}")
+            return None
+
+        if (not isinstance(payload, dict) or payload.get("format") != self.FORMAT_VERSION or
+                payload.get("runtime") != self.RUNTIME_VERSION or payload.get("hash") != content_hash):
+            return None
+        if self.code_version is not None and payload.get("code") != self.code_version:
+            return None
+        return payload
+
+    def save(self, content_hash, **data):
+        """保存缓存，写入失败只记录日志，不影响配置加载"""
+        payload = dict(data, format=self.FORMAT_VERSION, runtime=self.RUNTIME_VERSION,
+                       hash=content_hash, code=self.code_version)
+        temp_path = None
+        try:
+            content = marshal.dumps(payload)
+            fd, temp_path = tempfile.mkstemp(prefix='.config-cache-', suffix='.tmp',
+                                             dir=os.path.dirname(self.cache_path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, self.cache_path)
+            return True
+        except Exception as e:
+            logging.warning(f"保存编译配置缓存失败: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+    def save_async(self, content_hash, **data):
+        """在后台线程中保存缓存，不占用配置加载的时间；数据在写入完成前不能被修改"""
+        thread = threading.Thread(target=self.save, args=(content_hash,), kwargs=data,
+                                  name="ConfigCacheWriter", daemon=True)
+        thread.start()
+        return thread
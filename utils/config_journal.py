@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+配置修改日志模块
+记录每次保存配置时的结构差异，支持撤销/重做，并以追加写入的日志文件跨会话保存
+"""
+
+import json
+import logging
+import os
+import zlib
+
+
+def config_hash(content):
+    """配置文件内容的摘要（crc32与adler32拼接），用于确认日志、编译缓存与配置文件一致"""
+    return f"{zlib.crc32(content):08x}{zlib.adler32(content):08x}"
+
+
+class ConfigJournal:
+    """配置撤销/重做日志
+
+    每一步只保存变化的子树：字典逐键比较，等长列表逐项比较，长度变化的列表去掉首尾相同的部分后
+    记录中间被替换的片段，其余情况记录整个值。
+    差异项为 {"p": 路径, "o": 旧值, "n": 新值}，键不存在时省略对应的o或n；
+    列表片段替换记录为 {"p": 列表路径, "i": 起始位置, "o": 旧片段, "n": 新片段}；
+    字典键的顺序变化记录为 {"p": 路径, "ko": 旧键顺序, "kn": 新键顺序}。
+
+    日志文件每行一条记录：
+        {"op": "edit", "ops": [...], "h0": 修改前摘要, "h": 修改后摘要}
+        {"op": "undo"} / {"op": "redo"}
+    加载时按顺序重放得到撤销栈和当前位置，日志行数过多时压缩重写。
+    """
+
+    DEFAULT_MAX_STEPS = 200
+
+    def __init__(self, log_path, max_steps=None):
+        self.log_path = log_path
+        self.max_steps = max_steps or self.DEFAULT_MAX_STEPS
+        self.steps = []  # 编辑记录
+        self.position = 0  # 已应用的步数，steps[position:]为可重做的步骤
+        self._log_lines = 0
+
+    # ---------- 差异计算与应用 ----------
+
+    @staticmethod
+    def _same(old, new):
+        """比较两个值是否相同，字典的键顺序也必须一致（字典相等比较忽略键顺序）"""
+        if old != new:
+            return False
+        # 值相等时只需逐层检查字典的键顺序，只把容器压栈，标量不再逐个比较
+        stack = [(old, new)]
+        while stack:
+            old, new = stack.pop()
+            if isinstance(old, dict):
+                if list(old) != list(new):
+                    return False
+                stack.extend((value, new[key]) for key, value in old.items() if isinstance(value, (dict, list)))
+            elif isinstance(old, list):
+                stack.extend((old_item, new_item) for old_item, new_item in zip(old, new)
+                             if isinstance(old_item, (dict, list)))
+        return True
+
+    @classmethod
+    def diff(cls, old, new, path=None, ops=None):
+        """计算两份配置之间的差异项列表"""
+        path = path or []
+        ops = [] if ops is None else ops
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key, value in old.items():
+                if key not in new:
+                    ops.append({"p": path + [key], "o": value})
+                elif not cls._same(value, new[key]):
+                    cls.diff(value, new[key], path + [key], ops)
+            for key, value in new.items():
+                if key not in old:
+                    ops.append({"p": path + [key], "n": value})
+            if list(old) != list(new):
+                ops.append({"p": path, "ko": list(old), "kn": list(new)})
+        elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+            for index, (old_item, new_item) in enumerate(zip(old, new)):
+                if not cls._same(old_item, new_item):
+                    cls.diff(old_item, new_item, path + [index], ops)
+        elif isinstance(old, list) and isinstance(new, list):
+            # 插入或删除元素：只记录去掉相同首尾后被替换的片段
+            start = 0
+            limit = min(len(old), len(new))
+            while start < limit and cls._same(old[start], new[start]):
+                start += 1
+            end = 0
+            while end < limit - start and cls._same(old[-1 - end], new[-1 - end]):
+                end += 1
+            ops.append({"p": path, "i": start, "o": old[start:len(old) - end], "n": new[start:len(new) - end]})
+        else:
+            ops.append({"p": path, "o": old, "n": new})
+        return ops
+
+    @staticmethod
+    def apply(config, ops, forward=True):
+        """把差异项应用到配置上（原地修改），forward为False时反向应用（撤销）
+
+        Returns:
+            修改后的配置（根节点被整体替换时为新对象）
+        """
+        value_key, order_key = ("n", "kn") if forward else ("o", "ko")
+        value_ops = [op for op in ops if "ko" not in op]
+        order_ops = [op for op in ops if "ko" in op]
+        if not forward:
+            value_ops.reverse()
+
+        for op in value_ops:
+            path = op["p"]
+            # 日志中的值可能被多次应用，深拷贝后再放入配置
+            value = json.loads(json.dumps(op[value_key], ensure_ascii=False)) if value_key in op else None
+            if "i" in op:
+                # 列表片段替换：反向应用时被替换的是新片段
+                container = config
+                for key in path:
+                    container = container[key]
+                start = op["i"]
+                replaced = op["o"] if forward else op["n"]
+                container[start:start + len(replaced)] = value
+                continue
+            if not path:
+                config = value
+                continue
+            container = config
+            for key in path[:-1]:
+                container = container[key]
+            if value_key in op:
+                container[path[-1]] = value
+            else:
+                del container[path[-1]]
+
+        # 键顺序在所有值修改之后恢复，此时键集合已与目标一致
+        for op in order_ops:
+            container = config
+            for key in op["p"]:
+                container = container[key]
+            items = [(key, container[key]) for key in op[order_key] if key in container]
+            container.clear()
+            container.update(items)
+        return config
+
+    # ---------- 撤销栈 ----------
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.steps)
+
+    @property
+    def head_hash(self):
+        """当前位置对应的配置摘要，没有记录时为None"""
+        if not self.steps:
+            return None
+        if self.position == 0:
+            return self.steps[0]["h0"]
+        return self.steps[self.position - 1]["h"]
+
+    def record(self, old_config, new_config, old_hash, new_hash):
+        """记录一次保存；当前位置之后的可重做步骤被丢弃
+
+        Returns:
+            是否记录（配置没有结构差异时不记录）
+        """
+        if self.head_hash is not None and self.head_hash != old_hash:
+            # 配置文件在日志之外被修改过，旧的步骤不能再应用
+            logging.warning("配置文件与修改日志不一致，清空撤销历史")
+            self.reset()
+        ops = self.diff(old_config, new_config)
+        if not ops:
+            if old_hash != new_hash and self.head_hash is not None:
+                # 只有格式变化（如数字写法）：不增加步骤，让当前位置对应新的摘要，避免下次保存时清空历史
+                self._move_head(new_hash)
+            return False
+        # 序列化一次得到与配置数据不共享引用的副本
+        line = json.dumps({"op": "edit", "ops": ops, "h0": old_hash, "h": new_hash},
+                          ensure_ascii=False, separators=(',', ':'))
+        del self.steps[self.position:]
+        self.steps.append(json.loads(line))
+        self.position += 1
+        if len(self.steps) > self.max_steps:
+            drop = len(self.steps) - self.max_steps
+            del self.steps[:drop]
+            self.position -= drop
+        self._append(line)
+        return True
+
+    def preview(self, config, undo=True):
+        """计算撤销（或重做）一步后的配置，不移动当前位置也不写日志；无法撤销/重做时返回None
+
+        调用方写入配置文件成功后再调用commit，写入失败时撤销历史保持不变。
+        """
+        if undo:
+            if not self.can_undo:
+                return None
+            return self.apply(config, self.steps[self.position - 1]["ops"], forward=False)
+        if not self.can_redo:
+            return None
+        return self.apply(config, self.steps[self.position]["ops"], forward=True)
+
+    def commit(self, undo=True):
+        """确认撤销（或重做）一步：移动当前位置并追加日志"""
+        if undo:
+            self.position -= 1
+            self._append('{"op":"undo"}')
+        else:
+            self.position += 1
+            self._append('{"op":"redo"}')
+
+    def undo(self, config):
+        """撤销一步，返回撤销后的配置；无法撤销时返回None"""
+        config = self.preview(config, undo=True)
+        if config is not None:
+            self.commit(undo=True)
+        return config
+
+    def redo(self, config):
+        """重做一步，返回重做后的配置；无法重做时返回None"""
+        config = self.preview(config, undo=False)
+        if config is not None:
+            self.commit(undo=False)
+        return config
+
+    def _move_head(self, new_hash):
+        """把当前位置对应的摘要改为new_hash并重写日志"""
+        if self.position == 0:
+            self.steps[0]["h0"] = new_hash
+        else:
+            self.steps[self.position - 1]["h"] = new_hash
+        self._rewrite()
+
+    def reset(self):
+        """清空撤销历史和日志文件"""
+        self.steps = []
+        self.position = 0
+        self._rewrite()
+
+    # ---------- 日志文件 ----------
+
+    def load(self, current_hash):
+        """从日志文件恢复撤销历史；日志与当前配置文件不一致时清空"""
+        self.steps = []
+        self.position = 0
+        self._log_lines = 0
+        if not os.path.exists(self.log_path):
+            return
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    self._log_lines += 1
+                    record = json.loads(line)
+                    op = record.get("op")
+                    if op == "edit":
+                        del self.steps[self.position:]
+                        self.steps.append(record)
+                        self.position += 1
+                    elif op == "undo" and self.can_undo:
+                        self.position -= 1
+                    elif op == "redo" and self.can_redo:
+                        self.position += 1
+        except Exception as e:
+            # 最后一行可能因程序中断而不完整，丢弃整个历史比应用错误的差异更安全
+            logging.error(f"读取配置修改日志失败，清空撤销历史: {e}")
+            self.reset()
+            return
+
+        if self.head_hash != current_hash:
+            logging.warning("配置文件已在程序外修改，清空撤销历史")
+            self.reset()
+            return
+        if len(self.steps) > self.max_steps:
+            drop = len(self.steps) - self.max_steps
+            del self.steps[:drop]
+            self.position = max(self.position - drop, 0)
+            self._rewrite()
+        elif self._log_lines > 2 * self.max_steps:
+            self._rewrite()
+        logging.info(f"加载配置修改日志: {len(self.steps)} 步, 当前位置 {self.position}")
+
+    def _append(self, line):
+        # 撤销/重做累积的日志行过多时压缩重写，否则直接追加一行
+        if self._log_lines + 1 > 2 * self.max_steps:
+            self._rewrite()
+            return
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+            self._log_lines += 1
+        except Exception as e:
+            logging.error(f"写入配置修改日志失败: {e}")
+
+    def _rewrite(self):
+        """按当前撤销栈重写日志：全部编辑记录加上回到当前位置所需的撤销记录"""
+        lines = [json.dumps(step, ensure_ascii=False, separators=(',', ':')) for step in self.steps]
+        lines.extend('{"op":"undo"}' for _ in range(len(self.steps) - self.position))
+        try:
+            if not lines:
+                if os.path.exists(self.log_path):
+                    os.remove(self.log_path)
+            else:
+                temp_path = self.log_path + ".tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+                os.replace(temp_path, self.log_path)
+            self._log_lines = len(lines)
+        except Exception as e:
+            logging.error(f"重写配置修改日志失败: {e}")
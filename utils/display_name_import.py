@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+显示名称批量导入模块
+从CSV/TSV/JSON文件读取字段显示名称配置，校验后与现有配置比较，生成可一次性应用的导入计划
+"""
+
+import csv
+import json
+import os
+import re
+
+from .field_reference_index import SCOPE_LOCATION_KINDS
+
+# 可用的作用范围，顺序与配置界面的复选框一致
+SCOPE_OPTIONS = list(SCOPE_LOCATION_KINDS)
+DEFAULT_SCOPE = SCOPE_OPTIONS[0]
+
+# 表头别名 -> 标准列名
+HEADER_ALIASES = {
+    "field": "field", "field_name": "field", "字段": "field", "字段名": "field",
+    "display_name": "display_name", "name": "display_name", "显示名称": "display_name",
+    "scope": "scope", "作用范围": "scope",
+}
+
+# 单元格内多个作用范围的分隔符
+_SCOPE_SEPARATOR = re.compile(r"[|;；,，、]")
+
+
+class DisplayNameImportPlan:
+    """显示名称导入计划
+
+    entries中每项为 (行号, 字段名, 显示名称, 作用范围列表)，行号从1开始，JSON文件中为条目序号。
+    """
+
+    def __init__(self):
+        self.added = {}  # 字段名 -> 新配置
+        self.conflicts = {}  # 字段名 -> (现有配置, 导入配置)
+        self.unchanged = []
+        self.errors = []  # (行号, 错误说明)
+        self.duplicates = []  # 文件中重复出现的字段名，以最后一次为准
+        self.unknown_fields = []  # 不在当前单据字段目录中的字段名
+
+    @property
+    def total(self):
+        return len(self.added) + len(self.conflicts) + len(self.unchanged)
+
+    def summary(self):
+        """导入计划的中文摘要"""
+        lines = [f"新增 {len(self.added)} 个字段",
+                 f"与现有配置冲突 {len(self.conflicts)} 个字段",
+                 f"与现有配置相同 {len(self.unchanged)} 个字段"]
+        if self.duplicates:
+            lines.append(f"文件中重复 {len(self.duplicates)} 个字段（以最后一次为准）")
+        if self.unknown_fields:
+            lines.append(f"不在当前单据中 {len(self.unknown_fields)} 个字段：" + "、".join(self.unknown_fields[:10]) +
+                         ("…" if len(self.unknown_fields) > 10 else ""))
+        if self.errors:
+            lines.append(f"无效 {len(self.errors)} 行：")
+            lines.extend(f"  第{line_no}行：{message}" for line_no, message in self.errors[:10])
+            if len(self.errors) > 10:
+                lines.append("  …")
+        return "\n".join(lines)
+
+
+class DisplayNameImporter:
+    """显示名称导入器"""
+
+    @staticmethod
+    def read_file(file_path):
+        """按扩展名读取导入文件
+
+        Returns:
+            [(行号, 字段名, 显示名称, 作用范围原始值)]
+
+        Raises:
+            ValueError: 文件格式无法识别
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        # utf-8-sig兼容Excel导出的带BOM文件
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            if extension == '.json':
+                return DisplayNameImporter._read_json(json.load(f))
+            delimiter = '\t' if extension in ('.tsv', '.tab') else ','
+            return DisplayNameImporter._read_rows(csv.reader(f, delimiter=delimiter))
+
+    @staticmethod
+    def _read_rows(reader):
+        rows = []
+        positions = {"field": 0, "display_name": 1, "scope": 2}
+        for line_no, row in enumerate(reader, start=1):
+            if not row or not any(cell.strip() for cell in row):
+                continue
+            if line_no == 1:
+                header = {HEADER_ALIASES.get(cell.strip().lower()): i for i, cell in enumerate(row)}
+                header.pop(None, None)
+                # 第一行能识别出字段列时作为表头，否则按 字段名,显示名称,作用范围 的列顺序读取
+                if "field" in header:
+                    positions = header
+                    continue
+
+            def cell(name):
+                index = positions.get(name)
+                return row[index].strip() if index is not None and index < len(row) else ""
+
+            rows.append((line_no, cell("field"), cell("display_name"), cell("scope")))
+        return rows
+
+    @staticmethod
+    def _read_json(data):
+        # 支持完整配置文件、{字段: 显示名称或配置} 和 [{field, display_name, scope}] 三种结构
+        if isinstance(data, dict) and isinstance(data.get("display_names"), dict):
+            data = data["display_names"]
+        rows = []
+        if isinstance(data, dict):
+            for entry_no, (field, value) in enumerate(data.items(), start=1):
+                if isinstance(value, dict):
+                    rows.append((entry_no, field, value.get("display_name", ""), value.get("scope", "")))
+                else:
+                    rows.append((entry_no, field, value, ""))
+        elif isinstance(data, list):
+            for entry_no, item in enumerate(data, start=1):
+                if not isinstance(item, dict):
+                    rows.append((entry_no, "", "", ""))
+                    continue
+                field = item.get("field", item.get("field_name", ""))
+                rows.append((entry_no, field, item.get("display_name", ""), item.get("scope", "")))
+        else:
+            raise ValueError("JSON文件的根节点必须是对象或数组")
+        return rows
+
+    @staticmethod
+    def parse_scope(value):
+        """解析作用范围，返回 (作用范围列表, 无效的作用范围列表)；为空时使用默认作用范围"""
+        if isinstance(value, list):
+            parts = [str(part).strip() for part in value]
+        else:
+            parts = [part.strip() for part in _SCOPE_SEPARATOR.split(str(value or ""))]
+        parts = [part for part in parts if part]
+        if not parts:
+            return [DEFAULT_SCOPE], []
+        invalid = [part for part in parts if part not in SCOPE_LOCATION_KINDS]
+        # 按界面顺序去重
+        scopes = [option for option in SCOPE_OPTIONS if option in parts]
+        return scopes, invalid
+
+    @staticmethod
+    def normalize_existing(field, field_config):
+        """把现有配置（兼容旧的字符串格式）转换为 {display_name, scope列表}"""
+        if isinstance(field_config, dict):
+            scope = field_config.get("scope", DEFAULT_SCOPE)
+            return {"display_name": field_config.get("display_name", field),
+                    "scope": scope if isinstance(scope, list) else [scope]}
+        return {"display_name": field_config, "scope": [DEFAULT_SCOPE]}
+
+    @classmethod
+    def build_plan(cls, rows, existing, catalog=None):
+        """校验导入行并与现有显示名称配置比较
+
+        Args:
+            rows: read_file返回的导入行
+            existing: 现有display_names配置
+            catalog: 字段目录，提供时检查字段是否存在于当前单据中
+
+        Returns:
+            DisplayNameImportPlan
+        """
+        plan = DisplayNameImportPlan()
+        imported = {}
+        for line_no, field, display_name, scope_value in rows:
+            field = str(field or "").strip()
+            display_name = str(display_name or "").strip()
+            if not field:
+                plan.errors.append((line_no, "缺少字段名"))
+                continue
+            if not display_name:
+                plan.errors.append((line_no, f"字段 '{field}' 缺少显示名称"))
+                continue
+            scopes, invalid = cls.parse_scope(scope_value)
+            if invalid:
+                plan.errors.append((line_no, f"字段 '{field}' 的作用范围无效：{'、'.join(invalid)}"))
+                continue
+            if field in imported:
+                plan.duplicates.append(field)
+            imported[field] = {"display_name": display_name, "scope": scopes}
+
+        for field, config in imported.items():
+            if catalog is not None and not catalog.contains(field):
+                plan.unknown_fields.append(field)
+            if field not in existing:
+                plan.added[field] = config
+                continue
+            current = cls.normalize_existing(field, existing[field])
+            if current["display_name"] == config["display_name"] and set(current["scope"]) == set(config["scope"]):
+                plan.unchanged.append(field)
+            else:
+                plan.conflicts[field] = (current, config)
+        return plan
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+字段目录模块
+扫描已加载单据的全部节点，按层级统计每个字段路径的类型、空值率和不同值数量
+"""
+
+import logging
+import math
+import threading
+import zlib
+
+
+class HyperLogLog:
+    """HyperLogLog基数估计，用固定大小的寄存器估计不同值数量
+
+    precision为p时使用2^p个寄存器，标准误差约为1.04/sqrt(2^p)，p=10时约3%。
+    """
+
+    def __init__(self, precision=10):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        # 寄存器数量对应的偏差修正系数
+        self._alpha = 0.7213 / (1 + 1.079 / self.size)
+
+    @staticmethod
+    def _hash(value):
+        # 内置hash在进程间随机化且小整数的哈希值分布不均匀，使用稳定的64位哈希：
+        # crc32和adler32拼成64位后用splitmix64的终结函数混合，使各位分布均匀
+        data = repr(value).encode('utf-8')
+        x = (zlib.crc32(data) << 32) | zlib.adler32(data)
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        return x ^ (x >> 31)
+
+    def add(self, value):
+        x = self._hash(value)
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        # 剩余位中第一个1的位置
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self):
+        size = self.size
+        estimate = self._alpha * size * size / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # 基数较小时改用线性计数，误差更小
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+
+class FieldStats:
+    """单个层级中单个字段的统计"""
+
+    # 不同值数量在此以内时精确计数，超过后转为HyperLogLog估计
+    EXACT_DISTINCT_LIMIT = 1000
+
+    def __init__(self, path, level):
+        self.path = path
+        self.level = level
+        self.count = 0  # 出现该字段的节点数
+        self.null_count = 0
+        self.type_counts = {}
+        self._distinct = set()
+        self._sketch = None
+
+    def add(self, value):
+        self.count += 1
+        if value is None or value == "":
+            self.null_count += 1
+            return
+        type_name = self._type_name(value)
+        self.type_counts[type_name] = self.type_counts.get(type_name, 0) + 1
+
+        if isinstance(value, list):
+            value = repr(value)
+        if self._sketch is not None:
+            self._sketch.add(value)
+            return
+        self._distinct.add(value)
+        if len(self._distinct) > self.EXACT_DISTINCT_LIMIT:
+            self._sketch = HyperLogLog()
+            for distinct_value in self._distinct:
+                self._sketch.add(distinct_value)
+            self._distinct = None
+
+    @staticmethod
+    def _type_name(value):
+        if isinstance(value, bool):
+            return "bool"
+        if isinstance(value, (int, float)):
+            return "number"
+        if isinstance(value, str):
+            # 数字字符串按数字统计，与表格中数字列的处理一致
+            try:
+                float(value)
+                return "number"
+            except ValueError:
+                return "text"
+        if isinstance(value, list):
+            return "list"
+        return type(value).__name__
+
+    @property
+    def inferred_type(self):
+        """出现次数最多的非空值类型，全部为空时为empty"""
+        if not self.type_counts:
+            return "empty"
+        return max(self.type_counts.items(), key=lambda item: item[1])[0]
+
+    @property
+    def null_rate(self):
+        return self.null_count / self.count if self.count else 0.0
+
+    @property
+    def distinct_count(self):
+        """不同值数量，超过精确计数上限后为估计值"""
+        if self._sketch is not None:
+            return self._sketch.estimate()
+        return len(self._distinct)
+
+    @property
+    def distinct_is_estimate(self):
+        return self._sketch is not None
+
+    def describe(self):
+        """统计摘要文本，用于字段建议列表"""
+        prefix = "约" if self.distinct_is_estimate else ""
+        return f"{self.inferred_type}, 空值{self.null_rate:.0%}, {prefix}{self.distinct_count}个不同值"
+
+
+class FieldCatalog:
+    """单据字段目录
+
+    按calcLevel分组记录每个字段路径的统计，嵌套字典展开为"父字段.子字段"路径，
+    子节点列表subList不作为字段，只继续遍历。
+    """
+
+    PATH_SEPARATOR = "."
+
+    def __init__(self):
+        self.levels = []  # 层级出现顺序
+        self.fields = {}  # 层级 -> {字段路径: FieldStats}
+        self.node_count = 0
+        self._field_names = None
+
+    def build(self, root_node, max_depth=100, cancelled=None):
+        """扫描根节点下的全部节点
+
+        Args:
+            root_node: calculateItemVO根节点
+            max_depth: 最大遍历深度，防止异常数据导致无限遍历
+            cancelled: 返回True时停止扫描的回调，每个节点检查一次
+
+        Returns:
+            是否扫描完成
+        """
+        self.levels = []
+        self.fields = {}
+        self.node_count = 0
+        self._field_names = None
+
+        if not isinstance(root_node, dict):
+            logging.warning("构建字段目录失败：根节点不是字典类型")
+            return False
+
+        stack = [(root_node, 0)]
+        visited = set()
+        while stack:
+            if cancelled is not None and cancelled():
+                return False
+            node, depth = stack.pop()
+            if depth > max_depth or id(node) in visited:
+                continue
+            visited.add(id(node))
+
+            level = node.get('calcLevel')
+            if level is not None:
+                if level not in self.fields:
+                    self.fields[level] = {}
+                    self.levels.append(level)
+                self._add_node(self.fields[level], level, node, "")
+                self.node_count += 1
+
+            sub_list = node.get('subList')
+            if isinstance(sub_list, list):
+                for child in reversed(sub_list):
+                    if isinstance(child, dict):
+                        stack.append((child, depth + 1))
+
+        logging.info(f"字段目录构建完成，共 {self.node_count} 个节点，"
+                     f"{sum(len(fields) for fields in self.fields.values())} 个字段")
+        return True
+
+    def _add_node(self, level_fields, level, node, prefix):
+        for key, value in node.items():
+            if key == 'subList':
+                continue
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                self._add_node(level_fields, level, value, path + self.PATH_SEPARATOR)
+                continue
+            stats = level_fields.get(path)
+            if stats is None:
+                stats = level_fields[path] = FieldStats(path, level)
+            stats.add(value)
+
+    def get(self, path, level):
+        return self.fields.get(level, {}).get(path)
+
+    def field_names(self):
+        """全部层级的字段路径（去重、排序）"""
+        if self._field_names is None:
+            names = set()
+            for level_fields in self.fields.values():
+                names.update(level_fields)
+            self._field_names = sorted(names)
+        return self._field_names
+
+    def contains(self, path):
+        return any(path in level_fields for level_fields in self.fields.values())
+
+    def search(self, query, limit=50):
+        """按字段路径查找建议，前缀匹配排在包含匹配之前
+
+        Returns:
+            [(字段路径, [FieldStats, ...])]，每个字段附带其出现的各层级统计
+        """
+        query = (query or "").strip().lower()
+        prefix_matches = []
+        other_matches = []
+        for path in self.field_names():
+            lowered = path.lower()
+            if not query or lowered.startswith(query):
+                prefix_matches.append(path)
+            elif query in lowered:
+                other_matches.append(path)
+        results = []
+        for path in (prefix_matches + other_matches)[:limit]:
+            stats = [self.fields[level][path] for level in self.levels if path in self.fields[level]]
+            results.append((path, stats))
+        return results
+
+
+class FieldCatalogBuilder:
+    """在后台线程中构建字段目录
+
+    每次start()递增代次，旧的扫描在下一个节点前退出，结果不会覆盖新的目录。
+    """
+
+    def __init__(self):
+        self.catalog = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def start(self, root_node):
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self.catalog = None
+
+        def is_cancelled():
+            return generation != self._generation
+
+        def worker():
+            catalog = FieldCatalog()
+            try:
+                if not catalog.build(root_node, cancelled=is_cancelled):
+                    return
+            except Exception as e:
+                logging.error(f"构建字段目录失败: {e}")
+                return
+            with self._lock:
+                if generation == self._generation:
+                    self.catalog = catalog
+
+        threading.Thread(target=worker, name="field-catalog", daemon=True).start()
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            self.catalog = None
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+字段引用索引模块
+维护 字段 -> 引用位置 的反向索引，查找和级联删除字段引用时无需遍历全部因子配置
+"""
+
+# 引用位置类型，与字段作用范围一一对应
+DOCUMENT_INFO = "document_info_fields"
+BASIC_INFO = "basic_info"
+TABLE_INFO = "table_info"
+
+# 字段作用范围 -> 引用位置类型
+SCOPE_LOCATION_KINDS = {
+    "整单基本信息": DOCUMENT_INFO,
+    "子因子基本信息": BASIC_INFO,
+    "子因子表格": TABLE_INFO,
+}
+
+
+class FieldReferenceIndex:
+    """字段引用反向索引
+
+    引用位置为元组：
+        (DOCUMENT_INFO,)                      整单基本信息字段列表
+        (BASIC_INFO, 分类, 子因子)            子因子基本信息
+        (TABLE_INFO, 分类, 子因子, 层级)       子因子某层级的表格字段
+    配置数据的每次编辑都需要同步更新索引：字段增删调用add/discard，
+    子因子或分类的增删改名调用对应的add_factor/remove_factor等方法。
+    """
+
+    def __init__(self, config_data):
+        self.config = config_data
+        self.refs = {}  # 字段 -> {引用位置}
+        self.factors = {}  # (分类, 子因子) -> 子因子配置
+        # (分类, 子因子) -> 登记时的 [(字段, 引用位置)]；字段列表被整体替换后仍能准确移除旧引用
+        self._factor_refs = {}
+        self.rebuild()
+
+    def rebuild(self):
+        """按配置数据完整重建索引"""
+        self.refs = {}
+        self.factors = {}
+        self._factor_refs = {}
+        for field in self.config.get(DOCUMENT_INFO, []):
+            self.add(field, (DOCUMENT_INFO,))
+        for category, factors in self.config.get("factor_categories", {}).items():
+            for factor in factors:
+                self.add_factor(category, factor)
+
+    def add(self, field, location):
+        """登记字段引用"""
+        self.refs.setdefault(field, set()).add(location)
+        if location[0] != DOCUMENT_INFO:
+            registered = self._factor_refs.get((location[1], location[2]))
+            if registered is not None and (field, location) not in registered:
+                registered.append((field, location))
+
+    def discard(self, field, location):
+        """移除字段引用"""
+        locations = self.refs.get(field)
+        if locations is not None:
+            locations.discard(location)
+            if not locations:
+                del self.refs[field]
+
+    def add_factor(self, category, factor):
+        """登记子因子及其全部字段引用"""
+        name = factor.get("name")
+        self.factors[(category, name)] = factor
+        registered = self._factor_refs.setdefault((category, name), [])
+        for field in factor.get(BASIC_INFO, []):
+            registered.append((field, (BASIC_INFO, category, name)))
+        table_info = factor.get(TABLE_INFO, {})
+        if isinstance(table_info, dict):
+            for level, fields in table_info.items():
+                for field in fields:
+                    registered.append((field, (TABLE_INFO, category, name, level)))
+        for field, location in registered:
+            self.add(field, location)
+
+    def remove_factor(self, category, name):
+        """移除子因子及其全部字段引用"""
+        self.factors.pop((category, name), None)
+        for field, location in self._factor_refs.pop((category, name), ()):
+            self.discard(field, location)
+
+    def reindex_factor(self, category, name, factor=None, old_category=None, old_name=None):
+        """子因子字段列表被整体替换、子因子改名或移动分类后重新登记"""
+        old_key = (old_category or category, old_name or name)
+        if factor is None:
+            factor = self.factors.get(old_key)
+        self.remove_factor(*old_key)
+        if factor is not None:
+            self.add_factor(category, factor)
+
+    def remove_category(self, category):
+        """移除分类下全部子因子的引用"""
+        for key in [key for key in self.factors if key[0] == category]:
+            self.remove_factor(*key)
+
+    def rename_category(self, old_name, new_name):
+        for (category, name), factor in list(self.factors.items()):
+            if category == old_name:
+                self.remove_factor(category, name)
+                self.add_factor(new_name, factor)
+
+    def references(self, field):
+        """获取字段的全部引用位置，按 整单 -> 基本信息 -> 表格 排序"""
+        return sorted(self.refs.get(field, ()), key=lambda location: (
+            (DOCUMENT_INFO, BASIC_INFO, TABLE_INFO).index(location[0]),) + tuple(map(str, location[1:])))
+
+    def container(self, location):
+        """获取引用位置对应的配置字段列表"""
+        kind = location[0]
+        if kind == DOCUMENT_INFO:
+            return self.config.get(DOCUMENT_INFO, [])
+        factor = self.factors.get((location[1], location[2]))
+        if factor is None:
+            return []
+        if kind == BASIC_INFO:
+            return factor.get(BASIC_INFO, [])
+        return factor.get(TABLE_INFO, {}).get(location[3], [])
+
+    def remove_field(self, field, kinds=None):
+        """从配置中删除字段的引用，只访问该字段所在的列表
+
+        Args:
+            field: 字段名
+            kinds: 只删除这些类型的引用位置，None表示全部
+
+        Returns:
+            已删除的引用位置列表
+        """
+        removed = []
+        for location in self.references(field):
+            if kinds is not None and location[0] not in kinds:
+                continue
+            fields = self.container(location)
+            if field in fields:
+                fields.remove(field)
+            self.discard(field, location)
+            removed.append(location)
+        return removed
+
+    @staticmethod
+    def describe(location):
+        """引用位置的中文描述"""
+        kind = location[0]
+        if kind == DOCUMENT_INFO:
+            return "整单基本信息字段列表"
+        if kind == BASIC_INFO:
+            return f"因子分类 '{location[1]}' - 子因子 '{location[2]}' 的基本信息"
+        return f"因子分类 '{location[1]}' - 子因子 '{location[2]}' 的 {location[3]} 层表格信息"
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+文件监视模块
+在Tk事件循环中按固定间隔检查文件的修改时间和大小，文件变化时回调
+"""
+
+import logging
+import os
+
+
+class FileWatcher:
+    """轮询式文件监视器
+
+    不依赖平台文件通知接口，每次检查只调用一次os.stat，开销可以忽略。
+    程序自己写入文件后调用mark_current()，避免把自身的修改当作外部变化。
+    """
+
+    DEFAULT_INTERVAL_MS = 1000
+
+    def __init__(self, widget, path, on_change, interval_ms=None):
+        """
+        Args:
+            widget: 用于after()调度的Tk控件
+            path: 监视的文件路径
+            on_change: 文件变化时的回调 on_change(path)
+            interval_ms: 检查间隔（毫秒）
+        """
+        self.widget = widget
+        self.path = path
+        self.on_change = on_change
+        self.interval_ms = interval_ms or self.DEFAULT_INTERVAL_MS
+        self._stamp = self._read_stamp()
+        self._after_id = None
+
+    def _read_stamp(self):
+        """读取文件的 (修改时间, 大小)，文件不存在时返回None"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def start(self):
+        """开始监视"""
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval_ms, self._poll)
+
+    def stop(self):
+        """停止监视"""
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def mark_current(self):
+        """把文件当前状态记为已处理"""
+        self._stamp = self._read_stamp()
+
+    def _poll(self):
+        self._after_id = None
+        stamp = self._read_stamp()
+        # 文件暂时不存在（编辑器保存时先删除再写入）时等待下一次检查
+        if stamp is not None and stamp != self._stamp:
+            self._stamp = stamp
+            try:
+                self.on_change(self.path)
+            except Exception as e:
+                logging.error(f"处理文件变化失败: {self.path}, {e}")
+        self.start()
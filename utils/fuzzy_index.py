@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+模糊搜索索引模块
+提供基于编辑距离的容错搜索，用于部件编码、产品名称等易输错字段
+"""
+
+import logging
+from collections import Counter
+
+
+def _build_peq(pattern):
+    """为位并行编辑距离算法构建字符位掩码表"""
+    peq = {}
+    bit = 1
+    for char in pattern:
+        peq[char] = peq.get(char, 0) | bit
+        bit <<= 1
+    return peq
+
+
+def _myers_distance(peq, m, text):
+    """Myers位并行算法计算编辑距离（Levenshtein）
+
+    Args:
+        peq: 模式串的字符位掩码表
+        m: 模式串长度
+        text: 待比较文本
+
+    Returns:
+        模式串与text之间的编辑距离
+    """
+    if m == 0:
+        return len(text)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = mask
+    mv = 0
+    score = m
+    get = peq.get
+    for char in text:
+        eq = get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def edit_distance(a, b):
+    """计算两个字符串的编辑距离"""
+    return _myers_distance(_build_peq(a), len(a), b)
+
+
+class FuzzyIndex:
+    """模糊搜索索引
+
+    对去重后的字符串值建立二元组（q=2，首尾补哨兵字符）倒排索引。
+    每次编辑最多破坏两个二元组，因此编辑距离不超过k的候选值至少与查询
+    共享 len(查询二元组) - 2k 个二元组；先用该计数条件和长度条件过滤，
+    再用位并行算法精确计算编辑距离。
+    """
+
+    GRAM_START = "\x02"
+    GRAM_END = "\x03"
+
+    def __init__(self, values=None):
+        self.values = []  # 去重后的值
+        self.lengths = []  # 各值的长度
+        self.gram_index = {}  # 二元组 -> [值序号]
+        self.length_index = {}  # 长度 -> [值序号]，过滤条件失效时按长度扫描
+        self._value_ids = {}
+        if values:
+            for value in values:
+                self.add(value)
+
+    @classmethod
+    def grams(cls, text):
+        """获取文本补齐哨兵后的二元组集合"""
+        padded = cls.GRAM_START + text + cls.GRAM_END
+        return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+    @staticmethod
+    def default_max_distance(query):
+        """根据查询长度确定默认允许的编辑距离"""
+        length = len(query)
+        if length <= 2:
+            return 0
+        if length <= 5:
+            return 1
+        return 2
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, value):
+        """添加一个值，返回其序号（重复值返回已有序号）"""
+        value_id = self._value_ids.get(value)
+        if value_id is not None:
+            return value_id
+
+        value_id = len(self.values)
+        self._value_ids[value] = value_id
+        self.values.append(value)
+        self.lengths.append(len(value))
+        for gram in self.grams(value):
+            self.gram_index.setdefault(gram, []).append(value_id)
+        self.length_index.setdefault(len(value), []).append(value_id)
+        return value_id
+
+    def lookup(self, query, max_distance=None):
+        """查找编辑距离不超过max_distance的值
+
+        Args:
+            query: 查询文本
+            max_distance: 最大编辑距离，None时按查询长度自动确定
+
+        Returns:
+            [(编辑距离, 值序号)]，按编辑距离、值序号升序排列
+        """
+        if not query or not self.values:
+            return []
+        if max_distance is None:
+            max_distance = self.default_max_distance(query)
+
+        m = len(query)
+        query_grams = self.grams(query)
+        threshold = len(query_grams) - 2 * max_distance
+
+        if threshold > 0:
+            # 二元组计数过滤
+            counts = Counter()
+            for gram in query_grams:
+                postings = self.gram_index.get(gram)
+                if postings:
+                    counts.update(postings)
+            candidates = [value_id for value_id, count in counts.items() if count >= threshold]
+        else:
+            # 查询过短，计数过滤失效，退化为按长度扫描
+            candidates = []
+            for length in range(max(0, m - max_distance), m + max_distance + 1):
+                candidates.extend(self.length_index.get(length, ()))
+
+        peq = _build_peq(query)
+        lengths = self.lengths
+        values = self.values
+        matches = []
+        for value_id in candidates:
+            if abs(lengths[value_id] - m) > max_distance:
+                continue
+            distance = _myers_distance(peq, m, values[value_id])
+            if distance <= max_distance:
+                matches.append((distance, value_id))
+
+        matches.sort()
+        logging.debug(f"模糊查询 '{query}' (k={max_distance})：候选 {len(candidates)}，命中 {len(matches)}")
+        return matches
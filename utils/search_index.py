@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""
+搜索索引模块
+提供整单跨层级的全局搜索索引和当前表格的搜索索引
+"""
+
+import logging
+import re
+import time
+from functools import lru_cache
+from .fuzzy_index import FuzzyIndex
+
+
+# 量词作用在本身含量词的分组上，如(a+)+、(\w*)*，这类表达式可能出现指数级回溯
+_NESTED_QUANTIFIER = re.compile(r'\((?:[^()\\]|\\.)*[+*}](?:[^()\\]|\\.)*\)[+*{]')
+
+
+@lru_cache(maxsize=64)
+def compile_pattern(pattern, flags=0):
+    """编译正则表达式，按(pattern, flags)缓存编译结果
+
+    re模块的单次匹配无法中断，时间预算只能在单元格之间生效，
+    因此拒绝可能导致灾难性回溯的嵌套量词表达式。
+
+    Raises:
+        re.error: 正则表达式语法错误或包含嵌套量词时
+    """
+    if _NESTED_QUANTIFIER.search(pattern):
+        raise re.error("嵌套量词可能导致灾难性回溯，请简化表达式")
+    return re.compile(pattern, flags)
+
+
+class DocumentSearchIndex:
+    """整单搜索索引
+
+    数据加载后遍历一次calculateItemVO的全部节点，为每个节点建立归一化文本缓存。
+    节点在所属层级内的序号与DataManager.get_all_nodes_for_level的返回顺序一致，
+    因此搜索命中可以直接定位到对应层级表格中的行。
+    """
+
+    # 节点内字段文本的拼接分隔符，保证查询不会跨字段匹配
+    FIELD_SEPARATOR = "\x1f"
+
+    def __init__(self):
+        self.levels = []  # 层级出现顺序
+        self.entries = []  # (层级, 层级内序号, 节点, 字段元组, 文本元组, 拼接文本)
+        self.value_index = {}  # 归一化值 -> [(条目序号, 字段序号)]
+        self.node_count = 0
+
+    @staticmethod
+    def normalize(value):
+        """将值归一化为小写文本，None返回空字符串"""
+        if value is None:
+            return ""
+        return str(value).strip().lower()
+
+    def build(self, root_node, max_depth=100):
+        """从根节点构建索引
+
+        Args:
+            root_node: calculateItemVO根节点
+            max_depth: 最大遍历深度，防止异常数据导致无限遍历
+
+        Returns:
+            索引的节点数量
+        """
+        self.levels = []
+        self.entries = []
+        self.value_index = {}
+        self.node_count = 0
+
+        if not isinstance(root_node, dict):
+            logging.warning("构建搜索索引失败：根节点不是字典类型")
+            return 0
+
+        level_counts = {}
+        # 使用显式栈做先序遍历，子节点逆序入栈以保持与递归查找相同的顺序
+        stack = [(root_node, 0)]
+        visited = set()
+        while stack:
+            node, depth = stack.pop()
+            if depth > max_depth or id(node) in visited:
+                continue
+            visited.add(id(node))
+
+            level = node.get('calcLevel')
+            if level is not None:
+                if level not in level_counts:
+                    level_counts[level] = 0
+                    self.levels.append(level)
+                self._add_entry(node, level, level_counts[level])
+                level_counts[level] += 1
+
+            sub_list = node.get('subList')
+            if isinstance(sub_list, list):
+                for child in reversed(sub_list):
+                    if isinstance(child, dict):
+                        stack.append((child, depth + 1))
+
+        self.node_count = len(self.entries)
+        logging.info(f"全局搜索索引构建完成，共 {self.node_count} 个节点，层级: {self.levels}")
+        return self.node_count
+
+    def _add_entry(self, node, level, ordinal):
+        """为单个节点建立文本缓存"""
+        fields = []
+        texts = []
+        for field, value in node.items():
+            # 跳过子节点列表和嵌套结构，只索引标量值
+            if isinstance(value, (dict, list)):
+                continue
+            text = self.normalize(value)
+            if not text:
+                continue
+            fields.append(field)
+            texts.append(text)
+
+        entry_id = len(self.entries)
+        for field_idx, text in enumerate(texts):
+            self.value_index.setdefault(text, []).append((entry_id, field_idx))
+
+        blob = self.FIELD_SEPARATOR.join(texts)
+        self.entries.append((level, ordinal, node, tuple(fields), tuple(texts), blob))
+
+    def search(self, query, max_hits_per_level=200):
+        """在整单范围内搜索
+
+        值完全相等的命中排在前面，其余按遍历顺序排列。
+
+        Args:
+            query: 搜索文本
+            max_hits_per_level: 每个层级最多返回的命中数
+
+        Returns:
+            按层级分组的结果字典，{层级: {"count": 命中总数, "hits": [命中字典, ...]}}
+        """
+        query = self.normalize(query)
+        results = {}
+        if not query or not self.entries:
+            return results
+
+        for level in self.levels:
+            results[level] = {"count": 0, "hits": []}
+
+        # 第一步：值完全匹配，直接查字典
+        exact = set()
+        for entry_id, field_idx in self.value_index.get(query, []):
+            exact.add((entry_id, field_idx))
+            self._collect_hit(results, entry_id, field_idx, True, max_hits_per_level)
+
+        # 第二步：子串匹配，先在整节点拼接文本上判断，命中后再定位字段
+        for entry_id, entry in enumerate(self.entries):
+            if query not in entry[5]:
+                continue
+            texts = entry[4]
+            for field_idx, text in enumerate(texts):
+                if query in text and (entry_id, field_idx) not in exact:
+                    self._collect_hit(results, entry_id, field_idx, False, max_hits_per_level)
+
+        return {level: group for level, group in results.items() if group["count"]}
+
+    def _collect_hit(self, results, entry_id, field_idx, exact, max_hits):
+        """将命中加入分组结果"""
+        level, ordinal, node, fields, texts, _ = self.entries[entry_id]
+        group = results[level]
+        group["count"] += 1
+        if len(group["hits"]) < max_hits:
+            field = fields[field_idx]
+            group["hits"].append({
+                "level": level,
+                "ordinal": ordinal,
+                "key": node.get('key'),
+                "field": field,
+                "value": str(node.get(field)),
+                "exact": exact,
+            })
+
+
+class SearchResult:
+    """表格搜索结果
+
+    Attributes:
+        rows: 匹配的行号列表（源数据帧中的行号），按显示顺序排列
+        positions: 单元格命中位置列表 [(行号, 列序号, (起始, 结束))]，
+            位置基于归一化文本，作为索引匹配的副产品产生，无需再次扫描数据
+        completed: 是否完整扫描（正则搜索超出时间预算时为False）
+        distances: 模糊搜索时各行的编辑距离 {行号: 距离}
+    """
+
+    __slots__ = ('rows', 'positions', 'completed', 'distances')
+
+    def __init__(self, rows, positions=None, completed=True, distances=None):
+        self.rows = rows
+        self.positions = positions if positions is not None else []
+        self.completed = completed
+        self.distances = distances if distances is not None else {}
+
+
+class TableSearchIndex:
+    """表格搜索索引
+
+    为当前层级的DataFrame建立一次归一化文本缓存（每行各列的小写文本），
+    之后每次按键只在缓存上做匹配，不再重复格式化原始数据。
+    """
+
+    # 正则搜索默认时间预算（秒）
+    DEFAULT_TIME_BUDGET = 0.15
+    # 每处理多少行检查一次时间预算
+    BUDGET_CHECK_INTERVAL = 64
+    # 单次搜索最多收集的命中位置数，避免短查询在大表上产生海量高亮
+    MAX_POSITIONS = 20000
+
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        self.row_texts = []  # 每行各列的归一化文本元组，与self.columns一一对应
+        self.row_blobs = []  # 每行所有列文本的拼接，用于快速判断子串是否存在
+        self.string_columns = []  # 字符串类型列的序号，模糊搜索只在这些列上进行
+        self._fuzzy_index = None
+        self._fuzzy_postings = []  # 模糊索引值序号 -> [(行号, 列序号)]
+        self._build(df)
+
+    @staticmethod
+    def normalize(value):
+        """将单元格值归一化为小写文本，None返回空字符串"""
+        if value is None:
+            return ""
+        return str(value).lower()
+
+    def _build(self, df):
+        """构建归一化文本缓存"""
+        columns = self.columns
+        separator = DocumentSearchIndex.FIELD_SEPARATOR
+        normalize = self.normalize
+        column_types = [None] * len(columns)
+        for row in df.data:
+            texts = tuple(normalize(row.get(col)) for col in columns)
+            self.row_texts.append(texts)
+            self.row_blobs.append(separator.join(texts))
+            for col_idx, col in enumerate(columns):
+                if column_types[col_idx] is None and row.get(col) is not None:
+                    column_types[col_idx] = type(row.get(col))
+        self.string_columns = [i for i, col_type in enumerate(column_types) if col_type is str]
+
+    def __len__(self):
+        return len(self.row_texts)
+
+    def search(self, query):
+        """子串搜索（不区分大小写）
+
+        先在整行拼接文本上判断，命中的行再逐列定位命中位置。
+
+        Returns:
+            SearchResult
+        """
+        query = self.normalize(query)
+        if not query:
+            return SearchResult(list(range(len(self.row_texts))))
+
+        rows = []
+        positions = []
+        max_positions = self.MAX_POSITIONS
+        query_len = len(query)
+        for i, blob in enumerate(self.row_blobs):
+            if query not in blob:
+                continue
+            rows.append(i)
+            if len(positions) >= max_positions:
+                continue
+            for col_idx, text in enumerate(self.row_texts[i]):
+                start = text.find(query)
+                if start >= 0:
+                    positions.append((i, col_idx, (start, start + query_len)))
+        return SearchResult(rows, positions)
+
+    def search_regex(self, pattern, flags=re.IGNORECASE, time_budget=None):
+        """正则搜索，逐个单元格匹配并受时间预算约束
+
+        单元格文本较短，逐格匹配可以把单次匹配的耗时限制在可控范围内；
+        超出时间预算时停止扫描，返回已找到的部分结果。
+
+        Args:
+            pattern: 正则表达式文本
+            flags: 正则标志，默认不区分大小写
+            time_budget: 时间预算（秒），None使用默认值
+
+        Returns:
+            SearchResult，超出时间预算时completed为False
+
+        Raises:
+            re.error: 正则表达式语法错误时
+        """
+        regex = compile_pattern(pattern, flags)
+        if time_budget is None:
+            time_budget = self.DEFAULT_TIME_BUDGET
+        deadline = time.perf_counter() + time_budget
+        search = regex.search
+
+        matched = []
+        positions = []
+        max_positions = self.MAX_POSITIONS
+        for i, texts in enumerate(self.row_texts):
+            if i % self.BUDGET_CHECK_INTERVAL == 0 and i and time.perf_counter() > deadline:
+                logging.warning(f"正则搜索超出时间预算 ({time_budget * 1000:.0f}ms)，已扫描 {i}/{len(self.row_texts)} 行")
+                return SearchResult(matched, positions, completed=False)
+            row_matched = False
+            for col_idx, text in enumerate(texts):
+                if not text:
+                    continue
+                match = search(text)
+                if match:
+                    row_matched = True
+                    if len(positions) < max_positions:
+                        positions.append((i, col_idx, match.span()))
+                    else:
+                        break
+            if row_matched:
+                matched.append(i)
+        return SearchResult(matched, positions)
+
+    def _get_fuzzy_index(self):
+        """首次模糊搜索时，基于字符串列的去重值构建模糊索引"""
+        if self._fuzzy_index is None:
+            fuzzy_index = FuzzyIndex()
+            postings = self._fuzzy_postings
+            for row_idx, texts in enumerate(self.row_texts):
+                for col_idx in self.string_columns:
+                    text = texts[col_idx]
+                    if not text:
+                        continue
+                    value_id = fuzzy_index.add(text)
+                    if value_id == len(postings):
+                        postings.append([])
+                    postings[value_id].append((row_idx, col_idx))
+            self._fuzzy_index = fuzzy_index
+            logging.info(f"模糊搜索索引构建完成，{len(self.string_columns)} 个字符串列，{len(fuzzy_index)} 个去重值")
+        return self._fuzzy_index
+
+    def search_fuzzy(self, query, max_distance=None):
+        """容错搜索，返回字符串列中编辑距离不超过max_distance的行
+
+        Args:
+            query: 查询文本
+            max_distance: 最大编辑距离，None时按查询长度自动确定
+
+        Returns:
+            SearchResult，行按编辑距离升序排列，同距离按行号排列；
+            命中位置为整个单元格
+        """
+        query = self.normalize(query).strip()
+        if not query:
+            return SearchResult(list(range(len(self.row_texts))))
+
+        fuzzy_index = self._get_fuzzy_index()
+        best = {}
+        positions = []
+        max_positions = self.MAX_POSITIONS
+        for distance, value_id in fuzzy_index.lookup(query, max_distance):
+            span = (0, fuzzy_index.lengths[value_id])
+            for row_idx, col_idx in self._fuzzy_postings[value_id]:
+                if row_idx not in best or distance < best[row_idx]:
+                    best[row_idx] = distance
+                if len(positions) < max_positions:
+                    positions.append((row_idx, col_idx, span))
+        rows = sorted(best, key=lambda row_idx: (best[row_idx], row_idx))
+        return SearchResult(rows, positions, distances=best)
+
+
+class NameFilterIndex:
+    """名称过滤索引
+
+    为一组名称（如因子名称加显示名称）建立字符和二元组倒排索引。
+    过滤时先取查询中最稀有的二元组（单字查询取字符）对应的候选，
+    再在候选上确认子串，按键过滤的耗时与名称总数基本无关。
+    """
+
+    def __init__(self, names):
+        self.names = [DocumentSearchIndex.normalize(name) for name in names]
+        self.char_index = {}  # 字符 -> [名称序号]
+        self.gram_index = {}  # 二元组 -> [名称序号]
+        for i, name in enumerate(self.names):
+            for char in set(name):
+                self.char_index.setdefault(char, []).append(i)
+            for gram in {name[j:j + 2] for j in range(len(name) - 1)}:
+                self.gram_index.setdefault(gram, []).append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def filter(self, query):
+        """返回包含查询文本（不区分大小写）的名称序号，按原顺序排列"""
+        query = DocumentSearchIndex.normalize(query)
+        if not query:
+            return list(range(len(self.names)))
+        if len(query) == 1:
+            return list(self.char_index.get(query, []))
+
+        grams = {query[j:j + 2] for j in range(len(query) - 1)}
+        postings = [self.gram_index.get(gram) for gram in grams]
+        if not all(postings):
+            return []
+        candidates = min(postings, key=len)
+        names = self.names
+        return [i for i in candidates if query in names[i]]
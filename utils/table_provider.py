@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""
+表格数据提供器模块
+为大数据量表格提供按需格式化的虚拟行数据
+"""
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+
+def format_cell_value(value):
+    """将单元格值格式化为显示文本
+
+    保持数字精度：浮点数使用足够的有效位数并避免科学计数法，空值显示为空字符串。
+    """
+    if value is None:
+        return ""
+    text = f"{value:.10g}" if isinstance(value, float) else str(value)
+    # 与pd.notna一致：空字符串和NaN显示为空
+    if not text or text.lower() == "nan":
+        return ""
+    return text
+
+
+def format_text_value(value):
+    """文本列的格式化：不做数字格式转换，空值显示为空字符串"""
+    return "" if value is None else str(value)
+
+
+# 字段类型提示 -> 格式化函数，未知类型使用format_cell_value
+CELL_FORMATTERS = {
+    "text": format_text_value,
+}
+
+
+class TableDataProvider:
+    """表格数据提供器
+
+    持有数据帧和要显示的列，只在表格请求某一行时才格式化该行，
+    格式化结果放入容量有限的LRU缓存，滚动时不会为全部行生成字符串。
+    """
+
+    DEFAULT_CACHE_SIZE = 512
+
+    def __init__(self, df, columns, formatter=None, cache_size=None, formatters=None):
+        self.rows = df.data
+        self.columns = list(columns)
+        self.formatter = formatter or format_cell_value
+        # 每列的格式化函数（来自投影计划），各列相同时只使用formatter
+        if formatters is not None and len(set(formatters)) == 1:
+            self.formatter = formatters[0]
+            formatters = None
+        self.formatters = list(formatters) if formatters is not None else None
+        self.cache_size = cache_size or self.DEFAULT_CACHE_SIZE
+        self.order = None  # 排序后的行顺序，None表示原始顺序
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _source_index(self, row_idx):
+        """显示行号转换为源数据行号"""
+        return self.order[row_idx] if self.order is not None else row_idx
+
+    def format_row(self, row_idx):
+        """格式化指定显示行（不经过缓存）"""
+        row = self.rows[self._source_index(row_idx)]
+        if self.formatters is not None:
+            return [formatter(row.get(col)) for formatter, col in zip(self.formatters, self.columns)]
+        formatter = self.formatter
+        return [formatter(row.get(col)) for col in self.columns]
+
+    def get_row(self, row_idx):
+        """获取指定显示行的格式化数据，优先从LRU缓存读取"""
+        cache = self._cache
+        formatted = cache.get(row_idx)
+        if formatted is not None:
+            cache.move_to_end(row_idx)
+            self.hits += 1
+            return formatted
+
+        self.misses += 1
+        formatted = self.format_row(row_idx)
+        cache[row_idx] = formatted
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return formatted
+
+    def get_cell(self, row_idx, col_idx):
+        """获取单个单元格的显示文本"""
+        formatted = self._cache.get(row_idx)
+        if formatted is not None:
+            return formatted[col_idx]
+        row = self.rows[self._source_index(row_idx)]
+        return self._column_formatter(col_idx)(row.get(self.columns[col_idx]))
+
+    def _column_formatter(self, col_idx):
+        return self.formatters[col_idx] if self.formatters is not None else self.formatter
+
+    def sort(self, col_idx, reverse=False):
+        """按列的显示文本排序，只调整行顺序，不复制数据"""
+        col = self.columns[col_idx]
+        formatter = self._column_formatter(col_idx)
+        rows = self.rows
+        self.order = sorted(range(len(rows)), key=lambda i: formatter(rows[i].get(col)) or "", reverse=reverse)
+        self.invalidate()
+
+    def invalidate(self):
+        """清空格式化缓存"""
+        self._cache.clear()
+
+    def virtual_rows(self):
+        """返回可直接交给表格组件的虚拟行序列"""
+        return VirtualRows(self)
+
+
+class _VirtualRow(list):
+    """虚拟行：长度固定为列数，读取单元格时才向提供器请求格式化数据"""
+
+    __slots__ = ('_provider', '_row_idx')
+
+    def __init__(self, provider, row_idx):
+        super().__init__()
+        self._provider = provider
+        self._row_idx = row_idx
+
+    def _values(self):
+        return self._provider.get_row(self._row_idx)
+
+    def __len__(self):
+        return len(self._provider.columns)
+
+    def __getitem__(self, key):
+        return self._values()[key]
+
+    def __iter__(self):
+        return iter(self._values())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return repr(self._values())
+
+    def copy(self):
+        return list(self._values())
+
+
+class VirtualRows(list):
+    """虚拟行序列
+
+    继承list以通过表格组件的类型检查，但自身不存放行数据；
+    长度和行访问都委托给TableDataProvider，表格只绘制可见区域，
+    因此只有可见行会被格式化。
+    """
+
+    def __init__(self, provider):
+        super().__init__()
+        self.provider = provider
+
+    def __len__(self):
+        return len(self.provider)
+
+    def __bool__(self):
+        return len(self.provider) > 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [_VirtualRow(self.provider, i) for i in range(*key.indices(len(self.provider)))]
+        if key < 0:
+            key += len(self.provider)
+        if not 0 <= key < len(self.provider):
+            raise IndexError("虚拟行索引超出范围")
+        return _VirtualRow(self.provider, key)
+
+    def __iter__(self):
+        provider = self.provider
+        return (_VirtualRow(provider, i) for i in range(len(provider)))
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"VirtualRows({len(self.provider)} 行)"
+
+    def copy(self):
+        return list(self)
+
+
+class TablePager:
+    """分页表格数据
+
+    表格每次只持有一页格式化后的行，首次显示只需格式化当前页，耗时与数据总行数无关。
+    切换页码后在后台线程中预先格式化相邻的上一页和下一页，只保留当前页及相邻页。
+    """
+
+    DEFAULT_PAGE_SIZE = 200
+
+    def __init__(self, provider, page_size=None):
+        self.provider = provider
+        self.page_size = max(1, int(page_size or self.DEFAULT_PAGE_SIZE))
+        self.page = 0
+        self._pages = {}  # 页码 -> 格式化后的行列表
+        self._lock = threading.Lock()
+        self._generation = 0  # 排序或失效后递增，丢弃进行中的预取结果
+
+    def __len__(self):
+        return len(self.provider)
+
+    @property
+    def page_count(self):
+        return max(1, -(-len(self.provider) // self.page_size))
+
+    def page_of_row(self, row_idx):
+        """获取指定行所在的页码"""
+        return min(max(row_idx, 0) // self.page_size, self.page_count - 1)
+
+    def page_range(self, page=None):
+        """获取页的行号范围 (起始, 结束)，page为None时使用当前页"""
+        if page is None:
+            page = self.page
+        start = page * self.page_size
+        return start, min(start + self.page_size, len(self.provider))
+
+    def _format_page(self, page):
+        start, stop = self.page_range(page)
+        # 不经过提供器的LRU缓存，后台线程格式化时不与界面线程共享可变状态
+        format_row = self.provider.format_row
+        return [format_row(i) for i in range(start, stop)]
+
+    def get_page(self, page):
+        """切换到指定页并返回该页的格式化行，已预取时直接返回"""
+        page = min(max(page, 0), self.page_count - 1)
+        with self._lock:
+            rows = self._pages.get(page)
+        if rows is None:
+            rows = self._format_page(page)
+        with self._lock:
+            self.page = page
+            self._pages[page] = rows
+            # 只保留当前页和相邻页
+            for cached in [p for p in self._pages if abs(p - page) > 1]:
+                del self._pages[cached]
+        return rows
+
+    def is_cached(self, page):
+        with self._lock:
+            return page in self._pages
+
+    def prefetch(self):
+        """在后台线程中格式化当前页的相邻页"""
+        with self._lock:
+            generation = self._generation
+            pages = [p for p in (self.page + 1, self.page - 1)
+                     if 0 <= p < self.page_count and p not in self._pages]
+        if not pages:
+            return
+
+        def work():
+            for page in pages:
+                with self._lock:
+                    if generation != self._generation or abs(page - self.page) > 1:
+                        return
+                rows = self._format_page(page)
+                with self._lock:
+                    # 格式化期间已排序或翻到别处时丢弃结果
+                    if generation == self._generation and abs(page - self.page) <= 1:
+                        self._pages.setdefault(page, rows)
+
+        threading.Thread(target=work, name="TablePagePrefetch", daemon=True).start()
+
+    def sort(self, col_idx, reverse=False):
+        """按列排序全部数据，已格式化的页全部失效"""
+        self.provider.sort(col_idx, reverse)
+        self.invalidate()
+
+    def invalidate(self):
+        """清空已格式化的页"""
+        with self._lock:
+            self._generation += 1
+            self._pages.clear()
+
+
+class RowDiff:
+    """按行标识计算的表格差异
+
+    deletes为需要删除的旧行号，inserts为新数据中需要插入的行区间[(起始, 结束)]，
+    kept为保持不动的行 [(旧行号, 新行号)]。先删除、再按新行号升序插入，
+    即可把旧表格变为新表格，保留行只需比较单元格内容。
+    """
+
+    __slots__ = ('deletes', 'inserts', 'kept')
+
+    def __init__(self, deletes, inserts, kept):
+        self.deletes = deletes
+        self.inserts = inserts
+        self.kept = kept
+
+    @property
+    def inserted_count(self):
+        return sum(stop - start for start, stop in self.inserts)
+
+
+def _longest_increasing(pairs):
+    """求按第二项严格递增的最长子序列（耐心排序，O(n log n)）"""
+    tails = []  # 各长度子序列末尾元素的新行号
+    tail_ids = []  # 对应pairs中的位置
+    parents = [-1] * len(pairs)
+    for i, (_, new_idx) in enumerate(pairs):
+        pos = bisect_left(tails, new_idx)
+        if pos == len(tails):
+            tails.append(new_idx)
+            tail_ids.append(i)
+        else:
+            tails[pos] = new_idx
+            tail_ids[pos] = i
+        parents[i] = tail_ids[pos - 1] if pos > 0 else -1
+
+    result = []
+    i = tail_ids[-1] if tail_ids else -1
+    while i >= 0:
+        result.append(pairs[i])
+        i = parents[i]
+    result.reverse()
+    return result
+
+
+def diff_rows_by_key(old_keys, new_keys):
+    """按行标识比较新旧两组行，返回RowDiff；行标识不唯一时返回None
+
+    新旧都存在且相对顺序不变的最长序列保持不动，其余旧行删除、新行插入，
+    因此移动的行表现为一次删除加一次插入。
+    """
+    new_positions = {}
+    for i, key in enumerate(new_keys):
+        if key in new_positions:
+            return None
+        new_positions[key] = i
+    if len(set(old_keys)) != len(old_keys):
+        return None
+
+    common = [(i, new_positions[key]) for i, key in enumerate(old_keys) if key in new_positions]
+    kept = _longest_increasing(common)
+
+    kept_old = {old_idx for old_idx, _ in kept}
+    deletes = [i for i in range(len(old_keys)) if i not in kept_old]
+
+    kept_new = {new_idx for _, new_idx in kept}
+    inserts = []
+    start = None
+    for i in range(len(new_keys)):
+        if i in kept_new:
+            if start is not None:
+                inserts.append((start, i))
+                start = None
+        elif start is None:
+            start = i
+    if start is not None:
+        inserts.append((start, len(new_keys)))
+
+    return RowDiff(deletes, inserts, kept)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+界面任务调度模块
+把大量控件创建、表格着色等界面工作切分为小步，在after()回调中按帧时间预算执行
+"""
+
+import heapq
+import itertools
+import logging
+import time
+
+
+class _Job:
+    """调度任务：steps为迭代器，每次next()执行一小步工作"""
+
+    __slots__ = ('name', 'priority', 'steps', 'on_done', 'cancelled')
+
+    def __init__(self, name, priority, steps, on_done):
+        self.name = name
+        self.priority = priority
+        self.steps = steps
+        self.on_done = on_done
+        self.cancelled = False
+
+
+class UIScheduler:
+    """协作式界面任务调度器
+
+    每个任务是一个生成器（或可迭代的步骤），调度器在每次after()回调中
+    按优先级执行任务步骤，用完帧时间预算后让出事件循环，保证界面可以响应输入。
+    同名任务再次提交时，尚未完成的旧任务会被取消。
+    """
+
+    # 优先级，数值越小越先执行
+    PRIORITY_VISIBLE = 0  # 用户正在看的内容
+    PRIORITY_NORMAL = 10
+    PRIORITY_BACKGROUND = 20  # 着色、预计算等可延后的工作
+
+    DEFAULT_FRAME_BUDGET_MS = 8
+
+    def __init__(self, widget, frame_budget_ms=None):
+        self.widget = widget
+        self.frame_budget = (frame_budget_ms or self.DEFAULT_FRAME_BUDGET_MS) / 1000.0
+        self._queue = []  # (优先级, 序号, 任务)
+        self._jobs = {}  # 任务名 -> 任务
+        self._counter = itertools.count()
+        self._after_id = None
+
+    def schedule(self, name, steps, priority=PRIORITY_NORMAL, on_done=None):
+        """提交任务
+
+        Args:
+            name: 任务名，同名的未完成任务会被取消
+            steps: 生成器或可迭代对象，每一项代表一小步已执行的工作
+            priority: 优先级，数值越小越先执行
+            on_done: 任务完成后的回调（任务被取消时不调用）
+        """
+        self.cancel(name)
+        job = _Job(name, priority, iter(steps), on_done)
+        self._jobs[name] = job
+        heapq.heappush(self._queue, (priority, next(self._counter), job))
+        self._ensure_running()
+        return job
+
+    def cancel(self, name):
+        """取消指定名称的任务"""
+        job = self._jobs.pop(name, None)
+        if job is not None:
+            job.cancelled = True
+            close = getattr(job.steps, 'close', None)
+            if close is not None:
+                try:
+                    close()
+                except ValueError:
+                    pass  # 任务在自身的步骤中取消自己，生成器正在执行
+
+    def cancel_all(self):
+        """取消全部任务"""
+        for name in list(self._jobs):
+            self.cancel(name)
+
+    def is_pending(self, name):
+        """检查任务是否尚未完成"""
+        return name in self._jobs
+
+    def run_now(self, name):
+        """立即同步执行完指定任务，用于关闭窗口等需要结果的场景"""
+        job = self._jobs.get(name)
+        if job is None:
+            return
+        for _ in job.steps:
+            pass
+        self._finish(job)
+
+    def _ensure_running(self):
+        if self._after_id is None:
+            try:
+                self._after_id = self.widget.after(1, self._run_slice)
+            except Exception as e:
+                logging.error(f"界面任务调度失败: {e}")
+
+    def _finish(self, job):
+        job.cancelled = True
+        if self._jobs.get(job.name) is job:
+            del self._jobs[job.name]
+        if job.on_done:
+            try:
+                job.on_done()
+            except Exception as e:
+                logging.error(f"界面任务 {job.name} 完成回调出错: {e}")
+
+    def _run_slice(self):
+        """在帧时间预算内执行任务步骤"""
+        self._after_id = None
+        deadline = time.perf_counter() + self.frame_budget
+        queue = self._queue
+
+        while queue:
+            job = queue[0][2]
+            if job.cancelled:
+                heapq.heappop(queue)
+                continue
+            # 任务步骤中可能提交新任务，队首会变化；结束的任务只做标记，由队首检查移除
+            try:
+                next(job.steps)
+            except StopIteration:
+                self._finish(job)
+            except Exception as e:
+                # 控件已销毁等情况，放弃该任务，不影响其他任务
+                job.cancelled = True
+                if self._jobs.get(job.name) is job:
+                    del self._jobs[job.name]
+                logging.warning(f"界面任务 {job.name} 执行出错，已取消: {e}")
+            if time.perf_counter() >= deadline:
+                break
+
+        # 清理队首已结束的任务，只在还有未完成任务时继续调度
+        while queue and queue[0][2].cancelled:
+            heapq.heappop(queue)
+        if queue:
+            self._ensure_running()
+
+
+def get_ui_scheduler(widget):
+    """获取控件所在窗口的界面任务调度器，不存在时创建"""
+    toplevel = widget.winfo_toplevel()
+    scheduler = getattr(toplevel, 'ui_scheduler', None)
+    if scheduler is None:
+        scheduler = UIScheduler(toplevel)
+        toplevel.ui_scheduler = scheduler
+    return scheduler
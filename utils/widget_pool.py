@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+控件池模块
+复用已创建的Tk控件，切换显示内容时只更新文本和位置，不再销毁重建
+"""
+
+
+class WidgetPool:
+    """控件池
+
+    控件按获取顺序复用：每次刷新前调用reset(需要的数量)，多出的控件通过grid_remove
+    隐藏（保留控件和事件绑定），然后依次acquire()取出控件并更新内容与位置。
+    """
+
+    def __init__(self, parent, factory):
+        """
+        Args:
+            parent: 控件的父容器
+            factory: 创建新控件的函数 factory(parent) -> widget，事件绑定在此一次完成
+        """
+        self.parent = parent
+        self.factory = factory
+        self.widgets = []
+        self._next = 0
+
+    def __len__(self):
+        return len(self.widgets)
+
+    def reset(self, count=0):
+        """开始新一轮复用，隐藏序号不小于count的控件"""
+        for widget in self.widgets[count:]:
+            widget.grid_remove()
+        self._next = 0
+
+    def acquire(self):
+        """取出下一个控件，池中不足时创建新控件"""
+        if self._next < len(self.widgets):
+            widget = self.widgets[self._next]
+        else:
+            widget = self.factory(self.parent)
+            self.widgets.append(widget)
+        self._next += 1
+        return widget
@@ -5,5 +5,6 @@ from .main_app_view import MainAppView
 from .document_info_view import DocumentInfoView
 from .factor_view import FactorView
 from .sub_factor_detail_view import SubFactorDetailView
+from .global_search_view import GlobalSearchView
 
-__all__ = ['MainAppView', 'DocumentInfoView', 'FactorView', 'SubFactorDetailView']
\ No newline at end of file
+__all__ = ['MainAppView', 'DocumentInfoView', 'FactorView', 'SubFactorDetailView', 'GlobalSearchView']
\ No newline at end of file
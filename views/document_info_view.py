@@ -1,5 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
+from utils.ui_scheduler import UIScheduler, get_ui_scheduler
+from utils.widget_pool import WidgetPool
 
 
 class DocumentInfoView:
@@ -7,6 +9,8 @@ class DocumentInfoView:
         self.frame = parent
         self.controller = controller
         self.labels = {}
+        self._field_pool = None  # 字段标签池，切换单据时复用标签
+        self._no_data_label = None
         
         # 创建右键菜单
         self.create_context_menu()
@@ -47,15 +51,35 @@ class DocumentInfoView:
         except:
             pass
         
+    def _get_field_pool(self, parent_frame):
+        """获取字段标签池，主容器框架和标签只创建一次"""
+        if self._field_pool is None:
+            # 直接在parent_frame上创建主容器框架，不添加额外滚动条
+            info_frame = tk.Frame(parent_frame, bg="white")
+            self._field_pool = WidgetPool(info_frame, self._create_field_label)
+        return self._field_pool
+    
+    def _show_no_data(self):
+        """隐藏字段区域并显示暂无单据信息提示"""
+        if self._field_pool is not None:
+            self._field_pool.reset(0)
+            self._field_pool.parent.pack_forget()
+        if self._no_data_label is None:
+            self._no_data_label = ttk.Label(self.frame, text="暂无单据信息", style="Info.TLabel")
+        self._no_data_label.pack(pady=20)
+    
     def _create_field_display_layout(self, parent_frame, data, is_default=False):
         """统一的字段显示布局方法"""
         try:
             if not data:
                 return
             
-            # 直接在parent_frame上创建主容器框架，不添加额外滚动条
-            info_frame = tk.Frame(parent_frame, bg="white")
-            info_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            field_pool = self._get_field_pool(parent_frame)
+            info_frame = field_pool.parent
+            if self._no_data_label is not None:
+                self._no_data_label.pack_forget()
+            if not info_frame.winfo_manager():
+                info_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
             
             # 获取配置文件中的字段顺序
             doc_info_fields = self.controller.config_manager.get_document_info_fields()
@@ -86,59 +110,81 @@ class DocumentInfoView:
             for col in range(fields_per_row):
                 info_frame.grid_columnconfigure(col, weight=1, uniform="field_column")
             
+            # 隐藏本次用不到的标签
+            field_pool.reset(len(ordered_display_names))
+            
             # 显示字段组，使用Grid布局确保对齐
-            for row_idx, group in enumerate(field_groups):
-                # 配置行权重
-                info_frame.grid_rowconfigure(row_idx, weight=0)
-                
-                # 为每个字段创建标签并放置在Grid中
-                for col_idx, field_key in enumerate(group):
-                    field_value = data[field_key]
-                    value_text = str(field_value) if field_value is not None else ("待加载..." if is_default else "N/A")
-                    
-                    # 字段名和值在同一行显示 - 统一字体颜色
-                    if value_text in ["N/A", "待加载..."]:
-                        value_color = "#333333"  # 统一为深灰色
-                        value_font = ("Microsoft YaHei UI", 9, "italic")
-                    else:
-                        value_color = "#000000"  # 统一为黑色
-                        value_font = ("Microsoft YaHei UI", 9, "normal")
-                    
-                    # 创建字段标签
-                    field_text = f"{field_key}: {value_text}"
-                    field_label = tk.Label(info_frame, text=field_text, 
-                                         font=("Microsoft YaHei UI", 9),
-                                         foreground=value_color,
-                                         cursor="hand2",
-                                         background="white",
-                                         anchor="w",
-                                         relief="flat",
-                                         padx=8, pady=3)
-                    # 使用Grid布局放置标签，sticky="ew"确保水平填充
-                    field_label.grid(row=row_idx, column=col_idx, sticky="ew", padx=2, pady=1)
+            # 标签按帧分片更新，重新加载单据时未完成的旧任务会被取消
+            def update_field_labels():
+                for row_idx, group in enumerate(field_groups):
+                    # 配置行权重
+                    info_frame.grid_rowconfigure(row_idx, weight=0)
                     
-                    # 绑定复制功能（仅在非默认模式下）
-                    if not is_default:
-                        field_label.bind("<Button-3>", lambda e, text=value_text: self.show_field_menu(e, text))
-                        field_label.bind("<Double-Button-1>", lambda e, text=value_text: self.copy_value_to_clipboard(text))
-                        
-                        # 悬停效果（改变背景色）
-                        def on_enter(e, label=field_label):
-                            label.configure(background="#e8f4fd")
-                        def on_leave(e, label=field_label):
-                            label.configure(background="white")
-                        
-                        field_label.bind("<Enter>", on_enter)
-                        field_label.bind("<Leave>", on_leave)
+                    # 为每个字段取出池中标签并放置在Grid中
+                    for col_idx, field_key in enumerate(group):
+                        self._update_field_label(field_pool.acquire(), row_idx, col_idx,
+                                                 field_key, data[field_key], is_default)
+                        yield
+            
+            get_ui_scheduler(self.frame).schedule("document_info", update_field_labels(),
+                                                  UIScheduler.PRIORITY_VISIBLE)
             
         except Exception as e:
             self.controller.logger.error(f"创建字段显示布局失败: {e}")
     
+    def _create_field_label(self, info_frame):
+        """创建字段标签并一次性绑定事件；默认占位模式下不响应复制和悬停"""
+        field_label = tk.Label(info_frame,
+                             font=("Microsoft YaHei UI", 9),
+                             cursor="hand2",
+                             background="white",
+                             anchor="w",
+                             relief="flat",
+                             padx=8, pady=3)
+        field_label.field_value = ""
+        field_label.copyable = False
+        
+        # 绑定复制功能（仅在非默认模式下生效）
+        def on_right_click(e, label=field_label):
+            if label.copyable:
+                self.show_field_menu(e, label.field_value)
+        def on_double_click(e, label=field_label):
+            if label.copyable:
+                self.copy_value_to_clipboard(label.field_value)
+        
+        # 悬停效果（改变背景色）
+        def on_enter(e, label=field_label):
+            if label.copyable:
+                label.configure(background="#e8f4fd")
+        def on_leave(e, label=field_label):
+            label.configure(background="white")
+        
+        field_label.bind("<Button-3>", on_right_click)
+        field_label.bind("<Double-Button-1>", on_double_click)
+        field_label.bind("<Enter>", on_enter)
+        field_label.bind("<Leave>", on_leave)
+        return field_label
+    
+    def _update_field_label(self, field_label, row_idx, col_idx, field_key, field_value, is_default=False):
+        """更新字段标签的文本、颜色和Grid位置"""
+        value_text = str(field_value) if field_value is not None else ("待加载..." if is_default else "N/A")
+        
+        # 字段名和值在同一行显示 - 统一字体颜色
+        if value_text in ["N/A", "待加载..."]:
+            value_color = "#333333"  # 统一为深灰色
+        else:
+            value_color = "#000000"  # 统一为黑色
+        
+        field_label.field_value = value_text
+        field_label.copyable = not is_default
+        field_label.configure(text=f"{field_key}: {value_text}", foreground=value_color, background="white")
+        # 使用Grid布局放置标签，sticky="ew"确保水平填充
+        field_label.grid(row=row_idx, column=col_idx, sticky="ew", padx=2, pady=1)
+    
     def show_default_info(self):
         """根据配置显示单据基本信息字段框架"""
-        # 清除现有控件
-        for widget in self.frame.winfo_children():
-            widget.destroy()
+        # 取消尚未完成的上一次标签更新任务
+        get_ui_scheduler(self.frame).cancel("document_info")
         
         # 获取配置的文档信息字段
         try:
@@ -146,8 +192,7 @@ class DocumentInfoView:
             
             if not doc_info_fields:
                 # 如果没有配置字段，显示空白框架
-                no_data_label = ttk.Label(self.frame, text="暂无单据信息", style="Info.TLabel")
-                no_data_label.pack(pady=20)
+                self._show_no_data()
                 return
             
             # 创建默认数据字典，用于布局计算
@@ -161,20 +206,17 @@ class DocumentInfoView:
                     
         except Exception as e:
             # 如果出错，显示空白框架
-            no_data_label = ttk.Label(self.frame, text="暂无单据信息", style="Info.TLabel")
-            no_data_label.pack(pady=20)
+            self._show_no_data()
 
     def display_info(self, data):
         """显示单据基本信息数据"""
-        # 清除现有控件
-        for widget in self.frame.winfo_children():
-            widget.destroy()
+        # 取消尚未完成的上一次标签更新任务
+        get_ui_scheduler(self.frame).cancel("document_info")
         
         # 如果没有数据，显示提示信息
         if not data:
-            no_data_label = ttk.Label(self.frame, text="暂无单据信息", style="Info.TLabel")
-            no_data_label.pack(pady=20)
+            self._show_no_data()
             return
         
         # 直接使用统一的字段显示布局方法，不使用Canvas滚动
-        self._create_field_display_layout(self.frame, data, is_default=False)
\ No newline at end of file
+        self._create_field_display_layout(self.frame, data, is_default=False)
@@ -1,9 +1,13 @@
 import tkinter as tk
 from tkinter import ttk
+from utils.search_index import NameFilterIndex
 from .sub_factor_detail_view import SubFactorDetailView
 
 
 class FactorView:
+    # 子因子列表每行的高度（像素），列表只为可见行创建按钮
+    SUBFACTOR_ROW_HEIGHT = 28
+    
     def __init__(self, parent, controller):
         self.frame = parent
         self.controller = controller
@@ -23,58 +27,173 @@ class FactorView:
         self.subfactor_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         self.subfactor_var = tk.StringVar()
-        self.subfactor_radios = {}
+        self.subfactor_filter_var = tk.StringVar()
         self.subfactor_buttons_frame = ttk.Frame(self.subfactor_frame)
         self.subfactor_buttons_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # 创建滚动区域用于子因子按钮
-        self.create_scrollable_subfactor_area()
-        
         self.tabs = {}
         self.current_factors = []
+        self.current_category = None
+        self.factor_categories = {}
+        self._factor_indexes = {}  # 分类 -> (因子名称列表, 显示名称字典, 名称过滤索引)
+        self.filtered_factor_names = []  # 过滤后要显示的子因子名称
+        self._subfactor_display_names = {}
+        self._subfactor_slots = []  # 复用的 (单选按钮, 画布窗口ID)
+        self._subfactor_render_id = None
+        
+        # 创建滚动区域用于子因子按钮
+        self.create_scrollable_subfactor_area()
         
         # 初始化右侧详情视图（延迟创建）
         self.detail_view = None
 
     def create_scrollable_subfactor_area(self):
-        """创建可滚动的子因子选择区域"""
+        """创建可滚动的子因子选择区域
+
+        列表按固定行高虚拟化：画布的滚动区域按子因子总数计算，
+        只为可见行放置按钮，滚动时复用按钮并更新文本和位置。
+        """
+        # 子因子过滤框
+        filter_frame = ttk.Frame(self.subfactor_buttons_frame)
+        filter_frame.pack(side="top", fill="x", pady=(0, 5))
+        ttk.Label(filter_frame, text="过滤:").pack(side="left", padx=(0, 4))
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.subfactor_filter_var)
+        filter_entry.pack(side="left", fill="x", expand=True)
+        # 回车选中第一个过滤结果
+        filter_entry.bind("<Return>", self._on_filter_return)
+        self.subfactor_count_label = ttk.Label(filter_frame, text="", foreground="#666666")
+        self.subfactor_count_label.pack(side="left", padx=(4, 0))
+        self.subfactor_filter_var.trace("w", self._on_subfactor_filter_change)
+        
         # 创建Canvas和Scrollbar
-        self.canvas = tk.Canvas(self.subfactor_buttons_frame, highlightthickness=0, bg="white")
+        self.canvas = tk.Canvas(self.subfactor_buttons_frame, highlightthickness=0, bg="white",
+                                yscrollincrement=self.SUBFACTOR_ROW_HEIGHT)
         self.scrollbar = ttk.Scrollbar(self.subfactor_buttons_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.configure(yscrollcommand=self._on_subfactor_yscroll)
         
         self.canvas.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
         
+        # 画布尺寸变化时重新计算可见行
+        self.canvas.bind("<Configure>", lambda e: self._update_subfactor_scrollregion())
+        
         # 绑定鼠标滚轮事件
         self.canvas.bind("<MouseWheel>", self._on_mousewheel)
         
     def _on_mousewheel(self, event):
         """处理鼠标滚轮事件"""
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+    
+    def _on_subfactor_yscroll(self, first, last):
+        """画布滚动后同步滚动条，并在空闲时重新放置可见行按钮"""
+        self.scrollbar.set(first, last)
+        self._schedule_subfactor_render()
+    
+    def _schedule_subfactor_render(self):
+        if self._subfactor_render_id is None:
+            self._subfactor_render_id = self.canvas.after_idle(self._render_visible_subfactors)
+    
+    def _update_subfactor_scrollregion(self):
+        """按过滤后的子因子数量设置滚动区域"""
+        total_height = len(self.filtered_factor_names) * self.SUBFACTOR_ROW_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), total_height))
+        self._schedule_subfactor_render()
+    
+    def _create_subfactor_slot(self):
+        """创建一个可复用的子因子按钮，事件只绑定一次"""
+        radio = ttk.Radiobutton(self.canvas, variable=self.subfactor_var,
+                                style="Tech.TRadiobutton")
+        radio.factor_name = None
+        radio.configure(command=lambda r=radio: self.on_subfactor_select(r.factor_name))
+        # 鼠标在按钮上时同样可以滚动列表
+        radio.bind("<MouseWheel>", self._on_mousewheel)
+        window_id = self.canvas.create_window(5, 0, window=radio, anchor="nw")
+        return radio, window_id
+    
+    def _render_visible_subfactors(self):
+        """只为可见区域内的子因子放置按钮，多余的按钮隐藏"""
+        self._subfactor_render_id = None
+        names = self.filtered_factor_names
+        row_height = self.SUBFACTOR_ROW_HEIGHT
+        height = self.canvas.winfo_height()
+        if height <= 1:
+            height = 400  # 画布尚未布局时按默认高度估算
+        top = self.canvas.canvasy(0)
+        first = max(0, int(top // row_height))
+        last = min(len(names), int((top + height) // row_height) + 1)
+        
+        slots = self._subfactor_slots
+        while len(slots) < last - first:
+            slots.append(self._create_subfactor_slot())
+        
+        for slot_idx, (radio, window_id) in enumerate(slots):
+            row_idx = first + slot_idx
+            if row_idx >= last:
+                self.canvas.itemconfigure(window_id, state="hidden")
+                continue
+            name = names[row_idx]
+            if radio.factor_name != name:
+                radio.factor_name = name
+                radio.configure(text=self._subfactor_display_names.get(name, name), value=name)
+            self.canvas.coords(window_id, 5, row_idx * row_height + 3)
+            self.canvas.itemconfigure(window_id, state="normal")
+    
+    def _get_factor_index(self, category, factors):
+        """获取分类的子因子名称、显示名称和过滤索引，每个分类只构建一次"""
+        cached = self._factor_indexes.get(category)
+        if cached is not None and cached[0] is factors:
+            return cached[1]
+        names = [factor['name'] for factor in factors]
+        display_names = {name: self.controller.config_manager.get_display_name(name) for name in names}
+        # 按因子名称和显示名称都可以过滤
+        index = NameFilterIndex([f"{name} {display_names[name]}" for name in names])
+        entry = (names, display_names, index)
+        self._factor_indexes[category] = (factors, entry)
+        return entry
+    
+    def _on_subfactor_filter_change(self, *args):
+        """过滤框内容变化时通过索引筛选子因子"""
+        if not self.current_factors:
+            return
+        names, _, index = self._get_factor_index(self.current_category, self.current_factors)
+        self._show_subfactor_names([names[i] for i in index.filter(self.subfactor_filter_var.get())])
+    
+    def _on_filter_return(self, event=None):
+        """回车选中第一个过滤结果"""
+        if self.filtered_factor_names:
+            first_factor_name = self.filtered_factor_names[0]
+            if first_factor_name != self.subfactor_var.get():
+                self.safe_set_subfactor_selection(first_factor_name)
+                self.on_subfactor_select(first_factor_name)
+    
+    def _show_subfactor_names(self, names):
+        """显示指定的子因子列表并滚动到顶部"""
+        self.filtered_factor_names = names
+        total = len(self.current_factors)
+        self.subfactor_count_label.config(text=f"{len(names)}/{total}" if len(names) != total else f"{total}")
+        self._update_subfactor_scrollregion()
+        self.canvas.yview_moveto(0)
 
     def setup_tabs(self, factor_categories):
-        # 清除现有的分类按钮
-        for widget in self.category_buttons_frame.winfo_children():
-            widget.destroy()
-        self.category_radios = {}
+        # 显示名称可能随配置变化，重新加载时重建过滤索引
+        self._factor_indexes = {}
+        self.factor_categories = factor_categories
         
-        # 创建分类选择按钮
-        for i, (category, factors) in enumerate(factor_categories.items()):
-            radio = ttk.Radiobutton(self.category_buttons_frame, text=category,
-                                  variable=self.category_var, value=category,
-                                  style="Tech.TRadiobutton",
-                                  command=lambda cat=category, facs=factors: self.on_category_select(cat, facs))
-            radio.pack(anchor=tk.W, pady=2)
-            self.category_radios[category] = radio
+        if list(self.category_radios) != list(factor_categories):
+            # 分类变化时才重建分类按钮，重新加载数据时复用已有按钮
+            for widget in self.category_buttons_frame.winfo_children():
+                widget.destroy()
+            self.category_radios = {}
+            
+            # 创建分类选择按钮，命令按分类名称读取最新的因子列表
+            for category in factor_categories:
+                radio = ttk.Radiobutton(self.category_buttons_frame, text=category,
+                                      variable=self.category_var, value=category,
+                                      style="Tech.TRadiobutton",
+                                      command=lambda cat=category: self.on_category_select(
+                                          cat, self.factor_categories.get(cat, [])))
+                radio.pack(anchor=tk.W, pady=2)
+                self.category_radios[category] = radio
         
         # 默认选择第一个分类
         if factor_categories:
@@ -83,28 +202,36 @@ class FactorView:
             self.category_var.set(first_category)
             self.on_category_select(first_category, first_factors)
     
+    def refresh_subfactor_names(self):
+        """显示名称变化后重建当前分类的过滤索引并更新列表文本，保留过滤条件和选择"""
+        self._factor_indexes = {}
+        if not self.current_factors:
+            return
+        _, display_names, _ = self._get_factor_index(self.current_category, self.current_factors)
+        self._subfactor_display_names = display_names
+        for radio, _ in self._subfactor_slots:
+            radio.factor_name = None
+        self._on_subfactor_filter_change()
+    
     def on_category_select(self, category, factors):
         """处理分类选择事件"""
+        self.current_category = category
         self.current_factors = factors
         self.setup_subfactor_buttons(factors)
     
     def setup_subfactor_buttons(self, factors):
-        """设置子因子按钮"""
-        # 清除现有的子因子按钮
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        self.subfactor_radios = {}
-        
-        # 创建子因子选择按钮
-        for factor in factors:
-            factor_name = factor['name']
-            display_name = self.controller.config_manager.get_display_name(factor_name)
-            radio = ttk.Radiobutton(self.scrollable_frame, text=display_name,
-                                  variable=self.subfactor_var, value=factor_name,
-                                  style="Tech.TRadiobutton",
-                                  command=lambda sf=factor_name: self.on_subfactor_select(sf))
-            radio.pack(anchor=tk.W, pady=3, padx=5)
-            self.subfactor_radios[factor_name] = radio
+        """设置子因子按钮：更新虚拟列表的数据，只有可见行会放置按钮"""
+        names, display_names, _ = self._get_factor_index(self.current_category, factors)
+        self._subfactor_display_names = display_names
+        # 已放置的按钮需要按新列表重新设置文本
+        for radio, _ in self._subfactor_slots:
+            radio.factor_name = None
+        
+        # 切换分类时清空过滤条件（此时不触发过滤），显示全部子因子
+        self.current_factors = []
+        self.subfactor_filter_var.set("")
+        self.current_factors = factors
+        self._show_subfactor_names(names)
         
         # 默认选择第一个子因子
         if factors:
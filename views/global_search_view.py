@@ -0,0 +1,119 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class GlobalSearchView:
+    """整单全局搜索窗口，结果按层级分组，双击命中项跳转到对应层级的表格行"""
+
+    def __init__(self, parent, controller):
+        self.parent = parent
+        self.controller = controller
+        self.window = None
+        self.search_var = tk.StringVar()
+        self.hit_items = {}  # Treeview条目ID -> (层级, 层级内序号)
+        self._search_after_id = None
+        self.search_var.trace("w", self.on_search_change)
+
+    def open(self):
+        """打开或激活全局搜索窗口"""
+        if self.window is not None and self.window.winfo_exists():
+            self.window.deiconify()
+            self.window.lift()
+            self.search_entry.focus_set()
+            return
+
+        self.window = tk.Toplevel(self.parent)
+        self.window.title("全局搜索")
+        self.window.geometry("640x480")
+        self.window.transient(self.parent)
+
+        # 搜索输入区域
+        search_frame = ttk.Frame(self.window)
+        search_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
+
+        ttk.Label(search_frame, text="🔍 整单搜索",
+                  font=("Microsoft YaHei UI", 9, "bold"),
+                  foreground="#2563eb").pack(side=tk.LEFT, padx=(0, 6))
+
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var,
+                                      font=("Microsoft YaHei UI", 10))
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_entry.bind("<Return>", lambda e: self.run_search())
+
+        self.status_label = ttk.Label(self.window, text="输入部件编码或任意字段值进行搜索",
+                                      foreground="#666666")
+        self.status_label.pack(fill=tk.X, padx=10)
+
+        # 结果区域：层级为父节点，命中为子节点
+        tree_frame = ttk.Frame(self.window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(5, 10))
+
+        self.result_tree = ttk.Treeview(tree_frame, columns=("field", "value"), show="tree headings")
+        self.result_tree.heading("#0", text="层级 / 行")
+        self.result_tree.heading("field", text="字段")
+        self.result_tree.heading("value", text="值")
+        self.result_tree.column("#0", width=160)
+        self.result_tree.column("field", width=160)
+        self.result_tree.column("value", width=280)
+
+        v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.result_tree.yview)
+        self.result_tree.configure(yscrollcommand=v_scrollbar.set)
+        self.result_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.result_tree.bind("<Double-1>", self.on_result_double_click)
+        self.result_tree.bind("<Return>", self.on_result_double_click)
+
+        self.search_entry.focus_set()
+
+    def on_search_change(self, *args):
+        """搜索框内容变化时防抖执行搜索"""
+        if self.window is None or not self.window.winfo_exists():
+            return
+        if self._search_after_id is not None:
+            self.window.after_cancel(self._search_after_id)
+        self._search_after_id = self.window.after(200, self.run_search)
+
+    def run_search(self):
+        """执行全局搜索并刷新结果"""
+        self._search_after_id = None
+        query = self.search_var.get().strip()
+
+        self.result_tree.delete(*self.result_tree.get_children())
+        self.hit_items = {}
+
+        if not query:
+            self.status_label.config(text="输入部件编码或任意字段值进行搜索")
+            return
+
+        results = self.controller.search_document(query)
+        if not results:
+            self.status_label.config(text=f"未找到与 '{query}' 匹配的内容")
+            return
+
+        config_manager = self.controller.config_manager
+        total = 0
+        for level, group in results.items():
+            total += group["count"]
+            level_name = config_manager.get_data_hierarchy_name(level)
+            shown = len(group["hits"])
+            suffix = f"{group['count']}" if shown == group["count"] else f"{shown}/{group['count']}"
+            level_item = self.result_tree.insert("", tk.END, text=f"{level_name} ({suffix})", open=True)
+            for hit in group["hits"]:
+                item = self.result_tree.insert(
+                    level_item, tk.END,
+                    text=f"第 {hit['ordinal'] + 1} 行",
+                    values=(config_manager.get_display_name(hit["field"]), hit["value"])
+                )
+                self.hit_items[item] = (hit["level"], hit["ordinal"])
+
+        self.status_label.config(text=f"共找到 {total} 处匹配，双击结果跳转到对应行")
+
+    def on_result_double_click(self, event=None):
+        """双击命中项时跳转到对应层级的表格行"""
+        selection = self.result_tree.selection()
+        if not selection:
+            return
+        target = self.hit_items.get(selection[0])
+        if target:
+            self.controller.jump_to_search_hit(*target)
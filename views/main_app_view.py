@@ -3,6 +3,8 @@ from tkinter import ttk, messagebox
 from config_manager_ui import ConfigManagerUI
 from .document_info_view import DocumentInfoView
 from .factor_view import FactorView
+from .global_search_view import GlobalSearchView
+from utils.ui_scheduler import UIScheduler
 
 
 class MainAppView(tk.Tk):
@@ -13,6 +15,9 @@ class MainAppView(tk.Tk):
         self.geometry("1280x800")
         self.minsize(1024, 768)  # 设置最小窗口大小
         
+        # 界面任务调度器：大批量控件创建按帧分片执行
+        self.ui_scheduler = UIScheduler(self)
+        
         # 设置全局字体和样式
         self.font_config()
         
@@ -28,6 +33,9 @@ class MainAppView(tk.Tk):
         # 修复窗口显示问题
         self.fix_window_display()
         
+        # 关闭主窗口时先写入配置管理器中排队的修改
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
     def font_config(self):
         """配置全局字体和样式"""
         # 设置默认字体为微软雅黑
@@ -234,13 +242,16 @@ class MainAppView(tk.Tk):
         file_menu = tk.Menu(self.menu_bar, tearoff=0)
         file_menu.add_command(label="导入JSON", command=self.controller.load_data_action)
         file_menu.add_separator()
-        file_menu.add_command(label="退出", command=self.quit)
+        file_menu.add_command(label="退出", command=self.on_closing)
         self.menu_bar.add_cascade(label="文件", menu=file_menu)
         
         # 视图菜单
         view_menu = tk.Menu(self.menu_bar, tearoff=0)
         view_menu.add_command(label="刷新", command=lambda: self.controller.refresh_view())
+        view_menu.add_command(label="🔍 全局搜索", accelerator="Ctrl+Shift+F",
+                              command=self.open_global_search)
         self.menu_bar.add_cascade(label="视图", menu=view_menu)
+        self.bind_all("<Control-F>", lambda e: self.open_global_search())
         
         # 工具菜单
         tools_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -296,6 +307,15 @@ class MainAppView(tk.Tk):
         # 关闭按钮
         ttk.Button(about_window, text="确定", command=about_window.destroy).pack(pady=20)
     
+    def open_global_search(self):
+        """打开整单全局搜索窗口"""
+        try:
+            if not hasattr(self, 'global_search_view'):
+                self.global_search_view = GlobalSearchView(self, self.controller)
+            self.global_search_view.open()
+        except Exception as e:
+            tk.messagebox.showerror("错误", f"打开全局搜索失败：{e}")
+
     def open_config_manager(self):
         """打开配置管理器"""
         try:
@@ -305,6 +325,17 @@ class MainAppView(tk.Tk):
         except Exception as e:
             tk.messagebox.showerror("错误", f"打开配置管理器失败：{e}")
     
+    def on_closing(self):
+        """关闭主窗口：配置管理窗口打开时先写入排队中的配置修改"""
+        config_manager = getattr(self, 'config_manager', None)
+        if config_manager is not None and getattr(config_manager, 'root', None) is not None:
+            try:
+                config_manager.flush_config()
+                config_manager.close_config_window()
+            except Exception as e:
+                print(f"关闭前保存配置失败: {e}")
+        self.destroy()
+    
     def on_config_updated(self):
         """配置更新后的回调函数"""
         try:
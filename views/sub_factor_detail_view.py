@@ -1,9 +1,25 @@
 import tkinter as tk
 import tkinter.ttk as ttk
 from tkinter import messagebox
-from utils.lightweight_data import pd
+from utils.table_provider import TableDataProvider, TablePager, VirtualRows, diff_rows_by_key
+from utils.column_stats import ColumnWidthStats, TextWidthMeasurer, display_length
+from utils.ui_scheduler import UIScheduler, get_ui_scheduler
+from utils.widget_pool import WidgetPool
 
 class SubFactorDetailView:
+    # 搜索模式显示名称 -> 控制器搜索模式
+    SEARCH_MODES = {"包含": "substring", "正则": "regex", "模糊": "fuzzy"}
+    # 搜索命中单元格的高亮背景色
+    MATCH_HIGHLIGHT_BG = "#fff3b0"
+    # 数据行数达到该阈值时使用虚拟行模式
+    VIRTUAL_ROW_THRESHOLD = 2000
+    # 交替行颜色（偶数行, 奇数行）
+    ROW_STRIPE_COLORS = ("#ffffff", "#f0f0f0")
+    # 按行标识增量更新时允许的最大插入区间数，超过后直接重建表格
+    MAX_INSERT_RUNS = 64
+    # 分页模式可选的每页行数
+    PAGE_SIZE_OPTIONS = (100, 200, 500, 1000)
+    
     def __init__(self, parent_frame, controller):
         self.frame = parent_frame
         self.controller = controller
@@ -11,10 +27,21 @@ class SubFactorDetailView:
         # 初始化变量
         self.hierarchy_var = tk.StringVar()
         self.search_var = tk.StringVar()
+        self.search_mode_var = tk.StringVar(value="包含")
         self.hierarchy_radios = {}
         self.current_level = None
         self._last_search_text = ""  # 初始化搜索状态跟踪变量
         
+        # 分页模式：默认设置来自配置，可在表格下方切换
+        paging = {"enabled": False, "page_size": TablePager.DEFAULT_PAGE_SIZE}
+        try:
+            paging = self.controller.config_manager.get_table_paging()
+        except Exception as e:
+            print(f"读取分页设置失败，使用默认值: {e}")
+        self.paging_var = tk.BooleanVar(value=paging["enabled"])
+        self.page_size_var = tk.StringVar(value=str(paging["page_size"]))
+        self.table_pager = None
+        
         # 绑定搜索变量变化事件
         self.search_var.trace("w", self.on_search_change)
         
@@ -88,6 +115,13 @@ class SubFactorDetailView:
                                font=("Microsoft YaHei UI", 10), width=18)
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 6))
         
+        # 搜索模式选择：包含 / 正则 / 模糊
+        search_mode_combo = ttk.Combobox(search_frame, textvariable=self.search_mode_var,
+                                         values=list(self.SEARCH_MODES.keys()),
+                                         state="readonly", width=5)
+        search_mode_combo.pack(side=tk.LEFT, padx=(0, 6))
+        search_mode_combo.bind("<<ComboboxSelected>>", self.on_search_mode_change)
+        
         # 清除按钮 - 正方形设计，科技感图标
         clear_button = ttk.Button(search_frame, text="⌫", width=3, 
                                 command=self.on_clear_search)
@@ -99,6 +133,9 @@ class SubFactorDetailView:
         table_label_frame = ttk.LabelFrame(self.frame, text="数据表格", padding=5)
         table_label_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=(2, 5))
         
+        # 分页栏放在表格下方，先于表格框架布局，窗口缩小时不被挤掉
+        self.create_page_bar(table_label_frame)
+        
         # 表格框架
         self.table_frame = ttk.Frame(table_label_frame)
         self.table_frame.pack(fill=tk.BOTH, expand=True)
@@ -115,6 +152,8 @@ class SubFactorDetailView:
             
             # 确保表格完全空白
             self.data_table.set_sheet_data([])
+            self._sheet_rows = []
+            self.table_provider = None
             self.data_table.headers([])
             
             # 启用表格功能
@@ -129,6 +168,34 @@ class SubFactorDetailView:
             # 如果tksheet不可用，使用Treeview作为备选
             self.create_fallback_table()
             
+    def create_page_bar(self, parent):
+        """创建分页栏：分页开关、翻页按钮、页码和每页行数"""
+        page_bar = ttk.Frame(parent)
+        page_bar.pack(side=tk.BOTTOM, fill=tk.X, pady=(4, 0))
+        
+        paging_check = ttk.Checkbutton(page_bar, text="分页显示", variable=self.paging_var,
+                                       command=self.on_paging_toggle)
+        paging_check.pack(side=tk.LEFT)
+        
+        # 每页行数
+        page_size_combo = ttk.Combobox(page_bar, textvariable=self.page_size_var,
+                                       values=[str(size) for size in self.PAGE_SIZE_OPTIONS],
+                                       state="readonly", width=5)
+        page_size_combo.pack(side=tk.RIGHT)
+        page_size_combo.bind("<<ComboboxSelected>>", self.on_page_size_change)
+        ttk.Label(page_bar, text="每页").pack(side=tk.RIGHT, padx=(8, 4))
+        
+        self.next_page_button = ttk.Button(page_bar, text="下一页 ▶", width=8,
+                                           command=lambda: self.show_page(self.table_pager.page + 1))
+        self.next_page_button.pack(side=tk.RIGHT)
+        self.page_label = ttk.Label(page_bar, text="", width=24, anchor="center")
+        self.page_label.pack(side=tk.RIGHT, padx=4)
+        self.prev_page_button = ttk.Button(page_bar, text="◀ 上一页", width=8,
+                                           command=lambda: self.show_page(self.table_pager.page - 1))
+        self.prev_page_button.pack(side=tk.RIGHT)
+        
+        self._update_page_bar()
+        
     def create_fallback_table(self):
         """创建备选表格（使用Treeview）"""
         # 创建Treeview表格作为备选
@@ -384,17 +451,23 @@ class SubFactorDetailView:
             self.frame.clipboard_append(str(self.current_field_value))
     
     def display_basic_info(self, info):
-        # 清空现有内容
-        for widget in self.basic_info_frame.winfo_children():
-            widget.destroy()
+        # 取消尚未完成的上一次标签创建任务
+        get_ui_scheduler(self.frame).cancel("detail_basic_info")
+        
+        # 主容器框架和字段标签池只创建一次，之后切换子因子只更新标签文本和位置
+        if getattr(self, '_basic_info_pool', None) is None:
+            # 直接在basic_info_frame上创建主容器框架，不添加额外滚动条
+            info_frame = tk.Frame(self.basic_info_frame, bg="white")
+            info_frame.pack(fill=tk.X, expand=False, padx=5, pady=5)
+            self._basic_info_pool = WidgetPool(info_frame, self._create_basic_info_label)
+        label_pool = self._basic_info_pool
+        info_frame = label_pool.parent
         
         if not info:
+            # 隐藏全部字段标签
+            label_pool.reset(0)
             return
         
-        # 直接在basic_info_frame上创建主容器框架，不添加额外滚动条
-        info_frame = tk.Frame(self.basic_info_frame, bg="white")
-        info_frame.pack(fill=tk.X, expand=False, padx=5, pady=5)
-        
         # 获取配置文件中的字段顺序
         if hasattr(self.controller, 'current_sub_factor') and self.controller.current_sub_factor:
             # 从配置文件获取字段顺序
@@ -435,49 +508,63 @@ class SubFactorDetailView:
         for col in range(fields_per_row):
             info_frame.grid_columnconfigure(col, weight=1, uniform="field_column")
         
+        # 隐藏本次用不到的标签
+        label_pool.reset(len(ordered_fields))
+        
         # 显示字段组，使用Grid布局确保对齐
-        for row_idx, group in enumerate(field_groups):
-            # 配置行权重
-            info_frame.grid_rowconfigure(row_idx, weight=0)
-            
-            # 为每个字段创建标签并放置在Grid中
-            for col_idx, field_key in enumerate(group):
-                field_value = info[field_key]
-                value_text = str(field_value) if field_value is not None else "N/A"
-                
-                # 字段名和值在同一行显示 - 统一字体颜色
-                if value_text == "N/A":
-                    value_color = "#333333"  # 统一为深灰色
-                    value_font = ("Microsoft YaHei UI", 9, "italic")
-                else:
-                    value_color = "#000000"  # 统一为黑色
-                    value_font = ("Microsoft YaHei UI", 9, "normal")
-                
-                # 创建字段标签
-                field_text = f"{field_key}: {value_text}"
-                field_label = tk.Label(info_frame, text=field_text, 
-                                     font=("Microsoft YaHei UI", 9),
-                                     foreground=value_color,
-                                     cursor="hand2",
-                                     background="white",
-                                     anchor="w",
-                                     relief="flat",
-                                     padx=8, pady=3)
-                # 使用Grid布局放置标签，sticky="ew"确保水平填充
-                field_label.grid(row=row_idx, column=col_idx, sticky="ew", padx=2, pady=1)
-                
-                # 绑定复制功能
-                field_label.bind("<Button-3>", lambda e, text=value_text: self.show_field_menu(e, text))
-                field_label.bind("<Double-Button-1>", lambda e, text=value_text: self.copy_value_to_clipboard(text))
-                
-                # 悬停效果（改变背景色）
-                def on_enter(e, label=field_label):
-                    label.configure(background="#e8f4fd")
-                def on_leave(e, label=field_label):
-                    label.configure(background="white")
+        # 标签按帧分片更新，连续切换子因子时未完成的旧任务会被取消
+        def create_field_labels():
+            for row_idx, group in enumerate(field_groups):
+                # 配置行权重
+                info_frame.grid_rowconfigure(row_idx, weight=0)
                 
-                field_label.bind("<Enter>", on_enter)
-                field_label.bind("<Leave>", on_leave)
+                # 为每个字段取出池中标签并放置在Grid中
+                for col_idx, field_key in enumerate(group):
+                    self._update_basic_info_label(label_pool.acquire(), row_idx, col_idx, field_key, info[field_key])
+                    yield
+        
+        get_ui_scheduler(self.frame).schedule("detail_basic_info", create_field_labels(),
+                                              UIScheduler.PRIORITY_VISIBLE)
+    
+    def _create_basic_info_label(self, info_frame):
+        """创建字段标签并一次性绑定事件，事件处理读取标签当前的字段值"""
+        field_label = tk.Label(info_frame,
+                             font=("Microsoft YaHei UI", 9),
+                             cursor="hand2",
+                             background="white",
+                             anchor="w",
+                             relief="flat",
+                             padx=8, pady=3)
+        field_label.field_value = ""
+        
+        # 绑定复制功能
+        field_label.bind("<Button-3>", lambda e, label=field_label: self.show_field_menu(e, label.field_value))
+        field_label.bind("<Double-Button-1>", lambda e, label=field_label: self.copy_value_to_clipboard(label.field_value))
+        
+        # 悬停效果（改变背景色）
+        def on_enter(e, label=field_label):
+            label.configure(background="#e8f4fd")
+        def on_leave(e, label=field_label):
+            label.configure(background="white")
+        
+        field_label.bind("<Enter>", on_enter)
+        field_label.bind("<Leave>", on_leave)
+        return field_label
+    
+    def _update_basic_info_label(self, field_label, row_idx, col_idx, field_key, field_value):
+        """更新字段标签的文本、颜色和Grid位置"""
+        value_text = str(field_value) if field_value is not None else "N/A"
+        
+        # 字段名和值在同一行显示 - 统一字体颜色
+        if value_text == "N/A":
+            value_color = "#333333"  # 统一为深灰色
+        else:
+            value_color = "#000000"  # 统一为黑色
+        
+        field_label.field_value = value_text
+        field_label.configure(text=f"{field_key}: {value_text}", foreground=value_color, background="white")
+        # 使用Grid布局放置标签，sticky="ew"确保水平填充
+        field_label.grid(row=row_idx, column=col_idx, sticky="ew", padx=2, pady=1)
                 
     def show_field_menu(self, event, value):
         """显示字段值右键菜单"""
@@ -543,6 +630,11 @@ class SubFactorDetailView:
         # 设置延迟到50毫秒，提供极速响应的实时搜索体验
         self._search_after_id = self.frame.after(50, self._delayed_search_filter)
         
+    def on_search_mode_change(self, event=None):
+        """切换搜索模式后按新模式重新执行当前搜索"""
+        if self.search_var.get().strip():
+            self.apply_search_filter()
+        
     def on_search_button_click(self):
         """当点击搜索按钮时触发"""
         self.apply_search_filter()
@@ -579,14 +671,16 @@ class SubFactorDetailView:
     
     def apply_search_filter(self):
         """应用搜索过滤"""
-        search_text = self.search_var.get().lower()
+        search_mode = self.SEARCH_MODES.get(self.search_mode_var.get(), "substring")
+        # 正则模式下保留原始大小写，避免改变\D、\S等转义的含义，由索引按不区分大小写匹配
+        search_text = self.search_var.get() if search_mode == "regex" else self.search_var.get().lower()
         
-        # 检查搜索文本是否与上次相同，如果相同则跳过
-        if hasattr(self, '_last_apply_search_text') and self._last_apply_search_text == search_text:
+        # 检查搜索文本和模式是否与上次相同，如果相同则跳过
+        if getattr(self, '_last_apply_search_text', None) == (search_text, search_mode):
             return
             
         # 保存当前搜索文本（用于避免重复搜索）
-        self._last_apply_search_text = search_text
+        self._last_apply_search_text = (search_text, search_mode)
         
         # 标记为搜索过滤状态
         self._is_search_filtering = bool(search_text.strip())
@@ -595,7 +689,8 @@ class SubFactorDetailView:
         current_level = self.hierarchy_var.get()
         
         # 通知控制器应用过滤
-        self.controller.apply_search_filter(current_level, search_text)
+        status = self.controller.apply_search_filter(current_level, search_text, search_mode)
+        self._show_search_status(status)
         
         # 延迟重置搜索过滤标记，确保display_data_table能正确识别搜索状态
         # 增加延迟时间，确保表格更新完成后再重置标记
@@ -603,19 +698,53 @@ class SubFactorDetailView:
             self._is_search_filtering = False
         self.frame.after(500, reset_search_filtering)
             
-    def display_data_table(self, df, display_columns=None, columns_config=None):
+    def _show_search_status(self, status):
+        """根据搜索结果状态更新搜索提示"""
+        if not status or not hasattr(self, 'search_tooltip'):
+            return
+        if status.get("error"):
+            # 正则无效时允许用户修正后重新搜索
+            self._last_apply_search_text = None
+            self.search_tooltip.config(text="⚠ 正则无效", foreground="#cc0000")
+        elif not status.get("completed", True):
+            self.search_tooltip.config(text=f"⏱ 部分结果 {status.get('matched', 0)}", foreground="#ff9800")
+        
+    def show_table_placeholder(self, text):
+        """在表格区域中央显示提示文字（如后台加载中），下次显示数据时移除"""
+        self.hide_table_placeholder()
+        self._placeholder_label = ttk.Label(self.table_frame, text=text, font=("Microsoft YaHei UI", 12), foreground="#333333")
+        self._placeholder_label.place(relx=0.5, rely=0.5, anchor="center")
+    
+    def hide_table_placeholder(self):
+        """移除表格区域的提示文字"""
+        label = getattr(self, '_placeholder_label', None)
+        if label is not None:
+            label.destroy()
+            self._placeholder_label = None
+    
+    def display_data_table(self, df, display_columns=None, columns_config=None, width_stats=None, plan=None):
+        """显示数据表格
+        
+        Args:
+            plan: 表格投影计划，提供时直接使用计划中的列标题和格式化函数
+        """
+        self.hide_table_placeholder()
+        
         # 更智能的数据比较 - 检查数据内容、行数和列配置是否真正发生变化
         if hasattr(self, 'current_df') and hasattr(self, 'current_columns'):
             if self.current_df is not None and not df.empty and columns_config is not None:
                 # 检查列配置是否相同
                 columns_same = self.current_columns == columns_config
                 # 检查数据是否相同（更高效的比较方式）
-                data_same = (len(self.current_df) == len(df) and 
-                           list(self.current_df.columns) == list(df.columns) and 
-                           self.current_df.equals(df))
+                # 同一个数据帧对象直接视为相同，避免逐行深比较
+                data_same = self.current_df is df or (
+                    len(self.current_df) == len(df) and
+                    list(self.current_df.columns) == list(df.columns) and
+                    self.current_df.equals(df))
                 
                 if columns_same and data_same:
                     # 数据和列配置没有变化，跳过更新
+                    self._consume_pending_focus()
                     return
                     
         # 清除可能存在的空数据提示
@@ -633,63 +762,93 @@ class SubFactorDetailView:
         else:
             # 既没有数据也没有列配置，显示空数据提示
             self.data_table.set_sheet_data([])
+            self._sheet_rows = []
+            self.table_provider = None
+            self.table_pager = None
+            self._update_page_bar()
             self.data_table.headers([])
             empty_label = ttk.Label(self.table_frame, text="暂无数据", font=("Microsoft YaHei UI", 12), foreground="#333333")
             empty_label.place(relx=0.5, rely=0.5, anchor="center")
             return
         
-        # 设置表格列标题
-        headers = []
-        for col in columns_to_show:
-            # 从controller获取字段的中文显示名称
-            display_name = self.controller.config_manager.get_display_name(col)
-            headers.append(display_name)
+        # 列显示长度统计：优先使用控制器在构建数据帧时生成的统计
+        if width_stats is None:
+            width_stats = ColumnWidthStats.from_frame(df, [col for col in columns_to_show if col in df.columns])
+        self.current_width_stats = width_stats
+        
+        # 设置表格列标题：显示的列与投影计划一致时直接使用预编译的标题和格式化函数
+        if plan is not None and list(plan.columns) == columns_to_show:
+            headers = list(plan.headers)
+            formatters = plan.formatters
+        else:
+            plan = None
+            formatters = None
+            headers = []
+            for col in columns_to_show:
+                # 从controller获取字段的中文显示名称
+                display_name = self.controller.config_manager.get_display_name(col)
+                headers.append(display_name)
+        self.current_plan = plan
         
         # 添加调试日志
         print(f"[DEBUG] 表格显示 - 要显示的列: {columns_to_show}")
         print(f"[DEBUG] 表格显示 - 列标题: {headers}")
         print(f"[DEBUG] 表格显示 - 数据行数: {len(df) if not df.empty else 0}")
         
-        # 设置表格数据
-        data = []
-        if not df.empty:
-            for idx, (_, row) in enumerate(df.iterrows()):
-                row_data = []
-                for col in columns_to_show:
-                    if col in df.columns and pd.notna(row[col]):
-                        value = row[col]
-                        # 保持数字精度，避免精度丢失
-                        if isinstance(value, (int, float)):
-                            # 对于数字类型，保持原始精度
-                            if isinstance(value, float):
-                                # 浮点数保留足够精度，避免科学计数法
-                                formatted_value = f"{value:.10g}"
-                            else:
-                                formatted_value = str(value)
-                        else:
-                            formatted_value = str(value)
-                        row_data.append(formatted_value)
-                    else:
-                        row_data.append("")
-                data.append(row_data)
-                
+        # 设置表格数据：分页模式只格式化第一页；大数据量时使用虚拟行，表格只格式化可见区域的行
+        was_paged = self.table_pager is not None
+        self.table_pager = None
+        if not df.empty and self.paging_var.get():
+            self.table_provider = TableDataProvider(df, columns_to_show, formatters=formatters)
+            self.table_pager = TablePager(self.table_provider, self._get_page_size())
+            data = self.table_pager.get_page(0)
+        elif not df.empty and len(df) >= self.VIRTUAL_ROW_THRESHOLD:
+            self.table_provider = TableDataProvider(df, columns_to_show, formatters=formatters)
+            data = self.table_provider.virtual_rows()
+        else:
+            self.table_provider = None
+            data = []
+            if not df.empty:
+                formatter = TableDataProvider(df, columns_to_show, formatters=formatters)
+                data = [formatter.format_row(idx) for idx in range(len(df))]
                 # 添加前几行数据的调试日志
-                if idx < 3:
+                for idx, row_data in enumerate(data[:3]):
                     print(f"[DEBUG] 第{idx+1}行数据: {row_data}")
         
         print(f"[DEBUG] 表格显示 - 总数据行数: {len(data)}")
         
         # 智能更新表格 - 只在必要时更新标题和数据
+        # 使用上次设置的行数据比较，不再通过get_sheet_data复制整表
         current_headers = getattr(self, 'current_headers', [])
-        current_data = self.data_table.get_sheet_data() if hasattr(self.data_table, 'get_sheet_data') else []
+        current_data = getattr(self, '_sheet_rows', [])
+        current_keys = getattr(self, '_sheet_row_keys', [])
+        # 分页模式下表格只持有一页，行标识与整表不对应，不做增量比较
+        row_keys = self._get_row_keys(df) if self.table_pager is None else []
+        # 新数据的搜索命中由控制器重新设置
+        self._all_matches = []
+        
+        # 行位置可能变化，先恢复上次选中行的颜色
+        self.restore_row_colors()
         
         # 只在标题发生变化时更新标题
         if current_headers != headers:
             self.data_table.headers(headers)
             
-        # 真正的增量数据更新 - 逐行比较和更新
-        if current_data != data:
-            self._update_table_incrementally(current_data, data)
+        if (isinstance(data, VirtualRows) or isinstance(current_data, VirtualRows) or
+                self.table_pager is not None or was_paged):
+            # 虚拟行和分页数据不做逐行比较，直接替换数据引用
+            self.data_table.set_sheet_data(data)
+        elif current_data != data:
+            # 真正的增量数据更新 - 按行标识比较和更新
+            self._update_table_incrementally(current_data, data, current_keys, row_keys)
+        self._sheet_rows = data
+        self._sheet_row_keys = row_keys
+        # 新数据按原始顺序显示
+        self._sheet_order = None
+        self._update_page_bar()
+        if self.table_pager is not None:
+            # 用户查看第一页时在后台格式化下一页
+            self.table_pager.prefetch()
         
         # 智能列宽调整策略：
         # 1. 只有在非搜索状态下才重新计算列宽
@@ -766,7 +925,8 @@ class SubFactorDetailView:
         # 保存当前数据和列配置，用于后续调整
         self.current_columns = columns_to_show
         self.current_headers = headers
-        self.current_df = df.copy() if not df.empty else None
+        # 数据帧构建后不再修改，直接保存引用，避免每次显示都深拷贝整表
+        self.current_df = df if not df.empty else None
         
         # 延迟行颜色设置 - 避免频繁重绘导致闪动
         current_row_count = len(data)
@@ -776,19 +936,14 @@ class SubFactorDetailView:
             # 延迟设置行颜色，避免与数据更新同时进行
             def apply_row_colors():
                 try:
-                    self.row_colors = {}
-                    for i in range(current_row_count):
-                        if i % 2 == 0:
-                            self.row_colors[i] = {"bg": "#ffffff", "fg": "#000000"}
-                            self.data_table.highlight_rows(rows=i, bg="#ffffff")
-                        else:
-                            self.row_colors[i] = {"bg": "#f0f0f0", "fg": "#000000"}
-                            self.data_table.highlight_rows(rows=i, bg="#f0f0f0")
-                except:
+                    self._apply_row_stripes(current_row_count)
+                except Exception:
                     pass  # 忽略可能的错误，避免影响主流程
+                yield
             
-            # 延迟100毫秒执行，让数据更新先完成
-            self.frame.after(100, apply_row_colors)
+            # 作为后台任务执行，让数据更新和基本信息先完成；再次刷新表格时旧任务被取消
+            get_ui_scheduler(self.frame).schedule("detail_table_stripes", apply_row_colors(),
+                                                  UIScheduler.PRIORITY_BACKGROUND)
             
             # 保存行数用于下次比较
             self.last_row_count = current_row_count
@@ -797,35 +952,21 @@ class SubFactorDetailView:
         self.highlighted_row = None
         
         # 保存原始数据用于搜索过滤
-        self.original_data = df.copy()
+        self.original_data = df
         
         # 绑定排序事件
         self.data_table.extra_bindings(["column_select"], func=self.on_column_select)
+        
+        # 表格更新完成后定位等待中的行（全局搜索跳转）
+        self._consume_pending_focus()
+    
+    def invalidate_table(self):
+        """标记表格需要重绘：下次显示同一数据帧时不再跳过（如配置变化后表头需要更新）"""
+        self.current_df = None
     
     def _calculate_column_widths(self, columns_to_show, headers, df, table_width):
         """计算列宽度"""
-        col_widths = []
-        for col_idx, col in enumerate(columns_to_show):
-            # 基础宽度 - 确保标题能完整显示
-            header_text = headers[col_idx] if col_idx < len(headers) else col
-            max_width = len(header_text) * 10 + 30  # 增加一些额外空间
-            
-            # 如果有数据，根据内容调整列宽
-            if not df.empty and col in df.columns:
-                # 限制检查的行数以提高性能，使用采样方式
-                sample_size = min(100, len(df))
-                sample_data = df[col].head(sample_size) if len(df) > sample_size else df[col]
-                
-                for value in sample_data:
-                    if pd.notna(value):  # 确保值不是NaN
-                        str_value = str(value)
-                        width = len(str_value) * 8 + 20
-                        if width > max_width:
-                            max_width = width
-            
-            # 限制最大宽度和确保最小宽度
-            max_width = max(80, min(max_width, 300))
-            col_widths.append(max_width)
+        col_widths = self._measure_column_widths(columns_to_show, headers, df)
         
         # 计算总宽度和调整系数
         total_width = sum(col_widths)
@@ -855,6 +996,49 @@ class SubFactorDetailView:
         
         return col_widths
     
+    def _get_width_measurer(self, header=False):
+        """获取表格内容或表头字体的文本宽度测量器"""
+        attr = '_header_width_measurer' if header else '_cell_width_measurer'
+        measurer = getattr(self, attr, None)
+        if measurer is None:
+            font = None
+            try:
+                import tkinter.font as tkfont
+                font_spec = self.data_table.header_font() if header else self.data_table.font()
+                font = tkfont.Font(root=self.frame, font=font_spec)
+            except Exception as e:
+                print(f"获取表格字体失败，按字符数估算列宽: {e}")
+            measurer = TextWidthMeasurer(font)
+            setattr(self, attr, measurer)
+        return measurer
+    
+    def _measure_column_widths(self, columns_to_show, headers, df):
+        """根据列长度统计计算各列基础宽度"""
+        stats = getattr(self, 'current_width_stats', None)
+        if df is None:
+            stats = stats or ColumnWidthStats({})
+        elif stats is None or len(stats) != len(df):
+            stats = ColumnWidthStats.from_frame(df, [col for col in columns_to_show if col in df.columns])
+            self.current_width_stats = stats
+        
+        header_measurer = self._get_width_measurer(header=True)
+        cell_measurer = self._get_width_measurer()
+        col_widths = []
+        for col_idx, col in enumerate(columns_to_show):
+            # 基础宽度 - 确保标题能完整显示
+            header_text = headers[col_idx] if col_idx < len(headers) else col
+            max_width = header_measurer.width(display_length(header_text)) + 30  # 增加一些额外空间
+            
+            # 根据内容调整列宽，使用95百分位长度避免个别超长值撑大整列
+            if col in stats:
+                width = cell_measurer.width(stats.percentile_length(col)) + 20
+                if width > max_width:
+                    max_width = width
+            
+            # 限制最大宽度和确保最小宽度
+            col_widths.append(max(80, min(max_width, 300)))
+        return col_widths
+    
     def _apply_column_widths(self, col_widths):
         """应用列宽度"""
         for col_idx, width in enumerate(col_widths):
@@ -864,7 +1048,19 @@ class SubFactorDetailView:
         # 强制刷新表格显示
         self.data_table.refresh()
     
-    def _update_table_incrementally(self, old_data, new_data):
+    def _get_row_keys(self, df):
+        """获取数据帧各行的稳定标识
+
+        有节点key列时使用key；否则使用行记录对象本身的标识——搜索过滤后的数据帧
+        与原数据帧共享行记录，旧数据帧在比较期间仍被current_df引用，标识不会重复。
+        """
+        if df.empty:
+            return []
+        if 'key' in df.columns:
+            return [row.get('key') for row in df.data]
+        return [id(row) for row in df.data]
+    
+    def _update_table_incrementally(self, old_data, new_data, old_keys=None, new_keys=None):
         """智能表格更新策略：只有实时搜索且有结果时使用增量更新，其他情况都重建表格"""
         try:
             # 如果新数据为空，清空表格
@@ -884,60 +1080,223 @@ class SubFactorDetailView:
             )
             
             # 只有实时搜索且有结果时才使用增量更新，其他情况都重建表格
-            if is_realtime_search:
-                # 获取当前表格行数
-                current_rows = len(old_data)
-                new_rows = len(new_data)
-                
-                # 对于行数相同的情况，检查数据内容是否有变化
-                if current_rows == new_rows:
-                    content_changed = False
-                    for i in range(current_rows):
-                        if old_data[i] != new_data[i]:
-                            content_changed = True
-                            break
-                    
-                    if not content_changed:
-                        return  # 数据没有变化，跳过更新
-                    
-                    # 数据有变化但行数相同，使用优化的批量更新（避免闪动）
-                    # 临时禁用表格重绘以减少闪烁
-                    if hasattr(self.data_table, 'disable_bindings'):
-                        self.data_table.disable_bindings()
-                    
-                    try:
-                        # 批量更新所有变化的单元格
-                        for row_idx in range(current_rows):
-                            if old_data[row_idx] != new_data[row_idx]:
-                                # 逐列更新不同的单元格，禁用重绘
-                                for col_idx, cell_value in enumerate(new_data[row_idx]):
-                                    if (col_idx >= len(old_data[row_idx]) or 
-                                        old_data[row_idx][col_idx] != cell_value):
-                                        self.data_table.set_cell_data(row_idx, col_idx, cell_value, redraw=False)
-                    finally:
-                        # 重新启用绑定
-                        if hasattr(self.data_table, 'enable_bindings'):
-                            self.data_table.enable_bindings()
-                    
-                    # 延迟重绘，确保所有更新完成后一次性刷新
-                    def delayed_refresh():
-                        if hasattr(self.data_table, 'refresh'):
-                            self.data_table.refresh()
-                        elif hasattr(self.data_table, 'redraw'):
-                            self.data_table.redraw()
-                    self.frame.after_idle(delayed_refresh)
-                else:
-                    # 行数不同，即使是实时搜索也要重建表格
-                    self.data_table.set_sheet_data(new_data)
-            else:
+            if not is_realtime_search:
                 # 所有其他情况都重建表格：清空搜索、层级切换、搜索结果为空等
                 self.data_table.set_sheet_data(new_data)
+                return
+            
+            # 按行标识计算差异，过滤掉顶部一行不会让下面所有行都被视为变化
+            row_diff = None
+            if (old_keys is not None and new_keys is not None and
+                    len(old_keys) == len(old_data) and len(new_keys) == len(new_data)):
+                row_diff = diff_rows_by_key(old_keys, new_keys)
+            
+            if row_diff is None or len(row_diff.inserts) > self.MAX_INSERT_RUNS:
+                # 行标识不可用或变化过于分散时重建表格
+                self.data_table.set_sheet_data(new_data)
+                return
+            
+            self._apply_row_diff(row_diff, old_data, new_data)
             
         except Exception as e:
             # 如果更新失败，回退到标准方法
             print(f"表格更新失败，回退到标准方法: {e}")
             self.data_table.set_sheet_data(new_data)
+    
+    def _apply_row_diff(self, row_diff, old_data, new_data):
+        """把行差异转换为最少的表格操作：一次批量删除、按区间插入、只改变化的单元格，最后统一重绘一次"""
+        structure_changed = bool(row_diff.deletes or row_diff.inserts)
+        # old_data可能就是表格持有的行列表，删除前先取出保留行
+        kept_rows = [(old_data[old_idx], new_idx) for old_idx, new_idx in row_diff.kept]
+        
+        if structure_changed:
+            # 删除和插入会移动单元格高亮，先清除上一次的搜索命中高亮
+            previous_cells = getattr(self, '_match_cells', None)
+            if previous_cells:
+                self.data_table.dehighlight_cells(cells=previous_cells, redraw=False)
+                self._match_cells = []
+        
+        if row_diff.deletes:
+            self.data_table.delete_rows(row_diff.deletes, redraw=False)
+        
+        # 按新行号升序插入，插入位置之前的行都已就位
+        for start, stop in row_diff.inserts:
+            self.data_table.insert_rows(rows=new_data[start:stop], idx=start,
+                                        create_selections=False, redraw=False)
+        
+        # 保留行只更新内容变化的单元格
+        for old_row, new_idx in kept_rows:
+            new_row = new_data[new_idx]
+            if old_row == new_row:
+                continue
+            for col_idx, cell_value in enumerate(new_row):
+                if col_idx >= len(old_row) or old_row[col_idx] != cell_value:
+                    self.data_table.set_cell_data(new_idx, col_idx, cell_value, redraw=False)
+        
+        if structure_changed:
+            # 行位置变化后交替行颜色需要重新按位置设置
+            self._striped_row_count = 0
+            self._apply_row_stripes(len(new_data), redraw=False)
+        self.data_table.refresh()
+            
+    def highlight_matches(self, matches):
+        """高亮搜索命中的单元格
+
+        Args:
+            matches: 搜索层返回的命中位置 [(行, 列名, (起始, 结束))]，
+                行号为过滤后表格中的行号
+        """
+        if not hasattr(self.data_table, 'highlight_cells'):
+            return
+        try:
+            # 分页模式只高亮当前页内的命中，翻页时重新计算
+            self._all_matches = matches
+            if self.table_pager is not None:
+                start, stop = self.table_pager.page_range()
+                matches = [(row - start, col, span) for row, col, span in matches if start <= row < stop]
+            
+            # 清除上一次搜索的命中高亮
+            previous_cells = getattr(self, '_match_cells', None)
+            if previous_cells:
+                self.data_table.dehighlight_cells(cells=previous_cells, redraw=False)
             
+            column_positions = {col: i for i, col in enumerate(getattr(self, 'current_columns', None) or [])}
+            cells = list({(row, column_positions[col]) for row, col, _ in matches if col in column_positions})
+            self._match_cells = cells
+            
+            # 一次调用完成全部命中单元格的高亮
+            if cells:
+                self.data_table.highlight_cells(cells=cells, bg=self.MATCH_HIGHLIGHT_BG, redraw=False)
+            if previous_cells or cells:
+                self.data_table.refresh()
+        except Exception as e:
+            print(f"高亮搜索命中单元格时出错: {e}")
+
+    def focus_row(self, row_idx):
+        """滚动到指定行并选中，用于全局搜索结果跳转"""
+        try:
+            if not hasattr(self.data_table, 'see'):
+                return
+            pager = self.table_pager
+            total_rows = len(pager) if pager is not None else len(getattr(self, '_sheet_rows', []))
+            if row_idx < 0 or row_idx >= total_rows:
+                print(f"定位行超出范围: {row_idx}/{total_rows}")
+                return
+            if pager is not None:
+                # 先翻到目标行所在页，再换算为页内行号
+                self.show_page(pager.page_of_row(row_idx))
+                row_idx -= pager.page_range()[0]
+            self.data_table.see(row=row_idx, column=0)
+            self.data_table.select_row(row_idx)
+        except Exception as e:
+            print(f"定位表格行时出错: {e}")
+
+    def focus_record(self, record):
+        """定位并选中数据帧中的指定行记录
+        
+        当前表格中找不到该记录时（如搜索过滤尚未清空）保留为待定位，
+        在下一次display_data_table完成后再定位，不依赖固定延时。
+        """
+        self._pending_focus_record = record
+        self._consume_pending_focus()
+    
+    def _consume_pending_focus(self):
+        record = getattr(self, '_pending_focus_record', None)
+        if record is None:
+            return
+        display_idx = self._display_index_of(record)
+        if display_idx is not None:
+            self._pending_focus_record = None
+            self.focus_row(display_idx)
+    
+    def _display_index_of(self, record):
+        """行记录在当前表格（考虑排序和搜索过滤）中的显示行号，不在表格中时返回None"""
+        df = getattr(self, 'current_df', None)
+        if df is None:
+            return None
+        source_idx = next((i for i, row in enumerate(df.data) if row is record), None)
+        if source_idx is None:
+            return None
+        provider = self.table_provider
+        if provider is not None:
+            order = provider.order
+        else:
+            order = getattr(self, '_sheet_order', None)
+        if order is None:
+            return source_idx
+        try:
+            return order.index(source_idx)
+        except ValueError:
+            return None
+    
+    def _get_page_size(self):
+        """获取当前选择的每页行数"""
+        try:
+            return max(1, int(self.page_size_var.get()))
+        except (TypeError, ValueError):
+            return TablePager.DEFAULT_PAGE_SIZE
+    
+    def _update_page_bar(self):
+        """根据当前分页状态更新页码和翻页按钮"""
+        if not hasattr(self, 'page_label'):
+            return
+        pager = self.table_pager
+        if pager is None:
+            self.page_label.config(text="")
+            self.prev_page_button.state(["disabled"])
+            self.next_page_button.state(["disabled"])
+            return
+        self.page_label.config(text=f"第 {pager.page + 1}/{pager.page_count} 页，共 {len(pager)} 行")
+        self.prev_page_button.state(["!disabled" if pager.page > 0 else "disabled"])
+        self.next_page_button.state(["!disabled" if pager.page < pager.page_count - 1 else "disabled"])
+    
+    def show_page(self, page):
+        """翻到指定页"""
+        pager = self.table_pager
+        if pager is None or not 0 <= page < pager.page_count or page == pager.page:
+            return
+        self._load_page(page)
+    
+    def _load_page(self, page):
+        """把指定页的行放入表格（已预取时无需格式化），并在后台预取相邻页"""
+        pager = self.table_pager
+        self.restore_row_colors()
+        self.highlighted_row = None
+        
+        rows = pager.get_page(page)
+        # 保留列宽，只替换行数据
+        self.data_table.set_sheet_data(rows, reset_col_positions=False, redraw=False)
+        self._sheet_rows = rows
+        self._apply_row_stripes(len(rows), redraw=False)
+        self.highlight_matches(getattr(self, '_all_matches', []))
+        self.data_table.refresh()
+        
+        self._update_page_bar()
+        pager.prefetch()
+        return rows
+    
+    def on_page_size_change(self, event=None):
+        """修改每页行数，保持当前页第一行仍然可见"""
+        pager = self.table_pager
+        if pager is None:
+            return
+        first_row = pager.page_range()[0]
+        self.table_pager = TablePager(self.table_provider, self._get_page_size())
+        self._load_page(self.table_pager.page_of_row(first_row))
+    
+    def on_paging_toggle(self):
+        """切换分页模式，按新模式重新显示当前数据"""
+        df = getattr(self, 'current_df', None)
+        if df is None:
+            return
+        matches = getattr(self, '_all_matches', [])
+        # 跳过相同数据的短路判断，强制按新模式重建表格
+        self.invalidate_table()
+        self.display_data_table(df, None, self.current_columns, getattr(self, 'current_width_stats', None),
+                                plan=getattr(self, 'current_plan', None))
+        if matches:
+            self.highlight_matches(matches)
+    
     def on_column_select(self, event):
         """处理列选择事件，用于排序"""
         if event.column is not None:
@@ -946,7 +1305,7 @@ class SubFactorDetailView:
     def sort_by_column(self, col_idx):
         """按列排序表格数据"""
         # 获取当前数据
-        data = self.data_table.get_sheet_data()
+        data = getattr(self, '_sheet_rows', [])
         if not data:
             return
             
@@ -957,18 +1316,32 @@ class SubFactorDetailView:
             self.sort_direction = False  # 默认降序
             self.sort_column = col_idx
         
-        # 排序数据
-        sorted_data = sorted(data, key=lambda row: row[col_idx] if row[col_idx] else "", reverse=self.sort_direction)
-        
-        # 更新表格数据
-        self.data_table.set_sheet_data(sorted_data)
+        # 排序后行号变化，清除搜索命中高亮
+        self.highlight_matches([])
+        
+        if self.table_pager is not None:
+            # 分页模式对全部数据排序后回到第一页
+            self.table_pager.sort(col_idx, reverse=self.sort_direction)
+            sorted_data = self._load_page(0)
+        elif isinstance(data, VirtualRows):
+            # 虚拟行只调整提供器的行顺序，不生成排序后的整表副本
+            data.provider.sort(col_idx, reverse=self.sort_direction)
+            sorted_data = data
+            self.data_table.refresh()
+        else:
+            # 排序数据，记录显示行对应的原始行号，用于按行记录定位
+            order = sorted(range(len(data)), key=lambda i: data[i][col_idx] if data[i][col_idx] else "",
+                           reverse=self.sort_direction)
+            base_order = getattr(self, '_sheet_order', None)
+            sorted_data = [data[i] for i in order]
+            self._sheet_order = [base_order[i] for i in order] if base_order is not None else order
+            
+            # 更新表格数据
+            self.data_table.set_sheet_data(sorted_data)
+            self._sheet_rows = sorted_data
         
-        # 重新应用交替行颜色
-        for i in range(len(sorted_data)):
-            if i % 2 == 0:
-                self.data_table.highlight_rows(rows=i, bg="#ffffff")  # 偶数行
-            else:
-                self.data_table.highlight_rows(rows=i, bg="#f0f0f0")  # 奇数行
+        # 交替行颜色按行位置设置，排序不改变行位置，只需补齐未着色的行
+        self._apply_row_stripes(len(sorted_data))
         
     def adjust_column_widths(self, columns_to_show, headers, df):
         """根据窗口大小调整列宽"""
@@ -988,32 +1361,8 @@ class SubFactorDetailView:
         # 记录当前宽度，用于下次比较
         self._last_table_width = table_width
         
-        # 计算每列的基础宽度
-        col_widths = []
-        for col_idx, col in enumerate(columns_to_show):
-            # 基础宽度 - 确保标题能完整显示
-            header_text = headers[col_idx] if col_idx < len(headers) else col
-            max_width = len(header_text) * 10 + 30  # 增加一些额外空间
-            
-            # 如果有数据，根据内容调整列宽
-            if df is not None and not df.empty and col in df.columns:
-                for i, value in enumerate(df[col]):
-                    if i > 100:  # 限制检查的行数以提高性能
-                        break
-                    if pd.notna(value):  # 确保值不是NaN
-                        str_value = str(value)
-                        width = len(str_value) * 8 + 20
-                        if width > max_width:
-                            max_width = width
-            
-            # 限制最大宽度
-            if max_width > 300:
-                max_width = 300
-            # 确保最小宽度
-            if max_width < 80:
-                max_width = 80
-                
-            col_widths.append(max_width)
+        # 计算每列的基础宽度：读取列长度统计，与数据行数无关
+        col_widths = self._measure_column_widths(columns_to_show, headers, df)
         
         # 计算总宽度和调整系数
         total_width = sum(col_widths)
@@ -1028,12 +1377,7 @@ class SubFactorDetailView:
                 self.data_table.column_width(column=col_idx, width=width)
         
         # 重新应用交替行颜色
-        data = self.data_table.get_sheet_data()
-        for i in range(len(data)):
-            if i % 2 == 0:
-                self.data_table.highlight_rows(rows=i, bg="#ffffff")  # 偶数行
-            else:
-                self.data_table.highlight_rows(rows=i, bg="#f0f0f0")  # 奇数行
+        self._apply_row_stripes(len(getattr(self, '_sheet_rows', [])))
                 
         # 更新列标题显示排序方向
         if hasattr(self, 'sort_column') and hasattr(self, 'sort_direction'):
@@ -1091,19 +1435,50 @@ class SubFactorDetailView:
             # 2秒后恢复提示
             self.frame.after(2000, lambda: self.search_tooltip.config(text="实时搜索", foreground="#333333"))
             
+    def _row_stripe_color(self, row):
+        """获取指定行的交替行背景色"""
+        return self.ROW_STRIPE_COLORS[row % 2]
+    
+    def _apply_row_stripes(self, row_count, redraw=True):
+        """设置交替行颜色
+
+        表格支持绘制时隔行着色（alternate_color选项）时只设置一次选项，
+        绘制可见行时计算颜色；否则奇偶行各批量调用一次highlight_rows，
+        并且只为尚未着色的新增行设置颜色，最后统一刷新一次。
+        """
+        if not hasattr(self.data_table, 'highlight_rows'):
+            return
+        
+        options = getattr(self.data_table, 'ops', None)
+        if options is not None and 'alternate_color' in options:
+            if not getattr(self, '_uses_alternate_color', False):
+                self.data_table.set_options(alternate_color=self.ROW_STRIPE_COLORS[1], redraw=False)
+                self._uses_alternate_color = True
+                if redraw:
+                    self.data_table.refresh()
+            return
+        
+        striped = getattr(self, '_striped_row_count', 0)
+        if row_count <= striped:
+            return
+        for parity, color in enumerate(self.ROW_STRIPE_COLORS):
+            rows = range(striped + (parity - striped) % 2, row_count, 2)
+            if rows:
+                self.data_table.highlight_rows(rows=rows, bg=color, redraw=False)
+        self._striped_row_count = row_count
+        if redraw:
+            self.data_table.refresh()
+    
     def restore_row_colors(self):
         """恢复所有行的原始颜色"""
-        if hasattr(self, 'row_colors') and self.row_colors:
-            # 如果有高亮的行，恢复它的原始颜色
-            if hasattr(self, 'highlighted_row') and self.highlighted_row is not None:
-                if self.highlighted_row in self.row_colors:
-                    try:
-                        color_info = self.row_colors[self.highlighted_row]
-                        self.data_table.highlight_rows(
-                            rows=self.highlighted_row, 
-                            bg=color_info["bg"], 
-                            fg=color_info["fg"]
-                        )
-                    except Exception as e:
-                        print(f"恢复行颜色失败: {e}")
-                self.highlighted_row = None
\ No newline at end of file
+        # 如果有高亮的行，恢复它的原始颜色
+        if getattr(self, 'highlighted_row', None) is not None:
+            try:
+                self.data_table.highlight_rows(
+                    rows=self.highlighted_row, 
+                    bg=self._row_stripe_color(self.highlighted_row), 
+                    fg="#000000"
+                )
+            except Exception as e:
+                print(f"恢复行颜色失败: {e}")
+            self.highlighted_row = None
\ No newline at end of file